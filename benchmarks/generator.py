@@ -0,0 +1,237 @@
+"""
+Synthetic SWIFT directory generator.
+
+Learns the shape of a real SWIFT directory CSV (country mix, institution sizes,
+share of institutions without a headquarters entry, bank-name and address shapes,
+town names, time zones) and streams arbitrarily large CSVs with the same columns
+that `SwiftCodeParser.parse_csv` expects.
+
+Codes are unique by construction, so generation runs in constant memory, and the
+output is fully determined by the seed.
+
+Usage:
+    python -m benchmarks.generator --rows 1000000 --output data/swift_codes_1m.csv --seed 42
+"""
+import os
+import csv
+import sys
+import random
+import string
+import argparse
+from bisect import bisect
+from collections import Counter, defaultdict
+from itertools import accumulate
+from typing import Dict, Generic, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+DEFAULT_SOURCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "swift_codes.csv")
+
+CSV_HEADER = ["COUNTRY ISO2 CODE", "SWIFT CODE", "CODE TYPE", "NAME", "ADDRESS", "TOWN NAME", "COUNTRY NAME", "TIME ZONE"]
+
+BANK_CODE_SPACE = 26 ** 4
+BANK_CODE_STRIDE = 91_193
+BRANCH_CODE_SPACE = 36 ** 3
+BRANCH_CODE_STRIDE = 7_919
+ALPHANUMERIC = string.ascii_uppercase + string.digits
+MAX_BRANCHES = 999
+END = "\0"
+
+T = TypeVar("T")
+
+
+class Distribution(Generic[T]):
+    """Categorical distribution sampled in O(log n) from cumulative weights."""
+
+    def __init__(self, counts: Dict[T, float]):
+        self.values: List[T] = list(counts)
+        self.cumulative = list(accumulate(counts[value] for value in self.values))
+
+    def sample(self, rng: random.Random) -> T:
+        return self.values[bisect(self.cumulative, rng.random() * self.cumulative[-1])]
+
+
+class CountryProfile:
+
+    def __init__(self, iso2: str, name: str):
+        self.iso2 = iso2
+        self.name = name
+        self.time_zones: Counter = Counter()
+        self.locations: Counter = Counter()
+        self.addresses: List[Tuple[str, str]] = []
+
+
+def encode(value: int, alphabet: str, width: int) -> str:
+    chars = []
+    for _ in range(width):
+        value, remainder = divmod(value, len(alphabet))
+        chars.append(alphabet[remainder])
+    return "".join(reversed(chars))
+
+
+def randomize_digits(text: str, rng: random.Random) -> str:
+    return "".join(rng.choice(string.digits) if char.isdigit() else char for char in text)
+
+
+class SwiftDatasetGenerator:
+
+    def __init__(self, source_file: str = DEFAULT_SOURCE, country_skew: float = 1.0,
+                 tail_probability: float = 0.0005, tail_alpha: float = 1.1):
+        self.country_skew = country_skew
+        self.tail_probability = tail_probability
+        self.tail_alpha = tail_alpha
+        self.countries: Dict[str, CountryProfile] = {}
+        self.institution_sizes: Counter = Counter()
+        self.without_headquarter = 0.0
+        self.name_transitions: Dict[str, Counter] = defaultdict(Counter)
+        self._fit(source_file)
+
+    def _fit(self, source_file: str) -> None:
+        institutions: Dict[str, List[str]] = defaultdict(list)
+        names: Dict[str, str] = {}
+
+        with open(source_file, newline="", encoding="utf-8") as file:
+            for row in csv.DictReader(file):
+                iso2 = row["COUNTRY ISO2 CODE"].strip().upper()
+                code = row["SWIFT CODE"].strip().upper()
+
+                country = self.countries.get(iso2)
+                if country is None:
+                    country = self.countries[iso2] = CountryProfile(iso2, row["COUNTRY NAME"].strip().upper())
+
+                country.time_zones[row["TIME ZONE"].strip()] += 1
+                country.locations[code[6:8]] += 1
+                country.addresses.append((row["ADDRESS"], row["TOWN NAME"]))
+
+                institutions[code[:8]].append(code)
+                names[code[:8]] = row["NAME"].strip()
+
+        if not institutions:
+            raise ValueError(f"No SWIFT codes found in {source_file}")
+
+        for codes in institutions.values():
+            self.institution_sizes[min(len(codes), MAX_BRANCHES + 1)] += 1
+            if not any(code.endswith("XXX") for code in codes):
+                self.without_headquarter += 1
+        self.without_headquarter /= len(institutions)
+
+        for name in names.values():
+            tokens = name.split()
+            for current, following in zip([END] + tokens, tokens + [END]):
+                self.name_transitions[current][following] += 1
+
+        self._country_distribution = Distribution({
+            iso2: len(country.addresses) ** self.country_skew for iso2, country in self.countries.items()
+        })
+        self._size_distribution = Distribution(dict(self.institution_sizes))
+        self._largest_institution = max(self.institution_sizes)
+        self._name_distributions = {token: Distribution(dict(counts)) for token, counts in self.name_transitions.items()}
+        self._time_zones = {iso2: Distribution(dict(country.time_zones)) for iso2, country in self.countries.items()}
+        self._locations = {iso2: Distribution(dict(country.locations)) for iso2, country in self.countries.items()}
+        self._spare_locations = {
+            iso2: [
+                location for location in (encode(value, ALPHANUMERIC, 2) for value in range(len(ALPHANUMERIC) ** 2))
+                if location not in country.locations
+            ]
+            for iso2, country in self.countries.items()
+        }
+        self._branch_codes = list(self._branch_code_sequence())
+
+    @staticmethod
+    def _branch_code_sequence() -> Iterator[str]:
+        index = 0
+        produced = 0
+        while produced < MAX_BRANCHES + 1:
+            branch = encode((index * BRANCH_CODE_STRIDE + 1) % BRANCH_CODE_SPACE, ALPHANUMERIC, 3)
+            index += 1
+            if branch != "XXX":
+                produced += 1
+                yield branch
+
+    def _institution_size(self, rng: random.Random) -> int:
+        if rng.random() < self.tail_probability:
+            return min(MAX_BRANCHES + 1, int(self._largest_institution * rng.paretovariate(self.tail_alpha)))
+        return self._size_distribution.sample(rng)
+
+    def _bank_name(self, rng: random.Random) -> str:
+        tokens = []
+        token = self._name_distributions[END].sample(rng)
+        while token != END and len(tokens) < 8:
+            tokens.append(token)
+            token = self._name_distributions[token].sample(rng)
+        return " ".join(tokens) or "BANK"
+
+    def _location(self, iso2: str, counter: int, rng: random.Random) -> str:
+        wraps = counter // BANK_CODE_SPACE
+        if wraps == 0:
+            return self._locations[iso2].sample(rng)
+
+        spare = self._spare_locations[iso2]
+        if wraps > len(spare):
+            raise ValueError(f"Cannot generate more unique institutions for country {iso2}")
+        return spare[wraps - 1]
+
+    def rows(self, count: int, seed: int = 42) -> Iterator[Tuple[str, ...]]:
+        rng = random.Random(seed)
+        counters: Dict[str, int] = defaultdict(int)
+        emitted = 0
+
+        while emitted < count:
+            iso2 = self._country_distribution.sample(rng)
+            country = self.countries[iso2]
+
+            counter = counters[iso2]
+            counters[iso2] += 1
+            bank = encode((counter * BANK_CODE_STRIDE + seed) % BANK_CODE_SPACE, string.ascii_uppercase, 4)
+            bic8 = f"{bank}{iso2}{self._location(iso2, counter, rng)}"
+
+            size = min(self._institution_size(rng), count - emitted)
+            has_headquarter = rng.random() >= self.without_headquarter
+            bank_name = self._bank_name(rng)
+            time_zone = self._time_zones[iso2].sample(rng)
+
+            for index in range(size):
+                branch = "XXX" if index == 0 and has_headquarter else self._branch_codes[index]
+                address, town = rng.choice(country.addresses)
+
+                yield (iso2, bic8 + branch, "BIC11", bank_name, randomize_digits(address, rng),
+                       town, country.name, time_zone)
+
+            emitted += size
+
+    def write_csv(self, path: str, count: int, seed: int = 42) -> None:
+        with open(path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(CSV_HEADER)
+            writer.writerows(self.rows(count, seed))
+
+
+_default_generator: Optional[SwiftDatasetGenerator] = None
+
+
+def write_synthetic_csv(path: str, rows: int, seed: int = 42) -> None:
+    global _default_generator
+    if _default_generator is None:
+        _default_generator = SwiftDatasetGenerator()
+    _default_generator.write_csv(path, rows, seed)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic SWIFT directory CSV")
+    parser.add_argument("--rows", type=int, required=True, help="Number of SWIFT codes to generate")
+    parser.add_argument("--output", required=True, help="CSV file to write")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (same seed, same file)")
+    parser.add_argument("--source", default=DEFAULT_SOURCE, help="Real directory CSV to learn distributions from")
+    parser.add_argument("--country-skew", type=float, default=1.0,
+                        help="Exponent applied to learned country weights (>1 makes the mix more skewed)")
+    parser.add_argument("--tail-probability", type=float, default=0.0005,
+                        help="Share of institutions drawn from a heavy tail with hundreds of branches")
+    args = parser.parse_args(argv)
+
+    generator = SwiftDatasetGenerator(args.source, country_skew=args.country_skew,
+                                      tail_probability=args.tail_probability)
+    generator.write_csv(args.output, args.rows, args.seed)
+    print(f"Wrote {args.rows} SWIFT codes to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+"""
+Open-loop load harness for the SWIFT Codes API.
+
+Drives a running API over real HTTP with a realistic request mix: Zipf-skewed
+HQ and branch lookups, bursts of unknown BICs, periodic country polls and
+occasional create/delete writes. Requests are issued on a Poisson arrival
+schedule independent of response times, so queueing in the server shows up as
+latency instead of silently lowering the offered load. A recorded access log
+can be replayed instead of the synthetic mix.
+
+Usage:
+    python -m benchmarks.load --base-url http://localhost:8080 --rate 500 --duration 60
+    python -m benchmarks.load --base-url http://localhost:8080 --replay access.log --speed 2
+"""
+import re
+import sys
+import csv
+import json
+import time
+import random
+import string
+import asyncio
+import argparse
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import httpx
+
+from benchmarks.generator import ALPHANUMERIC, DEFAULT_SOURCE, Distribution, encode
+
+DEFAULT_MIX = "hq_lookup=60,branch_lookup=25,unknown_lookup=8,country_poll=5,write=2"
+
+LOG_LINE = re.compile(r'(?:\[(?P<time>[^\]]+)\]\s+)?"?(?P<method>GET|POST|DELETE|PUT|PATCH) (?P<path>\S+)')
+LOG_TIME_FORMAT = "%d/%b/%Y:%H:%M:%S %z"
+
+Request = Tuple[str, str, str, Optional[dict]]
+
+# Kinds whose 4xx answers are normal traffic: unknown BICs, deletes of already deleted codes,
+# and replayed requests, which were often 404s in the original log as well.
+CLIENT_ERRORS_EXPECTED = ("unknown_lookup", "delete", "replay_get")
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def zipf_distribution(values: Sequence[str], exponent: float) -> Distribution:
+    return Distribution({value: 1 / (rank ** exponent) for rank, value in enumerate(values, start=1)})
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight)
+    return weights
+
+
+class TrafficMix:
+    """Generates (kind, method, path, body) tuples for the synthetic request mix."""
+
+    def __init__(self, data_file: str, mix: Dict[str, float], zipf_exponent: float = 1.1,
+                 unknown_burst: int = 20, country_poll_interval: float = 5.0, seed: int = 42):
+        self.rng = random.Random(seed)
+        headquarters, branches, countries = [], [], set()
+
+        with open(data_file, newline="", encoding="utf-8") as file:
+            for row in csv.DictReader(file):
+                code = row["SWIFT CODE"].strip()
+                countries.add(row["COUNTRY ISO2 CODE"].strip().upper())
+                (headquarters if code.endswith("XXX") else branches).append(code)
+
+        self.rng.shuffle(headquarters)
+        self.rng.shuffle(branches)
+        self.headquarters = zipf_distribution(headquarters, zipf_exponent)
+        self.branches = zipf_distribution(branches or headquarters, zipf_exponent)
+        self.countries = sorted(countries)
+        # An unknown lookup starts a burst of on average unknown_burst / 2 more, so its weight is
+        # scaled down to keep the configured share of traffic.
+        weights = {kind: weight for kind, weight in mix.items() if kind != "country_poll" and weight > 0}
+        if "unknown_lookup" in weights:
+            weights["unknown_lookup"] /= 1 + unknown_burst / 2
+        self.kinds = Distribution(weights)
+        self.country_poll_interval = country_poll_interval if mix.get("country_poll", 0) > 0 else 0
+        self.unknown_burst = unknown_burst
+        self._pending_unknown = 0
+        self._next_country_poll = 0.0
+        self._created: List[str] = []
+        self._write_counter = 0
+
+    def next_request(self, elapsed: float) -> Request:
+        if self.country_poll_interval and elapsed >= self._next_country_poll:
+            self._next_country_poll = elapsed + self.country_poll_interval
+            return "country_poll", "GET", f"/v1/swift-codes/country/{self.rng.choice(self.countries)}", None
+
+        if self._pending_unknown > 0:
+            self._pending_unknown -= 1
+            return self._unknown()
+
+        kind = self.kinds.sample(self.rng)
+        if kind == "hq_lookup":
+            return kind, "GET", f"/v1/swift-codes/{self.headquarters.sample(self.rng)}", None
+        if kind == "branch_lookup":
+            return kind, "GET", f"/v1/swift-codes/{self.branches.sample(self.rng)}", None
+        if kind == "unknown_lookup":
+            self._pending_unknown = self.rng.randint(0, self.unknown_burst)
+            return self._unknown()
+        if kind == "write":
+            return self._write()
+
+        raise ValueError(f"Unknown request kind in mix: {kind}")
+
+    def _unknown(self) -> Request:
+        code = "".join(self.rng.choice(string.ascii_uppercase) for _ in range(4)) + "ZZ" + "".join(
+            self.rng.choice(string.ascii_uppercase + string.digits) for _ in range(5)
+        )
+        return "unknown_lookup", "GET", f"/v1/swift-codes/{code}", None
+
+    def _write(self) -> Request:
+        if self._created and self.rng.random() < 0.5:
+            return "delete", "DELETE", f"/v1/swift-codes/{self._created.pop()}", None
+
+        self._write_counter += 1
+        location = encode(self._write_counter % len(ALPHANUMERIC) ** 2, ALPHANUMERIC, 2)
+        code = f"LOAD{self.rng.choice(self.countries)}{location}{self._write_counter // 1296 % 1000:03d}"
+        self._created.append(code)
+        body = {
+            "swiftCode": code,
+            "bankName": "LOAD TEST BANK",
+            "address": "1 LOAD STREET",
+            "countryISO2": code[4:6],
+            "countryName": "LOAD TEST COUNTRY",
+            "isHeadquarter": False,
+        }
+        return "create", "POST", "/v1/swift-codes", body
+
+
+def read_access_log(path: str) -> Iterator[Tuple[Optional[float], str, str]]:
+    """Yield (timestamp, method, path) from common/combined or plain `METHOD /path` log lines."""
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            match = LOG_LINE.search(line)
+            if not match:
+                continue
+            timestamp = None
+            if match.group("time"):
+                try:
+                    timestamp = datetime.strptime(match.group("time"), LOG_TIME_FORMAT).timestamp()
+                except ValueError:
+                    timestamp = None
+            yield timestamp, match.group("method"), match.group("path")
+
+
+class Report:
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.buckets: Dict[int, Dict[str, list]] = {}
+        self.kinds: Dict[str, Dict[str, list]] = {}
+        self.dropped = 0
+        self.skipped = 0
+
+    def record(self, kind: str, started: float, latency: float, error: bool) -> None:
+        bucket = self.buckets.setdefault(int(started // self.interval), {"latencies": [], "errors": []})
+        bucket["latencies"].append(latency)
+        bucket["errors"].append(error)
+        per_kind = self.kinds.setdefault(kind, {"latencies": [], "errors": []})
+        per_kind["latencies"].append(latency)
+        per_kind["errors"].append(error)
+
+    @staticmethod
+    def summarize(latencies: List[float], errors: List[bool], seconds: float) -> Dict[str, float]:
+        return {
+            "requests": len(latencies),
+            "throughput": len(latencies) / seconds if seconds else 0.0,
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p90_ms": percentile(latencies, 0.90) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+            "max_ms": max(latencies, default=0.0) * 1000,
+            "error_rate": sum(errors) / len(errors) if errors else 0.0,
+        }
+
+    def timeline(self) -> List[Dict[str, float]]:
+        return [
+            {"t": index * self.interval, **self.summarize(bucket["latencies"], bucket["errors"], self.interval)}
+            for index, bucket in sorted(self.buckets.items())
+        ]
+
+    def to_dict(self, duration: float) -> Dict:
+        return {
+            "dropped": self.dropped,
+            "skipped": self.skipped,
+            "timeline": self.timeline(),
+            "by_kind": {
+                kind: self.summarize(values["latencies"], values["errors"], duration)
+                for kind, values in sorted(self.kinds.items())
+            },
+        }
+
+
+async def fire(client: httpx.AsyncClient, report: Report, request: Request, started: float,
+               origin: float, semaphore: asyncio.Semaphore) -> None:
+    kind, method, path, body = request
+    try:
+        response = await client.request(method, path, json=body)
+        error = response.status_code >= 500 or (response.status_code >= 400 and kind not in CLIENT_ERRORS_EXPECTED)
+    except httpx.HTTPError:
+        error = True
+    finally:
+        semaphore.release()
+    report.record(kind, started - origin, time.perf_counter() - started, error)
+
+
+async def drive(base_url: str, schedule: Iterator[Tuple[float, Request]], report: Report, max_in_flight: int) -> float:
+    semaphore = asyncio.Semaphore(max_in_flight)
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+    tasks = set()
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        origin = time.perf_counter()
+        for offset, request in schedule:
+            delay = origin + offset - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            if semaphore.locked():
+                report.dropped += 1
+                continue
+
+            await semaphore.acquire()
+            task = asyncio.create_task(fire(client, report, request, time.perf_counter(), origin, semaphore))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        if tasks:
+            await asyncio.gather(*tasks)
+        return time.perf_counter() - origin
+
+
+def synthetic_schedule(mix: TrafficMix, rate: float, duration: float, seed: int) -> Iterator[Tuple[float, Request]]:
+    rng = random.Random(seed)
+    offset = rng.expovariate(rate)
+    while offset < duration:
+        yield offset, mix.next_request(offset)
+        offset += rng.expovariate(rate)
+
+
+def replay_schedule(path: str, rate: float, speed: float, report: Report) -> Iterator[Tuple[float, Request]]:
+    """
+    Replay the GET lines of an access log. Logs do not record request bodies, so other
+    methods cannot be reproduced and are counted in `report.skipped` instead.
+    """
+    first_timestamp = None
+    index = 0
+    for timestamp, method, request_path in read_access_log(path):
+        if method != "GET":
+            report.skipped += 1
+            continue
+        if timestamp is not None:
+            first_timestamp = timestamp if first_timestamp is None else first_timestamp
+            offset = (timestamp - first_timestamp) / speed
+        else:
+            offset = index / rate / speed
+        index += 1
+        yield offset, ("replay_get", method, request_path, None)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Open-loop load test for the SWIFT Codes API")
+    parser.add_argument("--base-url", default="http://localhost:8080")
+    parser.add_argument("--rate", type=float, default=200, help="Mean arrivals per second (Poisson)")
+    parser.add_argument("--duration", type=float, default=30, help="Test length in seconds")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Comma-separated kind=weight request mix")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent of lookup popularity")
+    parser.add_argument("--unknown-burst", type=int, default=20, help="Maximum length of an unknown-BIC burst")
+    parser.add_argument("--country-poll-interval", type=float, default=5, help="Seconds between country polls")
+    parser.add_argument("--data-file", default=DEFAULT_SOURCE, help="Directory CSV the server was seeded with")
+    parser.add_argument("--replay", help="Access log to replay instead of the synthetic mix")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed-up factor")
+    parser.add_argument("--max-in-flight", type=int, default=512, help="Requests beyond this are dropped")
+    parser.add_argument("--interval", type=float, default=1.0, help="Reporting interval in seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the full report as JSON")
+    args = parser.parse_args(argv)
+
+    report = Report(args.interval)
+    if args.replay:
+        schedule = replay_schedule(args.replay, args.rate, args.speed, report)
+    else:
+        mix = TrafficMix(args.data_file, parse_mix(args.mix), args.zipf, args.unknown_burst,
+                         args.country_poll_interval, args.seed)
+        schedule = synthetic_schedule(mix, args.rate, args.duration, args.seed)
+
+    elapsed = asyncio.run(drive(args.base_url, schedule, report, args.max_in_flight))
+    result = report.to_dict(elapsed)
+
+    print(f"{'t':>6} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for row in result["timeline"]:
+        print(f"{row['t']:>6.0f} {row['throughput']:>8.1f} {row['p50_ms']:>8.2f} "
+              f"{row['p90_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['error_rate']:>7.2%}")
+    print()
+    for kind, summary in result["by_kind"].items():
+        print(f"{kind:16s} {summary['requests']:>7d} req  p50 {summary['p50_ms']:.2f} ms  "
+              f"p99 {summary['p99_ms']:.2f} ms  errors {summary['error_rate']:.2%}")
+    print(f"dropped (over --max-in-flight): {result['dropped']}")
+    if args.replay:
+        print(f"skipped (non-GET log lines): {result['skipped']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(result, file, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
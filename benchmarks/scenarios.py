@@ -0,0 +1,181 @@
+import os
+import time
+import random
+from typing import Any, Callable, Dict, List
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.generator import write_synthetic_csv
+from src.main import app
+from src.database import embedded
+from src.database.db import Base, build_engine, get_db
+from src.schemas.swift_code import SwiftCodeWithBranches, CountrySwiftCodes
+from src.services.swift_service import SwiftCodeService
+from src.utils.parser import SwiftCodeParser
+
+WARMUP_REQUESTS = 20
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def metric(value: float, unit: str, higher_is_better: bool) -> Dict[str, Any]:
+    return {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+
+
+def timed(func: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run_scenarios(db_url: str, sizes: List[int], requests: int, work_dir: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Run every scenario against `db_url` for each dataset size.
+
+    The target database must be a scratch database: its tables are dropped and
+    recreated for every dataset size.
+    """
+    backend = db_url.split(":", 1)[0].split("+", 1)[0]
+    engine = build_engine(db_url)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    results: Dict[str, Dict[str, Any]] = {}
+
+    try:
+        for size in sizes:
+            prefix = f"{backend}/{size}"
+            data_file = os.path.join(work_dir, f"swift_codes_{size}.csv")
+            write_synthetic_csv(data_file, size)
+
+            records: List[Dict[str, Any]] = []
+            parse_time = timed(lambda: records.extend(SwiftCodeParser.parse_csv(data_file)))
+            results[f"{prefix}/parse_rows_per_s"] = metric(len(records) / parse_time, "rows/s", True)
+
+            cached_time = timed(lambda: SwiftCodeParser.parse_csv(data_file))
+            results[f"{prefix}/parse_cached_rows_per_s"] = metric(len(records) / cached_time, "rows/s", True)
+
+            Base.metadata.drop_all(bind=engine)
+            Base.metadata.create_all(bind=engine)
+            db = session_factory()
+            try:
+                seed_time = timed(lambda: SwiftCodeService.seed_database(db, data_file))
+            finally:
+                db.close()
+            results[f"{prefix}/seed_seconds"] = metric(seed_time, "s", False)
+
+            results.update(run_lookups(prefix, session_factory, records, requests))
+            results.update(run_serialization(prefix, session_factory, records, requests))
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+    return results
+
+
+def run_embedded_scenarios(mode: str, sizes: List[int], requests: int, work_dir: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Benchmark the embedded read-only `mode` ("sqlite" or "memory") for each dataset size.
+
+    `startup_seconds` covers parsing the CSV and building the database, the embedded
+    counterpart of `seed_seconds`; for "sqlite", `restart_seconds` is a start that
+    reuses the file already built.
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+
+    for size in sizes:
+        prefix = f"embedded-{mode}/{size}"
+        data_file = os.path.join(work_dir, f"embedded_{mode}_{size}.csv")
+        write_synthetic_csv(data_file, size)
+        records = SwiftCodeParser.parse_csv(data_file)
+
+        urls: List[str] = []
+        startup_time = timed(lambda: urls.append(embedded.prepare(data_file, mode)))
+        results[f"{prefix}/startup_seconds"] = metric(startup_time, "s", False)
+        if mode == "sqlite":
+            results[f"{prefix}/restart_seconds"] = metric(timed(lambda: embedded.prepare(data_file, mode)), "s", False)
+
+        engine = build_engine(urls[0])
+        embedded.tune_for_reads(engine)
+        try:
+            session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            results.update(run_lookups(prefix, session_factory, records, requests))
+        finally:
+            engine.dispose()
+            embedded.close()
+
+    return results
+
+
+def sample_paths(records: List[Dict[str, Any]], requests: int) -> Dict[str, List[str]]:
+    rng = random.Random(7)
+    headquarters = [record["swift_code"] for record in records if record["is_headquarter"]]
+    branches = [record["swift_code"] for record in records if not record["is_headquarter"]] or headquarters
+    countries = sorted({record["country_iso2"] for record in records})
+
+    return {
+        "single_lookup": [f"/v1/swift-codes/{rng.choice(branches)}" for _ in range(requests)],
+        "hq_lookup": [f"/v1/swift-codes/{rng.choice(headquarters)}" for _ in range(requests)],
+        "country_lookup": [f"/v1/swift-codes/country/{rng.choice(countries)}" for _ in range(requests)],
+    }
+
+
+def run_lookups(prefix: str, session_factory, records: List[Dict[str, Any]], requests: int) -> Dict[str, Dict[str, Any]]:
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    results = {}
+    previous_override = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+
+    try:
+        client = TestClient(app)
+        for scenario, paths in sample_paths(records, requests).items():
+            for path in paths[:WARMUP_REQUESTS]:
+                client.get(path)
+
+            latencies = []
+            for path in paths:
+                start = time.perf_counter()
+                response = client.get(path)
+                latencies.append((time.perf_counter() - start) * 1000)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{path} returned {response.status_code}")
+
+            results[f"{prefix}/{scenario}_p50_ms"] = metric(percentile(latencies, 0.50), "ms", False)
+            results[f"{prefix}/{scenario}_p99_ms"] = metric(percentile(latencies, 0.99), "ms", False)
+    finally:
+        if previous_override is None:
+            app.dependency_overrides.pop(get_db, None)
+        else:
+            app.dependency_overrides[get_db] = previous_override
+
+    return results
+
+
+def run_serialization(prefix: str, session_factory, records: List[Dict[str, Any]], requests: int) -> Dict[str, Dict[str, Any]]:
+    paths = sample_paths(records, requests)
+    db = session_factory()
+    try:
+        hq_results = [SwiftCodeService.get_swift_code(db, path.rsplit("/", 1)[1]) for path in paths["hq_lookup"]]
+        largest_country = max(
+            {record["country_iso2"] for record in records},
+            key=lambda iso2: sum(1 for record in records if record["country_iso2"] == iso2)
+        )
+        country_result = SwiftCodeService.get_country_swift_codes(db, largest_country)
+    finally:
+        db.close()
+
+    hq_time = timed(lambda: [SwiftCodeWithBranches.model_validate(result).model_dump_json() for result in hq_results])
+    country_time = timed(lambda: CountrySwiftCodes.model_validate(country_result).model_dump_json())
+
+    return {
+        f"{prefix}/serialize_hq_us": metric(hq_time / len(hq_results) * 1_000_000, "us", False),
+        f"{prefix}/serialize_country_ms": metric(country_time * 1000, "ms", False),
+    }
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from src.api.security import require_admin
+from src.monitoring.profiling import SamplingProfiler, profile_store
+
+router = APIRouter(prefix="/v1/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/profiles/{profile_id}")
+def get_profile(profile_id: str):
+    """
+    Retrieve a stored request profile or sampling profile by its id.
+    """
+    profile = profile_store.get(profile_id)
+
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Profile {profile_id} not found"
+        )
+
+    return profile
+
+
+@router.post("/profile", status_code=status.HTTP_202_ACCEPTED)
+def start_sampling_profile(seconds: float = Query(30, gt=0, le=300)):
+    """
+    Sample the stacks of all requests for the given number of seconds.
+    The aggregated collapsed stacks are available under the returned profile id.
+    """
+    profiler = SamplingProfiler.start(seconds)
+
+    if profiler is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A sampling profile is already running"
+        )
+
+    return {"id": profiler.id, "status": "running", "durationSeconds": seconds}
@@ -0,0 +1,41 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from sqlalchemy.orm import Session
+
+from src.database.db import get_read_db
+from src.database.deadlines import db_budget, LISTING_BUDGET_MS
+from src.schemas.swift_code import Institution
+from src.services.swift_service import SwiftCodeService
+from src.monitoring.profiling import ProfiledRoute
+
+router = APIRouter(
+    prefix="/v1/banks",
+    tags=["banks"],
+    route_class=ProfiledRoute,
+    dependencies=[Depends(db_budget(LISTING_BUDGET_MS))]
+)
+
+MAX_PAGE_SIZE = 500
+
+
+@router.get("/{bic8}", response_model=Institution)
+def get_institution(
+    bic8: str = Path(..., min_length=8, max_length=11, pattern="^[A-Za-z0-9]+$"),
+    country: Optional[str] = Query(None, min_length=2, max_length=2),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Return every SWIFT code of one institution: its headquarters and all branches.
+    Accepts the BIC8 or any full code of the institution, optionally filtered by `country` and paginated.
+    """
+    result = SwiftCodeService.get_institution(db, bic8, country, offset, limit)
+
+    if not result:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Institution {bic8[:8].upper()} not found"
+        )
+
+    return result
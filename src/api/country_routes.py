@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from src.database.db import get_read_db
+from src.database.deadlines import db_budget, LOOKUP_BUDGET_MS
+from src.schemas.swift_code import CountryList, CountryStatistics
+from src.services.swift_service import SwiftCodeService
+from src.monitoring.profiling import ProfiledRoute
+
+router = APIRouter(
+    prefix="/v1/countries",
+    tags=["countries"],
+    route_class=ProfiledRoute,
+    dependencies=[Depends(db_budget(LOOKUP_BUDGET_MS))]
+)
+
+
+@router.get("", response_model=CountryList)
+def get_countries(db: Session = Depends(get_read_db)):
+    """
+    List every country that has SWIFT codes, with its code, headquarters, branch and bank counts.
+    """
+    return SwiftCodeService.get_countries(db)
+
+
+@router.get("/{country_iso2}/stats", response_model=CountryStatistics)
+def get_country_statistics(country_iso2: str, db: Session = Depends(get_read_db)):
+    """
+    Return the code, headquarters, branch and bank counts of one country.
+    """
+    result = SwiftCodeService.get_country_statistics(db, country_iso2)
+
+    if not result:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Country {country_iso2} not found"
+        )
+
+    return result
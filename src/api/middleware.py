@@ -0,0 +1,204 @@
+import time
+import asyncio
+import cProfile
+
+from src.database.instrumentation import QueryStats, current_query_stats
+from src.database.deadlines import RequestDeadline, current_deadline, DEADLINES_ENABLED
+from src.monitoring.metrics import metrics
+from src.monitoring.tracing import tracer, current_trace
+from src.monitoring.profiling import (
+    current_request_profile, profile_store, new_profile_id, summarize_request_profile
+)
+from src.api.security import is_admin_token
+
+
+class QueryStatsMiddleware:
+    """Counts SQL statements per request and reports them in response headers."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(f"{scope['method']} {scope['path']}")
+        token = current_query_stats.set(stats)
+
+        async def send_with_query_stats(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.count).encode()))
+                headers.append((b"server-timing", f"db;dur={stats.duration * 1000:.2f}".encode()))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_query_stats)
+        finally:
+            current_query_stats.reset(token)
+
+
+class MetricsMiddleware:
+    """Records request count, status and latency per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        metrics.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.in_flight -= 1
+            route = scope.get("route")
+            metrics.observe_request(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                status_code,
+                time.perf_counter() - start
+            )
+
+
+class TracingMiddleware:
+    """Starts a trace for sampled requests, continuing an incoming W3C `traceparent`."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+
+        trace = tracer.start_trace(traceparent)
+        if trace is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_traced(message):
+            if message["type"] == "http.response.start":
+                tracer.record_serialization()
+                message["headers"] = list(message.get("headers", [])) + [(b"x-trace-id", trace.trace_id.encode())]
+            await send(message)
+
+        token = current_trace.set(trace)
+        try:
+            with tracer.span("http.request", method=scope["method"], path=scope["path"]) as root:
+                await self.app(scope, receive, send_traced)
+                route = scope.get("route")
+                if route is not None:
+                    root.attributes["route"] = route.path
+        finally:
+            current_trace.reset(token)
+            tracer.finish_trace(trace)
+
+
+class ProfilingMiddleware:
+    """Profiles requests that carry `X-Profile: 1` and a valid `X-Admin-Token`."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile_requested = False
+        admin_token = None
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                profile_requested = value == b"1"
+            elif name == b"x-admin-token":
+                admin_token = value.decode("latin-1")
+
+        if not profile_requested or not is_admin_token(admin_token):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = new_profile_id()
+        profile = cProfile.Profile()
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        token = current_request_profile.set(profile)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            current_request_profile.reset(token)
+            profile_store.put(summarize_request_profile(
+                profile_id,
+                f"{scope['method']} {scope['path']}",
+                profile,
+                time.perf_counter() - start
+            ))
+
+
+class DeadlineMiddleware:
+    """
+    Gives each request a database deadline and cancels its in-flight statements when the client disconnects.
+
+    Incoming messages are relayed through a queue by a watcher task, so an
+    `http.disconnect` is seen while a sync endpoint is still running in the threadpool.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not DEADLINES_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        deadline = RequestDeadline()
+        messages: asyncio.Queue = asyncio.Queue()
+        response_complete = False
+
+        async def watch():
+            while True:
+                message = await receive()
+                await messages.put(message)
+                if message["type"] == "http.disconnect":
+                    if not response_complete:
+                        deadline.cancel()
+                    return
+
+        async def send_tracking_completion(message):
+            nonlocal response_complete
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_complete = True
+            await send(message)
+
+        token = current_deadline.set(deadline)
+        watcher = asyncio.create_task(watch())
+        try:
+            await self.app(scope, messages.get, send_tracking_completion)
+        finally:
+            response_complete = True
+            watcher.cancel()
+            current_deadline.reset(token)
@@ -1,16 +1,65 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, status
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 
-from src.database.db import get_db
+from src.database.db import get_db, get_read_db, get_write_db
+from src.database.deadlines import (
+    db_budget, DeadlineExceeded, ClientDisconnected, LOOKUP_BUDGET_MS, SEARCH_BUDGET_MS, LISTING_BUDGET_MS,
+    WRITE_BUDGET_MS
+)
 from src.schemas.swift_code import SwiftCodeCreate, SwiftCodeWithBranches, CountrySwiftCodes, \
-    MessageResponse
+    SwiftCodeSearchResults, BankSearchResults, MessageResponse
 from src.services.swift_service import SwiftCodeService
+from src.services.lookup_stream import LookupStream
+from src.monitoring.profiling import ProfiledRoute
 
-router = APIRouter(prefix="/v1/swift-codes", tags=["swift-codes"])
+router = APIRouter(prefix="/v1/swift-codes", tags=["swift-codes"], route_class=ProfiledRoute)
 
 
-@router.get("/{swift_code}", response_model=SwiftCodeWithBranches)
-def get_swift_code(swift_code: str, db: Session = Depends(get_db)):
+MAX_SEARCH_LIMIT = 100
+MAX_BANK_SEARCH_LIMIT = 50
+
+
+# Declared before "/{swift_code}" so "search" is not taken for a SWIFT code.
+@router.get("/search", response_model=SwiftCodeSearchResults, dependencies=[Depends(db_budget(SEARCH_BUDGET_MS))])
+def search_swift_codes(
+    prefix: str = Query(..., min_length=1, max_length=11, pattern="^[A-Za-z0-9]+$"),
+    limit: int = Query(10, ge=1, le=MAX_SEARCH_LIMIT),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Autocomplete: return up to `limit` SWIFT codes starting with `prefix`, in code order.
+    """
+    return SwiftCodeService.search_swift_codes(db, prefix, limit)
+
+
+@router.get("/search/banks", response_model=BankSearchResults, dependencies=[Depends(db_budget(SEARCH_BUDGET_MS))])
+def search_banks(
+    q: str = Query(..., min_length=2, max_length=100),
+    country: Optional[str] = Query(None, min_length=2, max_length=2),
+    limit: int = Query(10, ge=1, le=MAX_BANK_SEARCH_LIMIT),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Fuzzy search over bank names and addresses, best matches first.
+    Tolerates partial and misspelled names; `country` restricts results to one ISO2 code.
+    """
+    return SwiftCodeService.search_banks(db, q, country, limit)
+
+
+@router.websocket("/stream")
+async def stream_swift_codes(websocket: WebSocket):
+    """
+    Pipelined lookups over a WebSocket: send `{"id": ..., "swiftCode": ...}` frames and
+    receive `{"id", "status", "result", "detail"}` replies as each lookup completes.
+    """
+    sessions = websocket.app.dependency_overrides.get(get_db, get_db)
+    await LookupStream(websocket, sessions).serve()
+
+
+@router.get("/{swift_code}", response_model=SwiftCodeWithBranches, dependencies=[Depends(db_budget(LOOKUP_BUDGET_MS))])
+def get_swift_code(swift_code: str, db: Session = Depends(get_read_db)):
     """
     Retrieve details of a single SWIFT code.
     If the code is for a headquarters, it will include details of all branch codes.
@@ -26,8 +75,9 @@ def get_swift_code(swift_code: str, db: Session = Depends(get_db)):
     return result
 
 
-@router.get("/country/{country_iso2}", response_model=CountrySwiftCodes)
-def get_country_swift_codes(country_iso2: str, db: Session = Depends(get_db)):
+@router.get("/country/{country_iso2}", response_model=CountrySwiftCodes,
+            dependencies=[Depends(db_budget(LISTING_BUDGET_MS))])
+def get_country_swift_codes(country_iso2: str, db: Session = Depends(get_read_db)):
     """
     Return all SWIFT codes with details for a specific country.
     """
@@ -42,15 +92,16 @@ def get_country_swift_codes(country_iso2: str, db: Session = Depends(get_db)):
     return result
 
 
-@router.post("", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
-def create_swift_code(swift_code: SwiftCodeCreate, db: Session = Depends(get_db)):
+@router.post("", response_model=MessageResponse, status_code=status.HTTP_201_CREATED,
+             dependencies=[Depends(db_budget(WRITE_BUDGET_MS))])
+def create_swift_code(swift_code: SwiftCodeCreate, db: Session = Depends(get_write_db)):
     """
     Add a new SWIFT code entry to the database.
     """
     try:
         result = SwiftCodeService.create_swift_code(db, swift_code.model_dump())
         return result
-    except HTTPException as e:
+    except (HTTPException, PoolTimeoutError, DeadlineExceeded, ClientDisconnected) as e:
         raise e
     except Exception as e:
         raise HTTPException(
@@ -59,15 +110,15 @@ def create_swift_code(swift_code: SwiftCodeCreate, db: Session = Depends(get_db)
         )
 
 
-@router.delete("/{swift_code}", response_model=MessageResponse)
-def delete_swift_code(swift_code: str, db: Session = Depends(get_db)):
+@router.delete("/{swift_code}", response_model=MessageResponse, dependencies=[Depends(db_budget(WRITE_BUDGET_MS))])
+def delete_swift_code(swift_code: str, db: Session = Depends(get_write_db)):
     """
     Delete a SWIFT code entry from the database.
     """
     try:
         result = SwiftCodeService.delete_swift_code(db, swift_code)
         return result
-    except HTTPException as e:
+    except (HTTPException, PoolTimeoutError, DeadlineExceeded, ClientDisconnected) as e:
         raise e
     except Exception as e:
         raise HTTPException(
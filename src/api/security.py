@@ -0,0 +1,19 @@
+import os
+import secrets
+from typing import Optional
+
+from fastapi import Header, HTTPException, status
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    return bool(ADMIN_TOKEN) and token is not None and secrets.compare_digest(token, ADMIN_TOKEN)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin token required"
+        )
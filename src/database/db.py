@@ -1,12 +1,23 @@
 import os
-import time
+import asyncio
 import logging
+from contextlib import contextmanager
+from typing import Callable, Iterator
 
+from fastapi import Depends, HTTPException, Request, status
+from starlette.requests import HTTPConnection
 from sqlalchemy import create_engine, text
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.orm import declarative_base, sessionmaker, Session
 from sqlalchemy.exc import OperationalError
 from dotenv import load_dotenv
 
+from src.database.instrumentation import install_query_instrumentation
+from src.database.deadlines import install_deadlines
+from src.database.pool import InstrumentedQueuePool, AdmissionController, pool_stats
+from src.database.replicas import ReplicaRouter
+from src.database.shards import ShardRouter, parse_shard_urls, parse_country_map
+from src.monitoring.tracing import tracer
+
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
@@ -19,37 +30,265 @@ DB_PORT = os.getenv("DB_PORT", "5432")
 DB_NAME = os.getenv("DB_NAME", "swift_codes")
 MAX_RETRIES = int(os.getenv("DB_MAX_RETRIES", "5"))
 RETRY_DELAY = int(os.getenv("DB_RETRY_DELAY", "2"))
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+POOL_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_WAIT_BUDGET_MS = float(os.getenv("DB_POOL_WAIT_BUDGET_MS", "250"))
+ADMISSION_CONTROL_ENABLED = os.getenv("DB_ADMISSION_CONTROL", "true").lower() == "true"
+RETRY_AFTER_SECONDS = int(os.getenv("DB_RETRY_AFTER_SECONDS", "1"))
+READ_REPLICA_URLS = [url.strip() for url in os.getenv("DB_READ_REPLICA_URLS", "").split(",") if url.strip()]
+REPLICA_STRATEGY = os.getenv("DB_REPLICA_STRATEGY", "round_robin")
+REPLICA_HEALTH_INTERVAL = float(os.getenv("DB_REPLICA_HEALTH_INTERVAL", "5"))
+READ_YOUR_WRITES_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "2"))
+SHARD_URLS = parse_shard_urls(os.getenv("DB_SHARD_URLS", ""))
+SHARD_COUNTRIES = parse_country_map(os.getenv("DB_SHARD_COUNTRIES", ""))
+
+SQLALCHEMY_DATABASE_URL = os.getenv(
+    "DATABASE_URL",
+    f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+)
+
+install_query_instrumentation()
+install_deadlines()
+
+
+def build_engine(url: str):
+    connect_args = {}
+    if url.startswith("postgresql"):
+        connect_args = {"connect_timeout": 10}
+    elif url.startswith("sqlite"):
+        connect_args = {"check_same_thread": False}
+
+    in_memory = url.startswith("sqlite") and (":memory:" in url or url.rstrip("/") == "sqlite:")
+
+    pool_args = {}
+    if not in_memory:
+        pool_args = {
+            "poolclass": InstrumentedQueuePool,
+            "pool_size": POOL_SIZE,
+            "max_overflow": POOL_MAX_OVERFLOW,
+            "pool_timeout": POOL_TIMEOUT,
+        }
+
+    engine = create_engine(
+        url,
+        pool_pre_ping=True,
+        pool_recycle=300,
+        connect_args=connect_args,
+        **pool_args
+    )
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        engine.pool.admission = admission
+    return engine
 
-SQLALCHEMY_DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
 engine = None
-for attempt in range(MAX_RETRIES):
-    try:
-        logger.info(f"Attempting to connect to database (attempt {attempt + 1}/{MAX_RETRIES})...")
-        engine = create_engine(
-            SQLALCHEMY_DATABASE_URL,
-            pool_pre_ping=True,
-            pool_recycle=300,
-            connect_args={"connect_timeout": 10}
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+Base = declarative_base()
+read_router = None
+shard_router = None
+read_only = False
+
+
+def init_engine(url: str = SQLALCHEMY_DATABASE_URL, read_only_mode: bool = False):
+    """
+    Create the primary engine (and replica router) and bind SessionLocal to it. Does not connect.
+
+    With `DB_SHARD_URLS` set, every shard gets an engine and sessions come from the shard
+    router instead; the first shard's engine then stands in as `engine`. A read-only
+    engine serves every request by itself and the write endpoints are refused.
+    """
+    global engine, read_router, shard_router, read_only
+
+    if engine is not None:
+        return engine
+
+    read_only = read_only_mode
+    if read_only:
+        engine = build_engine(url)
+        SessionLocal.configure(bind=engine)
+        if SHARD_URLS or READ_REPLICA_URLS:
+            logger.warning("DB_SHARD_URLS and DB_READ_REPLICA_URLS are ignored in read-only mode")
+        return engine
+
+    if SHARD_URLS:
+        shard_router = ShardRouter(
+            {name: build_engine(shard_url) for name, shard_url in SHARD_URLS.items()}, SHARD_COUNTRIES
         )
-        with engine.connect() as connection:
-            connection.execute(text("SELECT 1"))
-        logger.info("Successfully connected to the database")
-        break
-    except OperationalError as db_error:
-        if attempt < MAX_RETRIES - 1:
-            logger.warning(f"Database connection failed: {db_error}. Retrying in {RETRY_DELAY} seconds...")
-            time.sleep(RETRY_DELAY)
-        else:
-            logger.error(f"Failed to connect to the database after {MAX_RETRIES} attempts: {db_error}")
-            raise
+        engine = shard_router.engines[shard_router.names[0]]
+        SessionLocal.configure(bind=engine)
+        logger.info(f"Sharding countries across {len(SHARD_URLS)} databases: {', '.join(SHARD_URLS)}")
+        if READ_REPLICA_URLS:
+            logger.warning("DB_READ_REPLICA_URLS is ignored when DB_SHARD_URLS is set")
+        return engine
+
+    engine = build_engine(url)
+    SessionLocal.configure(bind=engine)
+
+    if READ_REPLICA_URLS:
+        read_router = ReplicaRouter(
+            {replica_url: build_engine(replica_url) for replica_url in READ_REPLICA_URLS},
+            strategy=REPLICA_STRATEGY,
+            health_interval=REPLICA_HEALTH_INTERVAL,
+            sticky_seconds=READ_YOUR_WRITES_SECONDS
+        )
+        logger.info(f"Routing reads across {len(READ_REPLICA_URLS)} read replica(s)")
+
+    return engine
+
+
+def all_engines():
+    """Every engine holding a full schema: the primary, or each shard."""
+    if shard_router is not None:
+        return list(shard_router.engines.values())
+    return [engine] if engine is not None else []
+
+
+def session_factory():
+    return shard_router.session_factory if shard_router is not None else SessionLocal
+
+
+def _ping(bind) -> None:
+    with bind.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+async def wait_for_database() -> None:
+    """Check connectivity without blocking the event loop, retrying while the database starts up."""
+    init_engine()
+
+    for attempt in range(MAX_RETRIES):
+        try:
+            logger.info(f"Attempting to connect to database (attempt {attempt + 1}/{MAX_RETRIES})...")
+            for bind in all_engines():
+                await asyncio.to_thread(_ping, bind)
+            logger.info("Successfully connected to the database")
+            return
+        except OperationalError as db_error:
+            if attempt < MAX_RETRIES - 1:
+                logger.warning(f"Database connection failed: {db_error}. Retrying in {RETRY_DELAY} seconds...")
+                await asyncio.sleep(RETRY_DELAY)
+            else:
+                logger.error(f"Failed to connect to the database after {MAX_RETRIES} attempts: {db_error}")
+                raise
+
+
+def dispose_engine() -> None:
+    global engine, read_router, shard_router, read_only
+
+    if read_router is not None:
+        read_router.dispose()
+        read_router = None
+    if shard_router is not None:
+        shard_router.dispose()
+        shard_router = None
+    if engine is not None:
+        engine.dispose()
+        engine = None
+    read_only = False
+    SessionLocal.configure(bind=None)
+
+
+admission = None
+if ADMISSION_CONTROL_ENABLED:
+    admission = AdmissionController(
+        wait_budget_ms=POOL_WAIT_BUDGET_MS,
+        retry_after_seconds=RETRY_AFTER_SECONDS
+    )
+
+
+def database_pool_stats():
+    stats = {"primary": pool_stats(engine.pool) if engine is not None else None}
+    if shard_router is not None:
+        stats["shards"] = {name: pool_stats(shard.pool) for name, shard in shard_router.engines.items()}
+    if read_router is not None:
+        stats["replicas"] = {
+            repr(replica.engine.url): pool_stats(replica.engine.pool) for replica in read_router.replicas
+        }
+    if admission is not None:
+        stats["shed_requests"] = admission.shed_count
+    return stats
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
 
 def get_db():
-    db = SessionLocal()
+    db = session_factory()()
     try:
         yield db
     finally:
         db.close()
+
+
+def client_key(request: HTTPConnection) -> str:
+    client_id = request.headers.get("X-Client-Id")
+    if client_id:
+        return client_id
+    return request.client.host if request.client else "anonymous"
+
+
+def get_read_db(request: Request, db: Session = Depends(get_db)):
+    tracer.record_since_request_start("threadpool.queue")
+
+    if read_router is None or read_router.is_sticky(client_key(request)):
+        yield db
+        return
+
+    replica = read_router.acquire()
+    if replica is None:
+        yield db
+        return
+
+    replica_db = replica.session(fallback=db.get_bind())
+    failed = False
+    try:
+        yield replica_db
+    except OperationalError:
+        failed = True
+        raise
+    finally:
+        replica_db.close()
+        read_router.release(replica, failed or replica.failed(replica_db))
+
+
+@contextmanager
+def read_session(client: str, sessions: Callable[[], Iterator[Session]] = get_db) -> Iterator[Session]:
+    """
+    `get_read_db` outside of a request, for connections that read in many short transactions
+    (the lookup stream). `sessions` is the `get_db` provider, or its override.
+    """
+    provider = sessions()
+    db = next(provider)
+    try:
+        replica = None
+        if read_router is not None and not read_router.is_sticky(client):
+            replica = read_router.acquire()
+        if replica is None:
+            yield db
+            return
+
+        replica_db = replica.session(fallback=db.get_bind())
+        failed = False
+        try:
+            yield replica_db
+        except OperationalError:
+            failed = True
+            raise
+        finally:
+            replica_db.close()
+            read_router.release(replica, failed or replica.failed(replica_db))
+    finally:
+        provider.close()
+
+
+def get_write_db(request: Request, db: Session = Depends(get_db)):
+    tracer.record_since_request_start("threadpool.queue")
+
+    if read_only:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="The API is running in read-only mode"
+        )
+
+    if read_router is not None:
+        read_router.record_write(client_key(request))
+    yield db
+
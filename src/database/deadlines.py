@@ -0,0 +1,168 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import event, func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import Pool
+
+from src.monitoring.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DEADLINES_ENABLED = os.getenv("DB_DEADLINES_ENABLED", "true").lower() == "true"
+DEFAULT_BUDGET_MS = float(os.getenv("DB_BUDGET_MS", "2000"))
+LOOKUP_BUDGET_MS = float(os.getenv("DB_LOOKUP_BUDGET_MS", "500"))
+SEARCH_BUDGET_MS = float(os.getenv("DB_SEARCH_BUDGET_MS", "1000"))
+LISTING_BUDGET_MS = float(os.getenv("DB_LISTING_BUDGET_MS", "3000"))
+WRITE_BUDGET_MS = float(os.getenv("DB_WRITE_BUDGET_MS", "2000"))
+
+# SQLite has no statement_timeout; a progress handler checks the deadline every this many VM instructions.
+SQLITE_PROGRESS_INTERVAL = 1000
+
+
+class DeadlineExceeded(Exception):
+    """The request's database budget ran out, before its transaction started or while a statement ran."""
+
+    def __init__(self, budget_ms: float, started: bool):
+        super().__init__(f"Database budget of {budget_ms:.0f} ms exceeded")
+        self.budget_ms = budget_ms
+        self.started = started
+
+
+class ClientDisconnected(Exception):
+    """The client went away and the request's in-flight statement was cancelled."""
+
+
+class RequestDeadline:
+    """
+    A request's database budget, counted from when the request reached the app.
+
+    Connections checked out for the request are tracked so `cancel` can stop their
+    in-flight statements from another thread: psycopg's `cancel()` asks the server to
+    abort the query, SQLite's `interrupt()` stops it in process.
+    """
+
+    def __init__(self, budget_ms: float = DEFAULT_BUDGET_MS):
+        self.start = time.monotonic()
+        self.budget_ms = budget_ms
+        self.disconnected = False
+        self._connections: Dict[int, Any] = {}
+        self._lock = threading.Lock()
+
+    def set_budget(self, budget_ms: float) -> None:
+        self.budget_ms = budget_ms
+
+    def remaining_ms(self) -> float:
+        return self.budget_ms - (time.monotonic() - self.start) * 1000
+
+    def expired(self) -> bool:
+        return self.remaining_ms() <= 0
+
+    def track(self, dbapi_connection: Any) -> None:
+        with self._lock:
+            self._connections[id(dbapi_connection)] = dbapi_connection
+
+    def untrack(self, dbapi_connection: Any) -> None:
+        # Waits for a `cancel` in progress, so the connection is released only once it is finished.
+        with self._lock:
+            self._connections.pop(id(dbapi_connection), None)
+
+    def cancel(self) -> None:
+        """Mark the client as gone and cancel the statements running on the request's connections."""
+        self.disconnected = True
+        # Held while cancelling: `untrack` runs on checkin, so a connection already back in the
+        # pool, possibly serving another request, is never cancelled.
+        with self._lock:
+            for dbapi_connection in self._connections.values():
+                cancel = getattr(dbapi_connection, "cancel", None) or getattr(dbapi_connection, "interrupt", None)
+                if cancel is None:
+                    continue
+                try:
+                    cancel()
+                    metrics.record_deadline("disconnect")
+                except Exception as e:
+                    logger.warning(f"Failed to cancel a statement after the client disconnected: {e}")
+
+
+current_deadline: ContextVar[Optional[RequestDeadline]] = ContextVar("current_deadline", default=None)
+
+
+def db_budget(budget_ms: float) -> Callable:
+    """Route dependency giving the request `budget_ms` of database time instead of the default."""
+
+    async def set_budget() -> None:
+        deadline = current_deadline.get()
+        if deadline is not None:
+            deadline.set_budget(budget_ms)
+
+    return set_budget
+
+
+_installed = False
+
+
+def install_deadlines() -> None:
+    global _installed
+    if _installed or not DEADLINES_ENABLED:
+        return
+
+    event.listen(Pool, "checkout", _checkout)
+    event.listen(Pool, "checkin", _checkin)
+    event.listen(Session, "after_begin", _after_begin)
+    event.listen(Engine, "handle_error", _handle_error)
+    _installed = True
+
+
+def _checkout(dbapi_connection, connection_record, connection_proxy):
+    deadline = current_deadline.get()
+    if deadline is None:
+        return
+
+    deadline.track(dbapi_connection)
+    connection_record.info["deadline"] = deadline
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.set_progress_handler(
+            lambda: deadline.disconnected or deadline.expired(), SQLITE_PROGRESS_INTERVAL
+        )
+
+
+def _checkin(dbapi_connection, connection_record):
+    deadline = connection_record.info.pop("deadline", None)
+    if deadline is None:
+        return
+
+    deadline.untrack(dbapi_connection)
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.set_progress_handler(None, 0)
+
+
+def _after_begin(session, transaction, connection):
+    deadline = current_deadline.get()
+    if deadline is None:
+        return
+
+    remaining = deadline.remaining_ms()
+    if remaining <= 0:
+        raise DeadlineExceeded(deadline.budget_ms, started=False)
+    if connection.dialect.name == "postgresql":
+        # Transaction-local, so the pooled connection is back to the server default after commit/rollback.
+        connection.execute(select(func.set_config("statement_timeout", str(max(1, int(remaining))), True)))
+
+
+def _handle_error(context):
+    deadline = current_deadline.get()
+    if deadline is None or context.is_disconnect:
+        return None
+
+    if deadline.disconnected:
+        return ClientDisconnected("The client disconnected and its statement was cancelled")
+    if deadline.expired():
+        metrics.record_deadline("timeout")
+        return DeadlineExceeded(deadline.budget_ms, started=True)
+    return None
@@ -0,0 +1,169 @@
+import os
+import uuid
+import hashlib
+import sqlite3
+import logging
+from contextlib import closing
+from typing import Optional
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from src.database.db import Base
+from src.repositories.swift_repository import SwiftCodeRepository
+from src.utils.parser import SwiftCodeParser
+from src.utils.parse_cache import CACHE_HOME, file_sha256, private_directory
+
+logger = logging.getLogger(__name__)
+
+# "sqlite" serves from a local SQLite file, "memory" from an in-process SQLite database; empty disables the mode.
+EMBEDDED_MODE = os.getenv("SWIFT_EMBEDDED_MODE", "").lower()
+EMBEDDED_DB_FILE = os.getenv("SWIFT_EMBEDDED_DB_FILE", "")
+EMBEDDED_DIR = os.path.join(CACHE_HOME, "embedded")
+EMBEDDED_MMAP_SIZE = int(os.getenv("SWIFT_EMBEDDED_MMAP_SIZE", str(256 * 1024 * 1024)))
+EMBEDDED_CACHE_KB = int(os.getenv("SWIFT_EMBEDDED_CACHE_KB", "65536"))
+
+EMBEDDED_MODES = ("sqlite", "memory")
+
+SOURCE_TABLE = "embedded_source"
+
+# Keeps a shared-cache in-memory database alive while the pool recycles its connections.
+_memory_keeper: Optional[sqlite3.Connection] = None
+
+
+def database_path(data_file: str) -> str:
+    """`SWIFT_EMBEDDED_DB_FILE`, or a file per CSV path in the user's cache directory (data mounts may be read-only)."""
+    if EMBEDDED_DB_FILE:
+        return EMBEDDED_DB_FILE
+    source = os.path.abspath(data_file)
+    name = hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(EMBEDDED_DIR, f"{os.path.splitext(os.path.basename(source))[0]}.{name}.sqlite")
+
+
+def _read_only_url(path: str) -> str:
+    # immutable=1: the file never changes while it is open, so SQLite skips locking and change detection.
+    return f"sqlite:///file:{os.path.abspath(path)}?mode=ro&immutable=1&uri=true"
+
+
+def _source_matches(path: str, data_file: str) -> bool:
+    try:
+        with closing(sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)) as connection:
+            size, mtime_ns, sha256 = connection.execute(
+                f"SELECT source_size, source_mtime_ns, source_sha256 FROM {SOURCE_TABLE}"
+            ).fetchone()
+    except (sqlite3.Error, TypeError) as e:
+        logger.warning(f"Rebuilding embedded database {path}: {e}")
+        return False
+
+    stat = os.stat(data_file)
+    if stat.st_size != size:
+        return False
+    return stat.st_mtime_ns == mtime_ns or file_sha256(data_file) == sha256
+
+
+def _load(engine: Engine, data_file: str) -> int:
+    """Create the schema in `engine`, load `data_file` into it and record the source it was built from."""
+    Base.metadata.create_all(bind=engine)
+
+    records = SwiftCodeParser.parse_csv(data_file)
+    with Session(bind=engine) as session:
+        SwiftCodeRepository.bulk_create_swift_codes(session, records)
+
+    stat = os.stat(data_file)
+    with engine.begin() as connection:
+        connection.execute(text(
+            f"CREATE TABLE {SOURCE_TABLE} (source_size INTEGER, source_mtime_ns INTEGER, source_sha256 BLOB)"
+        ))
+        connection.execute(
+            text(f"INSERT INTO {SOURCE_TABLE} VALUES (:size, :mtime_ns, :sha256)"),
+            {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": file_sha256(data_file)}
+        )
+        connection.execute(text("ANALYZE"))
+    return len(records)
+
+
+def _bulk_load_pragmas(dbapi_connection, _) -> None:
+    # The file is written once by one process and replaced atomically, so no journal is needed.
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=OFF")
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.close()
+
+
+def build_database_file(data_file: str, path: str) -> None:
+    """Build the SQLite file at `path` from `data_file`, atomically replacing any previous one."""
+    temporary = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(temporary):
+        os.remove(temporary)
+
+    engine = create_engine(f"sqlite:///{temporary}")
+    event.listen(engine, "connect", _bulk_load_pragmas)
+    try:
+        count = _load(engine, data_file)
+        with engine.connect() as connection:
+            connection.exec_driver_sql("PRAGMA journal_mode=DELETE")
+    finally:
+        engine.dispose()
+
+    os.replace(temporary, path)
+    logger.info(f"Built embedded database {path} ({count} codes)")
+
+
+def prepare(data_file: str, mode: str = EMBEDDED_MODE) -> str:
+    """
+    Make the embedded database for `data_file` ready and return the URL to serve reads from.
+
+    "sqlite" reuses the file at `database_path` while it matches the CSV, and (re)builds
+    it otherwise; "memory" loads the CSV into a shared-cache in-memory database.
+    """
+    global _memory_keeper
+
+    if mode not in EMBEDDED_MODES:
+        raise ValueError(f"Unknown embedded mode {mode!r}, expected one of: {', '.join(EMBEDDED_MODES)}")
+    if not os.path.isfile(data_file):
+        raise ValueError(f"The embedded mode is built from a single CSV file, got {data_file!r}")
+
+    if mode == "sqlite":
+        path = database_path(data_file)
+        if not EMBEDDED_DB_FILE:
+            private_directory(EMBEDDED_DIR)
+        if os.path.exists(path) and _source_matches(path, data_file):
+            logger.info(f"Serving from embedded database {path}")
+        else:
+            build_database_file(data_file, path)
+        return _read_only_url(path)
+
+    name = f"swift_codes_{uuid.uuid4().hex}"
+    close()
+    _memory_keeper = sqlite3.connect(f"file:{name}?mode=memory&cache=shared", uri=True, check_same_thread=False)
+    url = f"sqlite:///file:{name}?mode=memory&cache=shared&uri=true"
+    engine = create_engine(url)
+    try:
+        count = _load(engine, data_file)
+    finally:
+        engine.dispose()
+    logger.info(f"Loaded {count} codes into an in-memory database")
+    return url
+
+
+def _read_pragmas(dbapi_connection, _) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA mmap_size={EMBEDDED_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size=-{EMBEDDED_CACHE_KB}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+
+def tune_for_reads(engine: Engine) -> None:
+    """Apply the read-only pragmas to every connection `engine` opens."""
+    event.listen(engine, "connect", _read_pragmas)
+
+
+def close() -> None:
+    global _memory_keeper
+
+    if _memory_keeper is not None:
+        _memory_keeper.close()
+        _memory_keeper = None
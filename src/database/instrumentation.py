@@ -0,0 +1,79 @@
+import os
+import time
+import logging
+from contextvars import ContextVar
+from typing import Dict, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.monitoring.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+REPEATED_QUERY_THRESHOLD = int(os.getenv("DB_REPEATED_QUERY_THRESHOLD", "10"))
+
+
+class QueryStats:
+    __slots__ = ("label", "count", "duration", "shapes", "repeated")
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Dict[str, int] = {}
+        self.repeated: Set[str] = set()
+
+
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+_installed = False
+
+
+def install_query_instrumentation() -> None:
+    global _installed
+    if _installed:
+        return
+
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    _installed = True
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context, which is discarded with a failed statement, rather than on
+    # the pooled connection, where the start of a statement that raised would be left behind.
+    if context is not None:
+        context._query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_start_time", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    tracer.record_span("db.query", elapsed, statement=statement)
+
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        parameter_count = len(parameters) if parameters else 0
+        logger.warning(
+            f"Slow query ({elapsed * 1000:.1f} ms, {parameter_count} parameters redacted): {statement}"
+        )
+
+    stats = current_query_stats.get()
+    if stats is None:
+        return
+
+    stats.count += 1
+    stats.duration += elapsed
+
+    repeats = stats.shapes.get(statement, 0) + 1
+    stats.shapes[statement] = repeats
+
+    if repeats > REPEATED_QUERY_THRESHOLD and statement not in stats.repeated:
+        stats.repeated.add(statement)
+        logger.warning(
+            f"Possible N+1 query in {stats.label}: statement executed more than "
+            f"{REPEATED_QUERY_THRESHOLD} times: {statement}"
+        )
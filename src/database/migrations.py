@@ -0,0 +1,73 @@
+import logging
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from src.database.models import SwiftCode, PG_TRGM_EXTENSION
+from src.repositories.swift_repository import SwiftCodeRepository
+
+STATISTICS_COLUMNS = ("code_count", "headquarter_count", "bank_count")
+
+logger = logging.getLogger(__name__)
+
+
+def migrate(engine: Engine) -> None:
+    """
+    Bring an existing schema up to date after `create_all`, which only creates missing tables.
+
+    Moves per-row country names into the `countries` table, drops the old
+    `swift_codes.country_name` column and its single-column index, and creates any
+    missing indexes (on Postgres including the `pg_trgm` extension the trigram indexes need).
+    Adds the aggregate columns to `countries` and computes them, together with `banks`,
+    whenever they are new.
+    """
+    inspector = inspect(engine)
+    if not inspector.has_table("swift_codes"):
+        return
+
+    columns = {column["name"] for column in inspector.get_columns("swift_codes")}
+    indexes = {index["name"] for index in inspector.get_indexes("swift_codes")}
+    country_columns = {column["name"] for column in inspector.get_columns("countries")}
+    refresh_statistics = "country_name" in columns
+
+    with engine.begin() as connection:
+        for column in STATISTICS_COLUMNS:
+            if column not in country_columns:
+                connection.execute(text(f"ALTER TABLE countries ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0"))
+                refresh_statistics = True
+
+        if "country_name" in columns:
+            logger.info("Migrating swift_codes.country_name into the countries table")
+            connection.execute(text(
+                "INSERT INTO countries (iso2, name) "
+                "SELECT country_iso2, MAX(country_name) FROM swift_codes "
+                "WHERE country_iso2 NOT IN (SELECT iso2 FROM countries) "
+                "GROUP BY country_iso2"
+            ))
+            connection.execute(text("ALTER TABLE swift_codes DROP COLUMN country_name"))
+
+        if "ix_swift_codes_country_iso2" in indexes:
+            connection.execute(text("DROP INDEX ix_swift_codes_country_iso2"))
+
+        if engine.dialect.name == "postgresql":
+            connection.execute(PG_TRGM_EXTENSION)
+
+        missing = [index for index in SwiftCode.__table__.indexes if index.name not in indexes]
+        for index in missing:
+            # Indexes limited to another dialect via `ddl_if` are skipped by `create`.
+            index.create(connection)
+        if missing:
+            created = {index["name"] for index in inspect(connection).get_indexes("swift_codes")} - indexes
+            for name in sorted(created):
+                logger.info(f"Created index {name}")
+
+        if engine.dialect.name == "postgresql" and not inspector.get_foreign_keys("swift_codes"):
+            connection.execute(text(
+                "ALTER TABLE swift_codes ADD CONSTRAINT fk_swift_codes_country_iso2 "
+                "FOREIGN KEY (country_iso2) REFERENCES countries (iso2)"
+            ))
+
+        if refresh_statistics:
+            logger.info("Computing country and bank statistics")
+            SwiftCodeRepository.refresh_statistics(Session(bind=connection))
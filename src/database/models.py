@@ -1,12 +1,77 @@
-from sqlalchemy import Column, String, Boolean, Text
+from sqlalchemy import Column, String, Boolean, Text, Integer, ForeignKey, Index, DDL, event
+from sqlalchemy.orm import relationship
 from src.database.db import Base
 
+PG_TRGM_EXTENSION = DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+
+
+class Country(Base):
+    __tablename__ = "countries"
+
+    iso2 = Column(String(2), primary_key=True)
+    name = Column(String(255), nullable=False)
+    # Aggregates maintained by SwiftCodeRepository in the same transaction as every write.
+    code_count = Column(Integer, nullable=False, default=0, server_default="0")
+    headquarter_count = Column(Integer, nullable=False, default=0, server_default="0")
+    bank_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    @property
+    def branch_count(self):
+        return self.code_count - self.headquarter_count
+
+
+class Bank(Base):
+    """One row per institution (BIC8) with its code counts."""
+    __tablename__ = "banks"
+
+    bic8 = Column(String(8), primary_key=True)
+    country_iso2 = Column(String(2), ForeignKey("countries.iso2"), nullable=False)
+    code_count = Column(Integer, nullable=False, default=0, server_default="0")
+    headquarter_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+
 class SwiftCode(Base):
     __tablename__ = "swift_codes"
+    __table_args__ = (
+        # Covers country listings: the listed columns are included so Postgres can answer with an index-only scan.
+        Index(
+            "ix_swift_codes_country_covering",
+            "country_iso2",
+            "swift_code",
+            postgresql_include=["bank_name", "address", "is_headquarter"]
+        ),
+        # Lets Postgres serve `LIKE 'prefix%'` from an index regardless of the database collation.
+        Index(
+            "ix_swift_codes_swift_code_pattern",
+            "swift_code",
+            postgresql_ops={"swift_code": "varchar_pattern_ops"}
+        ).ddl_if(dialect="postgresql"),
+        # Trigram indexes for fuzzy bank-name and address search (`word_similarity`, `<%`).
+        Index(
+            "ix_swift_codes_bank_name_trgm",
+            "bank_name",
+            postgresql_using="gin",
+            postgresql_ops={"bank_name": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_swift_codes_address_trgm",
+            "address",
+            postgresql_using="gin",
+            postgresql_ops={"address": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
 
     swift_code = Column(String(11), primary_key=True, index=True)
     bank_name = Column(String(255), nullable=False)
     address = Column(Text, nullable=True)
-    country_iso2 = Column(String(2), nullable=False, index=True)
-    country_name = Column(String(255), nullable=False)
-    is_headquarter = Column(Boolean, default=False)
\ No newline at end of file
+    country_iso2 = Column(String(2), ForeignKey("countries.iso2"), nullable=False)
+    is_headquarter = Column(Boolean, default=False)
+
+    country = relationship(Country)
+
+    @property
+    def country_name(self):
+        return self.country.name if self.country is not None else None
+
+
+event.listen(SwiftCode.__table__, "before_create", PG_TRGM_EXTENSION)
@@ -0,0 +1,130 @@
+import time
+import threading
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import exc
+from sqlalchemy.pool import Pool, QueuePool
+
+from src.monitoring.tracing import tracer
+
+
+class PoolMetrics:
+
+    def __init__(self, smoothing: float = 0.2):
+        self._smoothing = smoothing
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.recent_wait_seconds = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            self.recent_wait_seconds += self._smoothing * (seconds - self.recent_wait_seconds)
+
+    def record_timeout(self, seconds: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+            self.recent_wait_seconds += self._smoothing * (seconds - self.recent_wait_seconds)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that measures how long callers wait to check out a connection. With `admission`
+    set, a checkout that would queue on this pool while it is saturated is shed instead.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+        self.admission: Optional["AdmissionController"] = None
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        pool.admission = self.admission
+        return pool
+
+    def _do_get(self):
+        if self.admission is not None:
+            self.admission.check(self)
+
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout(time.perf_counter() - start)
+            raise
+
+        wait = time.perf_counter() - start
+        self.metrics.record_wait(wait)
+        tracer.record_span("db.checkout", wait)
+        return connection
+
+
+def pool_stats(pool: Pool) -> Dict[str, Any]:
+    stats: Dict[str, Any] = {"pool": pool.__class__.__name__}
+
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "in_use": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(0, pool.overflow()),
+        })
+
+    metrics: Optional[PoolMetrics] = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update({
+            "checkouts": metrics.checkouts,
+            "checkout_timeouts": metrics.timeouts,
+            "checkout_wait_seconds_total": metrics.wait_seconds_total,
+            "checkout_wait_seconds_max": metrics.wait_seconds_max,
+            "checkout_wait_seconds_recent": metrics.recent_wait_seconds,
+        })
+
+    return stats
+
+
+class AdmissionController:
+    """
+    Sheds load before requests queue up on a saturated connection pool.
+
+    A checkout is rejected with 503 and a Retry-After header when every pooled and
+    overflow connection of its pool is in use and recent checkouts from that pool have
+    waited longer than the configured budget. Checking at checkout time holds each
+    request to the pool that actually serves it: the primary, a replica or a shard.
+    """
+
+    def __init__(self, wait_budget_ms: float, retry_after_seconds: int = 1):
+        self.wait_budget = wait_budget_ms / 1000
+        self.retry_after_seconds = retry_after_seconds
+        self.shed_count = 0
+
+    def should_shed(self, pool: Pool) -> bool:
+        metrics: Optional[PoolMetrics] = getattr(pool, "metrics", None)
+
+        if metrics is None or not isinstance(pool, QueuePool):
+            return False
+
+        max_overflow = pool._max_overflow
+        if max_overflow < 0:
+            return False
+
+        saturated = pool.checkedout() >= pool.size() + max_overflow
+        return saturated and metrics.recent_wait_seconds > self.wait_budget
+
+    def check(self, pool: Pool) -> None:
+        if self.should_shed(pool):
+            self.shed_count += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Database connection pool is saturated, please retry later",
+                headers={"Retry-After": str(self.retry_after_seconds)}
+            )
@@ -0,0 +1,156 @@
+import time
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import ORMExecuteState, Session, sessionmaker
+
+logger = logging.getLogger(__name__)
+
+ROUND_ROBIN = "round_robin"
+LEAST_CONNECTIONS = "least_connections"
+
+
+class Replica:
+
+    def __init__(self, url: str, engine: Engine):
+        self.url = url
+        self.engine = engine
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        self.in_flight = 0
+        self.ejected_until = 0.0
+        self.checked_at = 0.0
+        event.listen(self.session_factory, "do_orm_execute", _fall_back_to_primary)
+
+    def session(self, fallback: Engine) -> Session:
+        """
+        A session on this replica. A statement the replica fails with an OperationalError is
+        run again on `fallback`, and the session stays there; `failed(session)` tells the
+        caller to eject the replica.
+        """
+        return self.session_factory(info={"fallback": fallback})
+
+    @staticmethod
+    def failed(session: Session) -> bool:
+        return session.info.get("replica_failed", False)
+
+
+def _fall_back_to_primary(state: ORMExecuteState):
+    session = state.session
+    fallback = session.info.get("fallback")
+    if fallback is None or session.info.get("replica_failed"):
+        return None
+
+    try:
+        return state.invoke_statement()
+    except OperationalError as e:
+        logger.warning(f"Read replica {session.bind.url!r} failed, retrying on the primary: {e}")
+        session.info["replica_failed"] = True
+        session.rollback()
+        session.bind = fallback
+        return state.invoke_statement()
+
+
+class ReplicaRouter:
+    """
+    Chooses a read replica for each read-only request.
+
+    Replicas are picked round-robin or by fewest in-flight requests. A replica that
+    fails a health probe or a query is ejected for `health_interval` seconds and
+    probed again before it takes traffic. Clients that wrote recently are pinned to
+    the primary for `sticky_seconds`, so they always read their own writes.
+    """
+
+    def __init__(
+            self,
+            engines: Dict[str, Engine],
+            strategy: str = ROUND_ROBIN,
+            health_interval: float = 5.0,
+            sticky_seconds: float = 2.0,
+            clock: Callable[[], float] = time.monotonic
+    ):
+        if strategy not in (ROUND_ROBIN, LEAST_CONNECTIONS):
+            raise ValueError(f"Unknown replica selection strategy: {strategy}")
+
+        self.replicas = [Replica(url, engine) for url, engine in engines.items()]
+        self.strategy = strategy
+        self.health_interval = health_interval
+        self.sticky_seconds = sticky_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._next = 0
+        self._recent_writers: Dict[str, float] = {}
+
+    def record_write(self, client_key: str) -> None:
+        now = self._clock()
+
+        with self._lock:
+            self._recent_writers[client_key] = now + self.sticky_seconds
+
+            if len(self._recent_writers) > 10000:
+                self._recent_writers = {
+                    key: until for key, until in self._recent_writers.items() if until > now
+                }
+
+    def is_sticky(self, client_key: str) -> bool:
+        until = self._recent_writers.get(client_key)
+        return until is not None and until > self._clock()
+
+    def acquire(self) -> Optional[Replica]:
+        with self._lock:
+            candidates = self._ordered_candidates()
+
+        for replica in candidates:
+            if self._is_healthy(replica):
+                with self._lock:
+                    replica.in_flight += 1
+                return replica
+
+        return None
+
+    def release(self, replica: Replica, failed: bool = False) -> None:
+        with self._lock:
+            replica.in_flight -= 1
+
+        if failed:
+            self.eject(replica)
+
+    def eject(self, replica: Replica) -> None:
+        logger.warning(f"Ejecting read replica {replica.engine.url!r} for {self.health_interval}s")
+        replica.ejected_until = self._clock() + self.health_interval
+        replica.checked_at = 0.0
+
+    def dispose(self) -> None:
+        for replica in self.replicas:
+            replica.engine.dispose()
+
+    def _ordered_candidates(self) -> List[Replica]:
+        if self.strategy == LEAST_CONNECTIONS:
+            return sorted(self.replicas, key=lambda replica: replica.in_flight)
+
+        start = self._next
+        self._next = (self._next + 1) % len(self.replicas)
+        return self.replicas[start:] + self.replicas[:start]
+
+    def _is_healthy(self, replica: Replica) -> bool:
+        now = self._clock()
+
+        if replica.ejected_until > now:
+            return False
+
+        if now - replica.checked_at < self.health_interval:
+            return True
+
+        try:
+            with replica.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+        except Exception as e:
+            logger.warning(f"Read replica health check failed: {e}")
+            self.eject(replica)
+            return False
+
+        replica.checked_at = now
+        return True
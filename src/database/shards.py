@@ -0,0 +1,198 @@
+import zlib
+import logging
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, TypeVar
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.horizontal_shard import ShardedSession
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql import operators, visitors
+from sqlalchemy.sql.elements import BindParameter, ColumnClause
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def parse_shard_urls(value: str) -> Dict[str, str]:
+    """Parse `name=url,name=url` into an ordered shard name -> URL mapping."""
+    shards = {}
+    for entry in value.split(","):
+        if entry.strip():
+            name, _, url = entry.partition("=")
+            if not url:
+                raise ValueError(f"Shard entry {entry!r} is not of the form name=url")
+            shards[name.strip()] = url.strip()
+    return shards
+
+
+def parse_country_map(value: str) -> Dict[str, str]:
+    """Parse `PL:eu,DE:eu,US:us` into an ISO2 -> shard name mapping."""
+    countries = {}
+    for entry in value.split(","):
+        if entry.strip():
+            iso2, _, shard = entry.partition(":")
+            countries[iso2.strip().upper()] = shard.strip()
+    return countries
+
+
+def _comparisons(statement: Any, parameters: Optional[Dict[str, Any]] = None) -> List[tuple]:
+    """
+    (column, operator, value) for every `column <op> literal` comparison in the statement's WHERE clause.
+
+    Values passed at execution time (such as the primary key of `Session.get`) take precedence over the bound ones.
+    """
+    parameters = parameters if isinstance(parameters, dict) else {}
+    whereclause = getattr(statement, "whereclause", None)
+    if whereclause is None:
+        return []
+
+    comparisons = []
+
+    def value(bind: BindParameter) -> Any:
+        return parameters[bind.key] if bind.key in parameters else bind.effective_value
+
+    def visit_binary(binary):
+        left, right = binary.left, binary.right
+        if isinstance(left, ColumnClause) and isinstance(right, BindParameter):
+            comparisons.append((left, binary.operator, value(right)))
+        elif isinstance(left, BindParameter) and isinstance(right, ColumnClause):
+            comparisons.append((right, binary.operator, value(left)))
+
+    visitors.traverse(whereclause, {}, {"binary": visit_binary})
+    return comparisons
+
+
+class ShardRouter:
+    """
+    Places every country on one of several databases.
+
+    Countries listed in `countries` go to the named shard; all others are spread by a
+    stable hash of their ISO2 code. A SWIFT code lives on the shard of its
+    `country_iso2`, and characters 5-6 of a code are its country, so lookups by code,
+    by BIC8 or by a code prefix of at least six characters also resolve to one shard.
+
+    `session_factory` creates `ShardedSession`s that route the repository's queries from
+    their WHERE clause and run unkeyed statements on every shard; `fan_out` runs a
+    read or a partitioned load on all shards in parallel.
+    """
+
+    def __init__(self, engines: Dict[str, Engine], countries: Optional[Dict[str, str]] = None):
+        if not engines:
+            raise ValueError("At least one shard is required")
+
+        self.engines = engines
+        self.names = list(engines)
+        self.countries = {iso2.upper(): shard for iso2, shard in (countries or {}).items()}
+
+        unknown = set(self.countries.values()) - set(self.names)
+        if unknown:
+            raise ValueError(f"Country map refers to unknown shard(s): {', '.join(sorted(unknown))}")
+
+        self._sessions = {name: sessionmaker(autocommit=False, autoflush=False, bind=engine)
+                          for name, engine in engines.items()}
+        self._executor = ThreadPoolExecutor(max_workers=len(engines), thread_name_prefix="shard")
+        self.session_factory = sessionmaker(
+            class_=ShardedSession,
+            autocommit=False,
+            autoflush=False,
+            shards=engines,
+            shard_chooser=self._shard_chooser,
+            identity_chooser=self._identity_chooser,
+            execute_chooser=self._execute_chooser,
+            info={"shard_router": self}
+        )
+
+    def shard_for_country(self, country_iso2: str) -> str:
+        country_iso2 = country_iso2.upper()
+        shard = self.countries.get(country_iso2)
+        if shard is None:
+            shard = self.names[zlib.crc32(country_iso2.encode("utf-8")) % len(self.names)]
+        return shard
+
+    def shard_for_code(self, swift_code: str) -> str:
+        return self.shard_for_country(swift_code[4:6])
+
+    @staticmethod
+    def routable(swift_code: str, country_iso2: str) -> bool:
+        """
+        Whether a code can be stored on a shard: keyed reads locate it by characters 5-6 of the
+        code, listings and writes by its country, so the two must agree.
+        """
+        return swift_code[4:6].upper() == country_iso2.upper()
+
+    def partition(self, records: Iterable[T], country: Callable[[T], str]) -> Dict[str, List[T]]:
+        partitions: Dict[str, List[T]] = {}
+        for record in records:
+            partitions.setdefault(self.shard_for_country(country(record)), []).append(record)
+        return partitions
+
+    def fan_out(self, work: Callable[[Session, str], T], shards: Optional[Sequence[str]] = None) -> Dict[str, T]:
+        """Run `work(session, shard)` on each shard in parallel, each with its own session, and collect the results."""
+        shards = list(shards) if shards is not None else self.names
+
+        def run(shard: str) -> T:
+            with self._sessions[shard]() as session:
+                return work(session, shard)
+
+        # Each task runs in a copy of the caller's context so request tracing and query stats follow it.
+        futures = [self._executor.submit(contextvars.copy_context().run, run, shard) for shard in shards]
+        return {shard: future.result() for shard, future in zip(shards, futures)}
+
+    def dispose(self) -> None:
+        self._executor.shutdown(wait=False)
+        for engine in self.engines.values():
+            engine.dispose()
+
+    @staticmethod
+    def of(session: Session) -> Optional["ShardRouter"]:
+        """The router behind a session created by `session_factory`, or None for an unsharded session."""
+        router = session.info.get("shard_router")
+        return router if isinstance(router, ShardRouter) else None
+
+    def _shard_for_instance(self, instance: Any) -> Optional[str]:
+        for attribute in ("country_iso2", "iso2"):
+            value = getattr(instance, attribute, None)
+            if value:
+                return self.shard_for_country(value)
+        return None
+
+    def _shard_chooser(self, mapper, instance, clause=None) -> str:
+        if instance is not None:
+            shard = self._shard_for_instance(instance)
+            if shard is not None:
+                return shard
+        # Statements without an instance only need a bind for its dialect; all shards share one.
+        return self.names[0]
+
+    def _identity_chooser(self, mapper, primary_key, *, lazy_loaded_from, **kw) -> List[str]:
+        if lazy_loaded_from is not None:
+            return [lazy_loaded_from.identity_token]
+
+        (key,) = primary_key
+        if mapper.local_table.name == "countries":
+            return [self.shard_for_country(key)]
+        return [self.shard_for_code(key)]
+
+    def _execute_chooser(self, context) -> List[str]:
+        shards = []
+        for column, operator, value in _comparisons(context.statement, context.parameters):
+            shards.extend(self._shards_for_comparison(column.name, operator, value))
+        return list(dict.fromkeys(shards)) or self.names
+
+    def _shards_for_comparison(self, column: str, operator, value) -> List[str]:
+        if value is None:
+            return []
+        values = list(value) if operator is operators.in_op else [value]
+
+        if column in ("country_iso2", "iso2") and operator in (operators.eq, operators.in_op):
+            return [self.shard_for_country(item) for item in values]
+        if column in ("swift_code", "bic8") and operator in (operators.eq, operators.in_op):
+            return [self.shard_for_code(item) for item in values if len(item) >= 6]
+        if column == "swift_code" and operator is operators.like_op and isinstance(value, str):
+            prefix = value.split("%", 1)[0]
+            return [self.shard_for_code(prefix)] if len(prefix) >= 6 else []
+        if column == "swift_code" and operator is operators.startswith_op and isinstance(value, str):
+            return [self.shard_for_code(value)] if len(value) >= 6 else []
+        return []
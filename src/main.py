@@ -1,31 +1,142 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 import os
+import time
+import asyncio
+import logging
 
-from src.database.db import get_db, engine, Base
+from src.database import db as database
+from src.database.db import get_db, Base, database_pool_stats, RETRY_AFTER_SECONDS
 from src.api.routes import router as swift_router
+from src.api.country_routes import router as country_router
+from src.api.bank_routes import router as bank_router
+from src.api.admin_routes import router as admin_router
+from src.api.middleware import (
+    QueryStatsMiddleware, MetricsMiddleware, TracingMiddleware, ProfilingMiddleware, DeadlineMiddleware
+)
+from src.monitoring.metrics import metrics
+from src.monitoring.tracing import tracer
 from src.services.swift_service import SwiftCodeService
+from src.repositories.swift_repository import SwiftCodeRepository
+from src.repositories.write_batcher import WriteBatcher, WRITE_BATCH_ENABLED
+from src.repositories.directory import OverlayDirectory
+from src.repositories.swift_index import SwiftIndex, INDEX_FILE
+from src.repositories.record_store import MEMORY_DIRECTORY_ENABLED
+from src.repositories.bank_search import BankSearchIndex
+from src.utils.parser import SwiftCodeParser
 from src.database.models import SwiftCode
+from src.database.migrations import migrate
+from src.database.deadlines import DeadlineExceeded, ClientDisconnected
+from src.database import embedded
+
+logger = logging.getLogger(__name__)
+
+
+def seed(data_file: str) -> None:
+    db = next(get_db())
+    try:
+        start = time.perf_counter()
+        db.query(SwiftCode).delete()
+        db.commit()
+        SwiftCodeService.seed_database(db, data_file)
+        metrics.record_duration("seed", time.perf_counter() - start)
+        print(f"Database seeded with SWIFT codes from {data_file}")
+    except Exception as e:
+        print(f"Failed to seed database: {str(e)}")
+    finally:
+        db.close()
 
-Base.metadata.create_all(bind=engine)
+
+def build_bank_index() -> BankSearchIndex:
+    db = next(get_db())
+    try:
+        return BankSearchIndex.from_records(SwiftCodeRepository.get_all_swift_codes(db))
+    finally:
+        db.close()
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     data_file = os.environ.get("SWIFT_DATA_FILE", "data/swift_codes.csv")
+    timings = {}
+
+    if embedded.EMBEDDED_MODE:
+        # Serve from a local database built from the CSV; nothing else needs to be reachable.
+        start = time.perf_counter()
+        url = await asyncio.to_thread(embedded.prepare, data_file)
+        database.init_engine(url, read_only_mode=True)
+        embedded.tune_for_reads(database.engine)
+        timings["embedded"] = time.perf_counter() - start
+        logger.info(f"Serving read-only from an embedded {embedded.EMBEDDED_MODE} database")
+
+    start = time.perf_counter()
+    await database.wait_for_database()
+    timings["connect"] = time.perf_counter() - start
 
-    if os.path.exists(data_file):
-        db = next(get_db())
-        try:
-            db.query(SwiftCode).delete()
-            db.commit()
-            SwiftCodeService.seed_database(db, data_file)
-            print(f"Database seeded with SWIFT codes from {data_file}")
-        except Exception as e:
-            print(f"Failed to seed database: {str(e)}")
+    if not database.read_only:
+        start = time.perf_counter()
+        for bind in database.all_engines():
+            await asyncio.to_thread(Base.metadata.create_all, bind=bind)
+            await asyncio.to_thread(migrate, bind)
+        timings["schema"] = time.perf_counter() - start
+
+    if SwiftCodeParser.resolve_sources(data_file):
+        if not database.read_only:
+            start = time.perf_counter()
+            await asyncio.to_thread(seed, data_file)
+            timings["seed"] = time.perf_counter() - start
+
+        # The index and the in-memory directory are built from a single CSV.
+        single_file = os.path.isfile(data_file)
+        if INDEX_FILE and single_file:
+            start = time.perf_counter()
+            index = await asyncio.to_thread(SwiftIndex.open_for, data_file, INDEX_FILE)
+            # Workers share writes through a journal next to the index. Seeding just reset the
+            # database to the CSV, so writes recorded before it are gone and the journal starts empty.
+            journal = f"{INDEX_FILE}.journal"
+            if not database.read_only:
+                OverlayDirectory.reset_journal(journal)
+            SwiftCodeService.directory = OverlayDirectory(index, journal)
+            timings["index"] = time.perf_counter() - start
+            logger.info(f"Serving reads from SWIFT index {INDEX_FILE} ({len(index)} codes)")
+        elif MEMORY_DIRECTORY_ENABLED and single_file:
+            start = time.perf_counter()
+            records = await asyncio.to_thread(SwiftCodeParser.parse_csv, data_file)
+            SwiftCodeService.directory = OverlayDirectory(records)
+            timings["directory"] = time.perf_counter() - start
+            logger.info(f"Serving reads from an in-memory record store ({len(records)} codes)")
+
+    if database.engine.dialect.name != "postgresql":
+        # Postgres answers bank searches from its trigram indexes; elsewhere search in process.
+        start = time.perf_counter()
+        SwiftCodeService.bank_index = await asyncio.to_thread(build_bank_index)
+        timings["search index"] = time.perf_counter() - start
+
+    if WRITE_BATCH_ENABLED and not database.read_only:
+        SwiftCodeRepository.write_batcher = WriteBatcher(database.session_factory())
+
+    breakdown = ", ".join(f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in timings.items())
+    logger.info(f"Startup complete in {sum(timings.values()) * 1000:.0f} ms ({breakdown})")
 
     yield
 
+    if SwiftCodeRepository.write_batcher is not None:
+        SwiftCodeRepository.write_batcher.close()
+        SwiftCodeRepository.write_batcher = None
+
+    SwiftCodeService.bank_index = None
+
+    if SwiftCodeService.directory is not None:
+        if isinstance(SwiftCodeService.directory.base, SwiftIndex):
+            SwiftCodeService.directory.base.close()
+        SwiftCodeService.directory = None
+
+    database.dispose_engine()
+    embedded.close()
+    tracer.close()
+
 app = FastAPI(
     title="SWIFT Codes API",
     description="API for managing SWIFT/BIC codes for banks",
@@ -33,7 +144,44 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+app.add_middleware(DeadlineMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
+app.add_middleware(ProfilingMiddleware)
 app.include_router(swift_router)
+app.include_router(country_router)
+app.include_router(bank_router)
+app.include_router(admin_router)
+
+
+@app.exception_handler(PoolTimeoutError)
+def pool_timeout_handler(_: Request, __: PoolTimeoutError):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Timed out waiting for a database connection, please retry later"},
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+    )
+
+
+@app.exception_handler(DeadlineExceeded)
+def deadline_exceeded_handler(_: Request, exc: DeadlineExceeded):
+    if exc.started:
+        return JSONResponse(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            content={"detail": f"The database did not answer within the {exc.budget_ms:.0f} ms budget"}
+        )
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": f"The {exc.budget_ms:.0f} ms budget ran out before the database was reached, please retry later"},
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+    )
+
+
+@app.exception_handler(ClientDisconnected)
+def client_disconnected_handler(_: Request, __: ClientDisconnected):
+    # Nobody reads this response; 499 (client closed request) keeps the cancellations apart in metrics.
+    return JSONResponse(status_code=499, content={"detail": "Client closed the request"})
 
 
 @app.get("/", tags=["health"])
@@ -41,6 +189,16 @@ def health_check():
     return {"status": "ok", "message": "SWIFT Codes API is running"}
 
 
+@app.get("/health/pool", tags=["health"])
+def pool_health():
+    return database_pool_stats()
+
+
+@app.get("/metrics", tags=["health"], response_class=PlainTextResponse)
+def prometheus_metrics():
+    return metrics.render(database_pool_stats())
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("src.main:app", host="0.0.0.0", port=8080, reload=True)
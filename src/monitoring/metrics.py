@@ -0,0 +1,224 @@
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+POOL_COUNTERS = {
+    "checkouts": "swift_db_pool_checkouts_total",
+    "checkout_timeouts": "swift_db_pool_checkout_timeouts_total",
+    "checkout_wait_seconds_total": "swift_db_pool_checkout_wait_seconds_total",
+}
+
+POOL_GAUGES = {
+    "size": "swift_db_pool_size",
+    "max_overflow": "swift_db_pool_max_overflow",
+    "in_use": "swift_db_pool_in_use",
+    "idle": "swift_db_pool_idle",
+    "overflow": "swift_db_pool_overflow",
+    "checkout_wait_seconds_max": "swift_db_pool_checkout_wait_seconds_max",
+    "checkout_wait_seconds_recent": "swift_db_pool_checkout_wait_seconds_recent",
+}
+
+
+class RouteStats:
+    __slots__ = ("buckets", "count", "total", "statuses")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.statuses: Dict[int, int] = {}
+
+
+class MetricsRegistry:
+    """
+    Process-wide request, cache and ingest metrics rendered in Prometheus text format.
+
+    Updates are plain integer and float increments on preallocated slots with no
+    locking; a lost increment under a rare race is an acceptable trade for keeping
+    the request path free of contention.
+    """
+
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str], RouteStats] = {}
+        self.in_flight = 0
+        self.caches: Dict[str, List[int]] = {}
+        self.durations: Dict[str, List[float]] = {}
+        self.deadlines: Dict[str, int] = {}
+        self.stream_connections = 0
+        self.stream_lookups = RouteStats()
+        self.stream_batches = [0, 0]
+        self.stream_throttled = 0
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        key = (method, route)
+        stats = self.routes.get(key)
+        if stats is None:
+            stats = self.routes.setdefault(key, RouteStats())
+
+        stats.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        stats.count += 1
+        stats.total += seconds
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def record_cache(self, cache: str, hit: bool) -> None:
+        counters = self.caches.get(cache)
+        if counters is None:
+            counters = self.caches.setdefault(cache, [0, 0])
+        counters[0 if hit else 1] += 1
+
+    def record_deadline(self, reason: str) -> None:
+        self.deadlines[reason] = self.deadlines.get(reason, 0) + 1
+
+    def record_stream_lookup(self, status: int, seconds: float) -> None:
+        stats = self.stream_lookups
+        stats.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        stats.count += 1
+        stats.total += seconds
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def record_stream_batch(self, codes: int) -> None:
+        self.stream_batches[0] += 1
+        self.stream_batches[1] += codes
+
+    def record_stream_throttled(self) -> None:
+        self.stream_throttled += 1
+
+    def record_duration(self, stage: str, seconds: float) -> None:
+        durations = self.durations.setdefault(stage, [0.0, 0.0, 0.0])
+        durations[0] = seconds
+        durations[1] += seconds
+        durations[2] += 1
+
+    def render(self, pool_stats: Optional[Dict[str, Any]] = None) -> str:
+        lines: List[str] = []
+
+        lines.append("# HELP swift_http_requests_in_flight Requests currently being served.")
+        lines.append("# TYPE swift_http_requests_in_flight gauge")
+        lines.append(f"swift_http_requests_in_flight {self.in_flight}")
+
+        lines.append("# HELP swift_http_requests_total Requests served by route template and status code.")
+        lines.append("# TYPE swift_http_requests_total counter")
+        for (method, route), stats in sorted(self.routes.items()):
+            for status, count in sorted(stats.statuses.items()):
+                lines.append(
+                    f'swift_http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}'
+                )
+
+        lines.append("# HELP swift_http_request_duration_seconds Request latency by route template.")
+        lines.append("# TYPE swift_http_request_duration_seconds histogram")
+        for (method, route), stats in sorted(self.routes.items()):
+            labels = f'method="{method}",route="{route}"'
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+                cumulative += count
+                lines.append(f'swift_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'swift_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.count}')
+            lines.append(f"swift_http_request_duration_seconds_sum{{{labels}}} {stats.total}")
+            lines.append(f"swift_http_request_duration_seconds_count{{{labels}}} {stats.count}")
+
+        if self.caches:
+            lines.append("# HELP swift_cache_hits_total Cache hits by cache name.")
+            lines.append("# TYPE swift_cache_hits_total counter")
+            lines.extend(f'swift_cache_hits_total{{cache="{name}"}} {hits}' for name, (hits, _) in sorted(self.caches.items()))
+            lines.append("# HELP swift_cache_misses_total Cache misses by cache name.")
+            lines.append("# TYPE swift_cache_misses_total counter")
+            lines.extend(
+                f'swift_cache_misses_total{{cache="{name}"}} {misses}' for name, (_, misses) in sorted(self.caches.items())
+            )
+            lines.append("# HELP swift_cache_hit_ratio Share of cache lookups answered from the cache.")
+            lines.append("# TYPE swift_cache_hit_ratio gauge")
+            for name, (hits, misses) in sorted(self.caches.items()):
+                ratio = hits / (hits + misses) if hits + misses else 0.0
+                lines.append(f'swift_cache_hit_ratio{{cache="{name}"}} {ratio}')
+
+        if self.durations:
+            lines.append("# HELP swift_ingest_last_duration_seconds Duration of the latest seed/ingest stage run.")
+            lines.append("# TYPE swift_ingest_last_duration_seconds gauge")
+            lines.extend(
+                f'swift_ingest_last_duration_seconds{{stage="{stage}"}} {last}'
+                for stage, (last, _, _) in sorted(self.durations.items())
+            )
+            lines.append("# HELP swift_ingest_duration_seconds Total time spent in seed/ingest stages.")
+            lines.append("# TYPE swift_ingest_duration_seconds summary")
+            for stage, (_, total, count) in sorted(self.durations.items()):
+                lines.append(f'swift_ingest_duration_seconds_sum{{stage="{stage}"}} {total}')
+                lines.append(f'swift_ingest_duration_seconds_count{{stage="{stage}"}} {int(count)}')
+
+        if self.deadlines:
+            lines.append("# HELP swift_db_statements_cancelled_total Statements stopped by a request deadline or disconnect.")
+            lines.append("# TYPE swift_db_statements_cancelled_total counter")
+            lines.extend(
+                f'swift_db_statements_cancelled_total{{reason="{reason}"}} {count}'
+                for reason, count in sorted(self.deadlines.items())
+            )
+
+        if self.stream_connections or self.stream_lookups.count:
+            lines.extend(self._render_stream())
+
+        if pool_stats:
+            lines.extend(self._render_pools(pool_stats))
+
+        return "\n".join(lines) + "\n"
+
+    def _render_stream(self) -> List[str]:
+        stats = self.stream_lookups
+        lines = [
+            "# HELP swift_stream_connections Open lookup stream connections.",
+            "# TYPE swift_stream_connections gauge",
+            f"swift_stream_connections {self.stream_connections}",
+            "# HELP swift_stream_lookups_total Streamed lookups by reply status.",
+            "# TYPE swift_stream_lookups_total counter",
+        ]
+        lines.extend(f'swift_stream_lookups_total{{status="{status}"}} {count}' for status, count in sorted(stats.statuses.items()))
+
+        lines.append("# HELP swift_stream_lookup_duration_seconds Time from receiving a streamed lookup to queueing its reply.")
+        lines.append("# TYPE swift_stream_lookup_duration_seconds histogram")
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+            cumulative += count
+            lines.append(f'swift_stream_lookup_duration_seconds_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'swift_stream_lookup_duration_seconds_bucket{{le="+Inf"}} {stats.count}')
+        lines.append(f"swift_stream_lookup_duration_seconds_sum {stats.total}")
+        lines.append(f"swift_stream_lookup_duration_seconds_count {stats.count}")
+
+        batches, codes = self.stream_batches
+        lines.append("# HELP swift_stream_db_batches_total Database queries issued for streamed lookup misses.")
+        lines.append("# TYPE swift_stream_db_batches_total counter")
+        lines.append(f"swift_stream_db_batches_total {batches}")
+        lines.append("# HELP swift_stream_db_batch_codes_total Codes looked up by those queries.")
+        lines.append("# TYPE swift_stream_db_batch_codes_total counter")
+        lines.append(f"swift_stream_db_batch_codes_total {codes}")
+        lines.append("# HELP swift_stream_throttled_total Times a connection hit its in-flight limit and reading paused.")
+        lines.append("# TYPE swift_stream_throttled_total counter")
+        lines.append(f"swift_stream_throttled_total {self.stream_throttled}")
+        return lines
+
+    @staticmethod
+    def _render_pools(pool_stats: Dict[str, Any]) -> List[str]:
+        pools = {}
+        shards = pool_stats.get("shards") or {}
+        # With shards the primary engine is the first shard's; it is reported under its shard name.
+        if pool_stats.get("primary") and not shards:
+            pools["primary"] = pool_stats["primary"]
+        for name, stats in shards.items():
+            pools[name] = stats
+        for name, stats in (pool_stats.get("replicas") or {}).items():
+            pools[name] = stats
+
+        lines = []
+        for key, metric in {**POOL_GAUGES, **POOL_COUNTERS}.items():
+            samples = [(name, stats[key]) for name, stats in pools.items() if key in stats]
+            if not samples:
+                continue
+            lines.append(f"# TYPE {metric} {'counter' if key in POOL_COUNTERS else 'gauge'}")
+            lines.extend(f'{metric}{{engine="{name}"}} {value}' for name, value in samples)
+
+        if "shed_requests" in pool_stats:
+            lines.append("# TYPE swift_db_admission_shed_total counter")
+            lines.append(f"swift_db_admission_shed_total {pool_stats['shed_requests']}")
+
+        return lines
+
+
+metrics = MetricsRegistry()
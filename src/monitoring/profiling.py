@@ -0,0 +1,193 @@
+import io
+import os
+import sys
+import time
+import uuid
+import pstats
+import cProfile
+import asyncio
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Optional
+
+from fastapi.routing import APIRoute
+
+PROFILE_STORE_SIZE = int(os.getenv("PROFILE_STORE_SIZE", "50"))
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+PROFILE_TOP_FUNCTIONS = 40
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+current_request_profile: ContextVar[Optional[cProfile.Profile]] = ContextVar("current_request_profile", default=None)
+
+
+class ProfileStore:
+
+    def __init__(self, max_size: int = PROFILE_STORE_SIZE):
+        self.max_size = max_size
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, profile: Dict[str, Any]) -> None:
+        with self._lock:
+            self._profiles[profile["id"]] = profile
+            self._profiles.move_to_end(profile["id"])
+            while len(self._profiles) > self.max_size:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+
+profile_store = ProfileStore()
+
+
+def new_profile_id() -> str:
+    return uuid.uuid4().hex
+
+
+def profiled(endpoint: Callable) -> Callable:
+    """Run a route endpoint under the request's cProfile profiler, if one is active."""
+
+    if asyncio.iscoroutinefunction(endpoint):
+        @wraps(endpoint)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            profile = current_request_profile.get()
+            if profile is None:
+                return await endpoint(*args, **kwargs)
+            profile.enable()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                profile.disable()
+
+        return async_wrapper
+
+    @wraps(endpoint)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        profile = current_request_profile.get()
+        if profile is None:
+            return endpoint(*args, **kwargs)
+        return profile.runcall(endpoint, *args, **kwargs)
+
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """APIRoute whose endpoint can be profiled per request via `X-Profile: 1`."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs: Any):
+        super().__init__(path, profiled(endpoint), **kwargs)
+
+
+def summarize_request_profile(profile_id: str, label: str, profile: cProfile.Profile, duration: float) -> Dict[str, Any]:
+    output = io.StringIO()
+    stats = pstats.Stats(profile, stream=output)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PROFILE_TOP_FUNCTIONS)
+
+    functions = [
+        {
+            "function": f"{filename}:{line}({name})",
+            "calls": calls,
+            "totalTime": total_time,
+            "cumulativeTime": cumulative_time,
+        }
+        for (filename, line, name), (_, calls, total_time, cumulative_time, _) in stats.stats.items()
+    ]
+    functions.sort(key=lambda function: function["cumulativeTime"], reverse=True)
+
+    return {
+        "id": profile_id,
+        "kind": "request",
+        "status": "complete",
+        "request": label,
+        "durationSeconds": duration,
+        "functions": functions[:PROFILE_TOP_FUNCTIONS],
+        "callTree": output.getvalue(),
+    }
+
+
+class SamplingProfiler:
+    """
+    Time-boxed statistical profiler.
+
+    A background thread snapshots the stacks of every thread at a fixed interval and
+    aggregates the ones that pass through application code into collapsed stacks
+    (`outer;inner;leaf count`), the input format of flame graph tools.
+    """
+
+    _lock = threading.Lock()
+    _active: Optional["SamplingProfiler"] = None
+
+    def __init__(self, seconds: float, interval_ms: float = PROFILE_SAMPLE_INTERVAL_MS, store: ProfileStore = profile_store):
+        self.id = new_profile_id()
+        self.seconds = seconds
+        self.interval = interval_ms / 1000
+        self.store = store
+        self.samples = 0
+        self.stacks: Dict[str, int] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def start(cls, seconds: float, **kwargs: Any) -> Optional["SamplingProfiler"]:
+        with cls._lock:
+            if cls._active is not None:
+                return None
+            profiler = cls(seconds, **kwargs)
+            cls._active = profiler
+
+        profiler.store.put(profiler._result("running"))
+        profiler._thread = threading.Thread(target=profiler._run, name="swift-sampling-profiler", daemon=True)
+        profiler._thread.start()
+        return profiler
+
+    def join(self) -> None:
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        try:
+            own_thread = threading.get_ident()
+            deadline = time.monotonic() + self.seconds
+
+            while time.monotonic() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id != own_thread:
+                        self._sample(frame)
+                self.samples += 1
+                time.sleep(self.interval)
+
+            self.store.put(self._result("complete"))
+        finally:
+            with SamplingProfiler._lock:
+                SamplingProfiler._active = None
+
+    def _sample(self, frame) -> None:
+        stack = []
+        in_app = False
+
+        while frame is not None:
+            code = frame.f_code
+            if code.co_filename.startswith(APP_ROOT) and code.co_filename != __file__:
+                in_app = True
+            stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+
+        if in_app:
+            key = ";".join(reversed(stack))
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+
+    def _result(self, status: str) -> Dict[str, Any]:
+        collapsed = sorted(self.stacks.items(), key=lambda item: item[1], reverse=True)
+        return {
+            "id": self.id,
+            "kind": "sampling",
+            "status": status,
+            "durationSeconds": self.seconds,
+            "intervalMs": self.interval * 1000,
+            "samples": self.samples,
+            "collapsedStacks": "\n".join(f"{stack} {count}" for stack, count in collapsed),
+        }
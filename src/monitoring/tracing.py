@@ -0,0 +1,272 @@
+import os
+import json
+import queue
+import random
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+TRACE_EXPORT_FILE = os.getenv("TRACE_EXPORT_FILE", "traces.jsonl")
+TRACE_EXPORT_QUEUE_SIZE = int(os.getenv("TRACE_EXPORT_QUEUE_SIZE", "10000"))
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes")
+
+    def __init__(self, trace_id: str, parent_id: Optional[str], name: str, start_ns: int, attributes: Dict[str, Any]):
+        self.trace_id = trace_id
+        self.span_id = random.getrandbits(64).to_bytes(8, "big").hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = start_ns
+        self.end_ns = start_ns
+        self.attributes = attributes
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentId": self.parent_id,
+            "name": self.name,
+            "start": self.start_ns,
+            "durationMs": (self.end_ns - self.start_ns) / 1_000_000,
+            "attributes": self.attributes,
+        }
+
+
+class Trace:
+
+    def __init__(self, trace_id: str, parent_id: Optional[str]):
+        self.trace_id = trace_id
+        self.parent_id = parent_id
+        self.spans: List[Span] = []
+        self.root: Optional[Span] = None
+        self.handler_end_ns: Optional[int] = None
+
+
+current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class SpanExporter(ABC):
+
+    @abstractmethod
+    def export(self, spans: List[Span]) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+class JsonLinesFileExporter(SpanExporter):
+    """
+    Appends spans to a JSON-lines file from a background thread, so the request that finished
+    a trace never waits on the disk. Traces arriving while `max_queued` are still waiting to
+    be written are dropped and counted in `dropped`.
+    """
+
+    def __init__(self, path: str, max_queued: int = TRACE_EXPORT_QUEUE_SIZE):
+        self.path = path
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[List[Span]]]" = queue.Queue(maxsize=max(1, max_queued))
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+
+    def export(self, spans: List[Span]) -> None:
+        with self._lock:
+            if self._closed:
+                self._write([spans])
+                return
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._worker.start()
+
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        """Write out the queued traces; later exports are written synchronously."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            worker = self._worker
+
+        if worker is not None:
+            self._queue.put(None)
+            worker.join()
+
+    def _run(self) -> None:
+        running = True
+
+        while running:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            running = None not in batch
+            self._write([spans for spans in batch if spans is not None])
+
+    def _write(self, batch: List[List[Span]]) -> None:
+        lines = "".join(json.dumps(span.to_dict()) + "\n" for spans in batch for span in spans)
+        if not lines:
+            return
+        try:
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(lines)
+        except OSError as e:
+            logger.error(f"Failed to write traces to {self.path}: {e}")
+
+
+class InMemoryExporter(SpanExporter):
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, spans: List[Span]) -> None:
+        self.spans.extend(spans)
+
+
+def parse_traceparent(header: Optional[str]):
+    """Parse a W3C `traceparent` header into (trace_id, parent_span_id, sampled)."""
+    if not header:
+        return None
+
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+
+    try:
+        int(parts[1], 16)
+        int(parts[2], 16)
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+
+    return parts[1], parts[2], bool(flags & 1)
+
+
+class Tracer:
+    """
+    Minimal request tracer.
+
+    A trace is started per sampled request; spans opened anywhere on the request's
+    context (including threadpool workers, which inherit it) are collected on the
+    trace and handed to the exporter once the response has been sent.
+    """
+
+    def __init__(self, sample_rate: float = TRACE_SAMPLE_RATE, exporter: Optional[SpanExporter] = None):
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def start_trace(self, traceparent: Optional[str] = None) -> Optional[Trace]:
+        if self.exporter is None:
+            return None
+
+        parent = parse_traceparent(traceparent)
+        if parent is not None:
+            trace_id, parent_id, sampled = parent
+        else:
+            trace_id, parent_id = random.getrandbits(128).to_bytes(16, "big").hex(), None
+            sampled = random.random() < self.sample_rate
+
+        if not sampled:
+            return None
+
+        return Trace(trace_id, parent_id)
+
+    def close(self) -> None:
+        if self.exporter is not None:
+            self.exporter.close()
+
+    def finish_trace(self, trace: Trace) -> None:
+        try:
+            self.exporter.export(trace.spans)
+        except Exception as e:
+            logger.error(f"Failed to export trace {trace.trace_id}: {e}")
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+        trace = current_trace.get()
+        if trace is None:
+            yield None
+            return
+
+        parent = current_span.get()
+        span = Span(trace.trace_id, parent.span_id if parent else trace.parent_id, name, time.time_ns(), attributes)
+        trace.spans.append(span)
+        if trace.root is None:
+            trace.root = span
+
+        token = current_span.set(span)
+        try:
+            yield span
+        finally:
+            current_span.reset(token)
+            span.end_ns = time.time_ns()
+            if name.startswith("service."):
+                trace.handler_end_ns = span.end_ns
+
+    def record_span(self, name: str, duration: float, **attributes: Any) -> None:
+        trace = current_trace.get()
+        if trace is None:
+            return
+
+        end_ns = time.time_ns()
+        self._record(trace, name, end_ns - int(duration * 1_000_000_000), end_ns, attributes)
+
+    def record_since_request_start(self, name: str) -> None:
+        trace = current_trace.get()
+        if trace is None or trace.root is None:
+            return
+
+        self._record(trace, name, trace.root.start_ns, time.time_ns(), {})
+
+    def record_serialization(self) -> None:
+        trace = current_trace.get()
+        if trace is None or trace.handler_end_ns is None:
+            return
+
+        self._record(trace, "response.serialize", trace.handler_end_ns, time.time_ns(), {})
+
+    def _record(self, trace: Trace, name: str, start_ns: int, end_ns: int, attributes: Dict[str, Any]) -> None:
+        parent = current_span.get()
+        span = Span(trace.trace_id, parent.span_id if parent else trace.parent_id, name, start_ns, attributes)
+        span.end_ns = end_ns
+        trace.spans.append(span)
+
+
+def traced(name: str) -> Callable:
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if current_trace.get() is None:
+                return func(*args, **kwargs)
+            with tracer.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+tracer = Tracer(exporter=JsonLinesFileExporter(TRACE_EXPORT_FILE) if TRACE_SAMPLE_RATE > 0 else None)
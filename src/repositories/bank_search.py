@@ -0,0 +1,200 @@
+import re
+import math
+import threading
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set
+
+# Minimum share of the query's trigrams a bank name or address must contain to match,
+# the in-process counterpart of `pg_trgm.word_similarity_threshold`.
+MIN_SIMILARITY = 0.5
+# Upper bound on the distinct strings scored per query, which bounds query latency.
+MAX_CANDIDATES = 2000
+# A posting list longer than this many times the candidate count is binary-searched per candidate.
+PROBE_RATIO = 16
+# Tombstoned codes are compacted away once they outnumber both this and the live codes.
+COMPACT_MIN_DELETED = 1024
+
+WORD = re.compile(r"\w+")
+EMPTY = array("I")
+
+
+def trigrams(text: str) -> Set[str]:
+    """Trigrams of `text` the way pg_trgm extracts them: per lower-cased word, padded with two spaces in front and one behind."""
+    grams = set()
+    for word in WORD.findall(text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _contains(posting: array, string_id: int) -> bool:
+    position = bisect_left(posting, string_id)
+    return position < len(posting) and posting[position] == string_id
+
+
+class BankMatch(NamedTuple):
+    swift_code: str
+    bank_name: str
+    address: str
+    country_iso2: str
+    is_headquarter: bool
+    score: float
+
+
+class BankSearchIndex:
+    """
+    In-process trigram inverted index over bank names and addresses.
+
+    Distinct strings are indexed once and map to the codes that use them, so a bank
+    name shared by hundreds of branches costs one posting entry per trigram. A query
+    only collects candidates from its rarest trigrams: a string containing at least
+    `MIN_SIMILARITY` of the query's trigrams must contain one of them. The
+    `MAX_CANDIDATES` strings with the most hits among those rare trigrams are then scored
+    by counting their hits in every query trigram's posting list. For queries made only of
+    very common trigrams this can miss a match ranked below the cut-off, which is the price
+    of the latency bound.
+
+    Writes are applied incrementally; deleted codes are tombstoned, and the index is
+    rebuilt from its live codes once tombstones outnumber them.
+    """
+
+    def __init__(self):
+        self._strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+        self._string_codes: List[List[int]] = []
+        self._postings: Dict[str, array] = {}
+
+        self._codes: List[str] = []
+        self._code_ids: Dict[str, int] = {}
+        self._bank_names = array("I")
+        self._addresses = array("I")
+        self._countries: List[str] = []
+        self._headquarters = bytearray()
+        self._deleted: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._code_ids)
+
+    def _string_id(self, text: str) -> int:
+        string_id = self._string_ids.get(text)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._string_ids[text] = string_id
+            self._strings.append(text)
+            self._string_codes.append([])
+            for gram in trigrams(text):
+                posting = self._postings.get(gram)
+                if posting is None:
+                    posting = self._postings[gram] = array("I")
+                posting.append(string_id)
+        return string_id
+
+    def _add(self, record: Any, keep_sorted: bool = True) -> None:
+        previous = self._code_ids.get(record.swift_code)
+        if previous is not None:
+            self._deleted.add(previous)
+
+        code_id = len(self._codes)
+        self._code_ids[record.swift_code] = code_id
+        self._codes.append(record.swift_code)
+        self._countries.append(record.country_iso2)
+        self._headquarters.append(bool(record.is_headquarter))
+
+        bank_name = self._string_id(record.bank_name)
+        address = self._string_id(record.address or "")
+        self._bank_names.append(bank_name)
+        self._addresses.append(address)
+        for string_id in {bank_name, address}:
+            if keep_sorted:
+                insort(self._string_codes[string_id], code_id, key=self._codes.__getitem__)
+            else:
+                self._string_codes[string_id].append(code_id)
+
+    def add(self, record: Any) -> None:
+        with self._lock:
+            self._add(record)
+            self._compact_if_needed()
+
+    def remove(self, swift_code: str) -> None:
+        with self._lock:
+            code_id = self._code_ids.pop(swift_code, None)
+            if code_id is not None:
+                self._deleted.add(code_id)
+                self._compact_if_needed()
+
+    def _compact_if_needed(self) -> None:
+        if len(self._deleted) <= max(COMPACT_MIN_DELETED, len(self._code_ids)):
+            return
+
+        live = BankSearchIndex.from_records(self._match(code_id, 0.0) for code_id in self._code_ids.values())
+        for name, value in vars(live).items():
+            if name != "_lock":
+                setattr(self, name, value)
+
+    def search(self, query: str, limit: int, country_iso2: Optional[str] = None) -> List[BankMatch]:
+        grams = trigrams(query)
+        if not grams:
+            return []
+        country_iso2 = country_iso2.upper() if country_iso2 else None
+
+        with self._lock:
+            postings = sorted((self._postings.get(gram, EMPTY) for gram in grams), key=len)
+            required = math.ceil(len(grams) * MIN_SIMILARITY)
+
+            rare: Counter = Counter()
+            for posting in postings[:len(grams) - required + 1]:
+                rare.update(posting)
+            if len(rare) > MAX_CANDIDATES:
+                candidates = {string_id for string_id, _ in rare.most_common(MAX_CANDIDATES)}
+            else:
+                candidates = set(rare)
+
+            # Postings are sorted by string id, so long ones are probed per candidate instead of scanned.
+            hits: Counter = Counter()
+            for posting in postings:
+                if len(posting) <= len(candidates) * PROBE_RATIO:
+                    hits.update(candidates.intersection(posting))
+                else:
+                    hits.update(string_id for string_id in candidates if _contains(posting, string_id))
+
+            scored = sorted(
+                (-count / len(grams), len(self._strings[string_id]), string_id)
+                for string_id, count in hits.items() if count >= required
+            )
+
+            matches: List[BankMatch] = []
+            seen: Set[int] = set()
+            for negative_score, _, string_id in scored:
+                for code_id in self._string_codes[string_id]:
+                    if code_id in seen or code_id in self._deleted:
+                        continue
+                    if country_iso2 is not None and self._countries[code_id] != country_iso2:
+                        continue
+                    seen.add(code_id)
+                    matches.append(self._match(code_id, -negative_score))
+                    if len(matches) == limit:
+                        return matches
+            return matches
+
+    def _match(self, code_id: int, score: float) -> BankMatch:
+        return BankMatch(
+            swift_code=self._codes[code_id],
+            bank_name=self._strings[self._bank_names[code_id]],
+            address=self._strings[self._addresses[code_id]],
+            country_iso2=self._countries[code_id],
+            is_headquarter=bool(self._headquarters[code_id]),
+            score=score,
+        )
+
+    @classmethod
+    def from_records(cls, records: Iterable[Any]) -> "BankSearchIndex":
+        """Build an index from records exposing `swift_code`, `bank_name`, `address`, `country_iso2` and `is_headquarter`."""
+        index = cls()
+        for record in records:
+            index._add(record, keep_sorted=False)
+        for codes in index._string_codes:
+            codes.sort(key=index._codes.__getitem__)
+        return index
@@ -0,0 +1,164 @@
+import os
+import json
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Protocol, Set, Tuple
+
+
+class SwiftRecord(NamedTuple):
+    swift_code: str
+    bank_name: str
+    address: str
+    country_iso2: str
+    country_name: str
+    is_headquarter: bool
+
+
+class SwiftDirectory(Protocol):
+    """Read-only in-process SWIFT directory, an alternative read source to the database."""
+
+    def get(self, swift_code: str) -> Optional[SwiftRecord]:
+        ...
+
+    def branches(self, headquarters_code: str) -> List[SwiftRecord]:
+        ...
+
+    def country(self, country_iso2: str) -> List[SwiftRecord]:
+        ...
+
+    def search_prefix(self, prefix: str, limit: int) -> List[SwiftRecord]:
+        ...
+
+    def __len__(self) -> int:
+        ...
+
+
+def is_branch_of(record: SwiftRecord, headquarters_code: str) -> bool:
+    return (
+        record.swift_code[:8] == headquarters_code[:8]
+        and record.swift_code != headquarters_code
+        and not record.is_headquarter
+    )
+
+
+class OverlayDirectory:
+    """
+    Applies writes on top of an immutable directory.
+
+    Writes still go to the database first; the overlay makes them visible to reads served
+    from the directory until the directory is rebuilt. Without a journal only this process
+    sees them. With `journal`, a file shared by every worker serving the same directory,
+    each write is appended to it and every worker replays new entries before a read, so
+    all workers answer alike.
+    """
+
+    def __init__(self, base: SwiftDirectory, journal: Optional[str] = None):
+        self.base = base
+        self._added: Dict[str, SwiftRecord] = {}
+        self._removed: Set[str] = set()
+        self._lock = threading.Lock()
+        self._journal = journal
+        self._journal_id: Optional[Tuple[int, int]] = None
+        self._offset = 0
+
+    @staticmethod
+    def reset_journal(journal: str) -> None:
+        """Start an empty journal; workers replaying the previous one drop its writes."""
+        temp = f"{journal}.{os.getpid()}.tmp"
+        open(temp, "wb").close()
+        os.replace(temp, journal)
+
+    def put(self, record: SwiftRecord) -> None:
+        self._write({"op": "put", "record": list(record)})
+
+    def remove(self, swift_code: str) -> None:
+        self._write({"op": "remove", "swift_code": swift_code})
+
+    def get(self, swift_code: str) -> Optional[SwiftRecord]:
+        self._sync()
+        record = self._added.get(swift_code)
+        if record is not None:
+            return record
+        if swift_code in self._removed:
+            return None
+        return self.base.get(swift_code)
+
+    def branches(self, headquarters_code: str) -> List[SwiftRecord]:
+        self._sync()
+        return self._merge(
+            self.base.branches(headquarters_code),
+            lambda record: is_branch_of(record, headquarters_code)
+        )
+
+    def country(self, country_iso2: str) -> List[SwiftRecord]:
+        self._sync()
+        country_iso2 = country_iso2.upper()
+        return self._merge(self.base.country(country_iso2), lambda record: record.country_iso2 == country_iso2)
+
+    def search_prefix(self, prefix: str, limit: int) -> List[SwiftRecord]:
+        self._sync()
+        # Over-fetch by the number of removed codes so removals cannot leave the page short.
+        records = self.base.search_prefix(prefix, limit + len(self._removed))
+        return self._merge(records, lambda record: record.swift_code.startswith(prefix))[:limit]
+
+    def _merge(self, records: List[SwiftRecord], matches) -> List[SwiftRecord]:
+        if not self._added and not self._removed:
+            return records
+
+        with self._lock:
+            merged = {
+                record.swift_code: record for record in records
+                if record.swift_code not in self._removed and record.swift_code not in self._added
+            }
+            merged.update((code, record) for code, record in self._added.items() if matches(record))
+        return [merged[code] for code in sorted(merged)]
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        if self._journal is None:
+            with self._lock:
+                self._apply(entry)
+            return
+
+        # One O_APPEND write per entry, so entries from concurrent workers never interleave.
+        line = (json.dumps(entry) + "\n").encode("utf-8")
+        fd = os.open(self._journal, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+        self._sync()
+
+    def _sync(self) -> None:
+        """Replay journal entries written since the last read, by this or any other worker."""
+        if self._journal is None:
+            return
+        try:
+            stat = os.stat(self._journal)
+        except FileNotFoundError:
+            return
+        journal_id = (stat.st_dev, stat.st_ino)
+        if journal_id == self._journal_id and stat.st_size == self._offset:
+            return
+
+        with self._lock:
+            if journal_id != self._journal_id:
+                self._added.clear()
+                self._removed.clear()
+                self._journal_id, self._offset = journal_id, 0
+
+            with open(self._journal, "rb") as file:
+                file.seek(self._offset)
+                data = file.read()
+            # A line still being appended is picked up by a later read.
+            end = data.rfind(b"\n") + 1
+            for line in data[:end].splitlines():
+                self._apply(json.loads(line))
+            self._offset += end
+
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        if entry["op"] == "put":
+            record = SwiftRecord(*entry["record"])
+            self._removed.discard(record.swift_code)
+            self._added[record.swift_code] = record
+        else:
+            self._added.pop(entry["swift_code"], None)
+            self._removed.add(entry["swift_code"])
@@ -0,0 +1,401 @@
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+MEMORY_DIRECTORY_ENABLED = os.getenv("SWIFT_MEMORY_DIRECTORY", "false").lower() == "true"
+
+FIELDS = ("swift_code", "bank_name", "address", "country_iso2", "country_name", "is_headquarter")
+CODE_WIDTH = 11
+SEPARATOR = "\x00"
+META = struct.Struct("<III")
+ROW_COUNT = struct.Struct("<Q")
+SECTION = struct.Struct("<Q")
+
+
+class SwiftRow:
+    """Read-only view of one record in a `SwiftRecordStore`; also usable as a mapping (`**row`)."""
+
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store: "SwiftRecordStore", row: int):
+        self._store = store
+        self._row = row
+
+    @property
+    def swift_code(self) -> str:
+        return self._store.code_at(self._row)
+
+    @property
+    def bank_name(self) -> str:
+        return self._store._banks[self._store._bank_ids[self._row]]
+
+    @property
+    def address(self) -> str:
+        return self._store.address_at(self._row)
+
+    @property
+    def country_iso2(self) -> str:
+        return self._store._countries[self._store._country_ids[self._row]][0]
+
+    @property
+    def country_name(self) -> str:
+        return self._store._countries[self._store._country_ids[self._row]][1]
+
+    @property
+    def is_headquarter(self) -> bool:
+        return bool(self._store._headquarters[self._row >> 3] & (1 << (self._row & 7)))
+
+    def keys(self) -> Tuple[str, ...]:
+        return FIELDS
+
+    def __getitem__(self, field: str) -> Any:
+        if field not in FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def as_tuple(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, field) for field in FIELDS)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, SwiftRow):
+            return self.as_tuple() == other.as_tuple()
+        if isinstance(other, dict):
+            return dict(zip(FIELDS, self.as_tuple())) == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"SwiftRow({', '.join(f'{field}={getattr(self, field)!r}' for field in FIELDS)})"
+
+
+def _append_offset(offsets: array, value: int) -> array:
+    try:
+        offsets.append(value)
+    except OverflowError:
+        offsets = array("Q", offsets)
+        offsets.append(value)
+    return offsets
+
+
+def _offsets_from_bytes(data: Any, count: int) -> array:
+    typecode = "I" if len(data) == count * array("I").itemsize else "Q"
+    offsets = array(typecode)
+    offsets.frombytes(data)
+    return offsets
+
+
+class _StringTable:
+    """Dictionary of distinct strings kept in one UTF-8 buffer; the build-time lookup is dropped on `seal`."""
+
+    __slots__ = ("data", "offsets", "_lookup")
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array("I", [0])
+        self._lookup: Optional[Dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return self.data[self.offsets[index]:self.offsets[index + 1]].decode("utf-8")
+
+    def add(self, value: str) -> int:
+        if self._lookup is None:
+            self._lookup = {self[index]: index for index in range(len(self))}
+        index = self._lookup.get(value)
+        if index is None:
+            index = self._lookup[value] = len(self)
+            self.data += value.encode("utf-8")
+            self.offsets = _append_offset(self.offsets, len(self.data))
+        return index
+
+    def seal(self) -> None:
+        self._lookup = None
+        self.data = bytearray(self.data)
+        self.offsets = array(self.offsets.typecode, self.offsets)
+
+    @classmethod
+    def load(cls, data: Any, offsets: Any, count: int) -> "_StringTable":
+        table = cls()
+        table.data = bytearray(data)
+        table.offsets = _offsets_from_bytes(offsets, count + 1)
+        table._lookup = None
+        if len(table.offsets) != count + 1 or (count and table.offsets[-1] != len(table.data)):
+            raise ValueError("inconsistent string table")
+        return table
+
+
+class _SortedCodes:
+    """Sequence of code keys in `order`, for `bisect`."""
+
+    __slots__ = ("store", "order")
+
+    def __init__(self, store: "SwiftRecordStore", order: Sequence[int]):
+        self.store = store
+        self.order = order
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def __getitem__(self, position: int) -> bytes:
+        return self.store.key_at(self.order[position])
+
+
+class SwiftRecordStore:
+    """
+    Compact columnar store of SWIFT code records.
+
+    Codes are kept as one NUL-padded fixed-width byte string, bank names and
+    (ISO2, country name) pairs are dictionary-encoded, addresses are stored as varint
+    ids into a dictionary of space-separated words and `is_headquarter` is a bitmap.
+    Rows keep insertion order; sorted permutations for code, BIC8 and country lookups
+    are built on first use, which also trims the buffers to size.
+    """
+
+    def __init__(self):
+        self._count = 0
+        self._width = CODE_WIDTH
+        self._codes = bytearray()
+        self._banks = _StringTable()
+        self._bank_ids = array("I")
+        self._words = _StringTable()
+        self._addresses = bytearray()
+        self._address_offsets = array("I", [0])
+        self._countries: List[Tuple[str, str]] = []
+        self._country_lookup: Dict[Tuple[str, str], int] = {}
+        self._country_ids = array("H")
+        self._headquarters = bytearray()
+        self._by_code: Optional[array] = None
+        self._by_country: Optional[array] = None
+        self._country_ranges: Dict[str, Tuple[int, int]] = {}
+
+    def append(self, swift_code: str, bank_name: str, address: str, country_iso2: str, country_name: str,
+               is_headquarter: bool) -> None:
+        key = swift_code.encode("utf-8")
+        if len(key) > self._width:
+            self._widen(len(key))
+        self._codes += key.ljust(self._width, b"\0")
+
+        self._bank_ids.append(self._banks.add(bank_name))
+
+        addresses = self._addresses
+        for word in address.split(" "):
+            word_id = self._words.add(word)
+            while word_id >= 0x80:
+                addresses.append(word_id & 0x7F | 0x80)
+                word_id >>= 7
+            addresses.append(word_id)
+        self._address_offsets = _append_offset(self._address_offsets, len(addresses))
+
+        country = (country_iso2, country_name)
+        country_id = self._country_lookup.get(country)
+        if country_id is None:
+            country_id = self._country_lookup[country] = len(self._countries)
+            self._countries.append(country)
+        self._country_ids.append(country_id)
+
+        if self._count & 7 == 0:
+            self._headquarters.append(0)
+        if is_headquarter:
+            self._headquarters[self._count >> 3] |= 1 << (self._count & 7)
+
+        self._count += 1
+        self._by_code = None
+        self._by_country = None
+
+    def _widen(self, width: int) -> None:
+        old = self._codes
+        self._codes = bytearray()
+        for row in range(self._count):
+            self._codes += old[row * self._width:(row + 1) * self._width].ljust(width, b"\0")
+        self._width = width
+
+    def key_at(self, row: int) -> bytes:
+        return bytes(self._codes[row * self._width:(row + 1) * self._width])
+
+    def code_at(self, row: int) -> str:
+        return self.key_at(row).rstrip(b"\0").decode("utf-8")
+
+    def address_at(self, row: int) -> str:
+        words = []
+        word_id = shift = 0
+        for byte in self._addresses[self._address_offsets[row]:self._address_offsets[row + 1]]:
+            word_id |= (byte & 0x7F) << shift
+            if byte & 0x80:
+                shift += 7
+            else:
+                words.append(self._words[word_id])
+                word_id = shift = 0
+        return " ".join(words)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, row: int) -> SwiftRow:
+        if row < 0:
+            row += self._count
+        if not 0 <= row < self._count:
+            raise IndexError(row)
+        return SwiftRow(self, row)
+
+    def __iter__(self) -> Iterator[SwiftRow]:
+        return (SwiftRow(self, row) for row in range(self._count))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (SwiftRecordStore, list)):
+            return NotImplemented
+        return len(self) == len(other) and all(row == other_row for row, other_row in zip(self, other))
+
+    def _sorted_codes(self) -> _SortedCodes:
+        order = self._by_code
+        if order is None:
+            order = array("I", sorted(range(self._count), key=self.key_at))
+            self._by_code = order
+            self._seal()
+        return _SortedCodes(self, order)
+
+    def _seal(self) -> None:
+        self._banks.seal()
+        self._words.seal()
+        self._codes = bytearray(self._codes)
+        self._addresses = bytearray(self._addresses)
+        for name in ("_bank_ids", "_address_offsets", "_country_ids"):
+            column = getattr(self, name)
+            setattr(self, name, array(column.typecode, column))
+
+    def _country_order(self) -> array:
+        order = self._by_country
+        if order is None:
+            by_code = self._sorted_codes().order
+            order = array("I", sorted(by_code, key=lambda row: self._countries[self._country_ids[row]][0]))
+            ranges: Dict[str, Tuple[int, int]] = {}
+            for position, row in enumerate(order):
+                iso2 = self._countries[self._country_ids[row]][0]
+                start, _ = ranges.get(iso2, (position, 0))
+                ranges[iso2] = (start, position + 1)
+            self._country_ranges = ranges
+            self._by_country = order
+        return order
+
+    def _key(self, swift_code: str, pad: bytes = b"\0") -> Optional[bytes]:
+        key = swift_code.encode("utf-8")
+        if len(key) > self._width:
+            return None
+        return key.ljust(self._width, pad)
+
+    def get(self, swift_code: str) -> Optional[SwiftRow]:
+        key = self._key(swift_code)
+        if key is None:
+            return None
+        codes = self._sorted_codes()
+        position = bisect_left(codes, key)
+        if position < len(codes) and codes[position] == key:
+            return SwiftRow(self, codes.order[position])
+        return None
+
+    def prefix_rows(self, prefix: str, limit: Optional[int] = None) -> List[SwiftRow]:
+        low = self._key(prefix)
+        if low is None:
+            return []
+        codes = self._sorted_codes()
+        start, end = bisect_left(codes, low), bisect_left(codes, self._key(prefix, b"\xff"))
+        if limit is not None:
+            end = min(end, start + limit)
+        return [SwiftRow(self, codes.order[position]) for position in range(start, end)]
+
+    def search_prefix(self, prefix: str, limit: int) -> List[SwiftRow]:
+        return self.prefix_rows(prefix, limit)
+
+    def branches(self, headquarters_code: str) -> List[SwiftRow]:
+        return [
+            row for row in self.prefix_rows(headquarters_code[:8])
+            if row.swift_code != headquarters_code and not row.is_headquarter
+        ]
+
+    def country(self, country_iso2: str) -> List[SwiftRow]:
+        order = self._country_order()
+        start, end = self._country_ranges.get(country_iso2.upper(), (0, 0))
+        return [SwiftRow(self, order[position]) for position in range(start, end)]
+
+    def dump(self) -> List[bytes]:
+        """Serialize the columns, e.g. for the parse cache. Arrays use the machine's native layout."""
+        if any(SEPARATOR in iso2 or SEPARATOR in name for iso2, name in self._countries):
+            raise ValueError("country names containing NUL characters cannot be serialized")
+
+        return [
+            META.pack(self._width, len(self._banks), len(self._words)),
+            bytes(self._codes),
+            bytes(self._banks.data),
+            self._banks.offsets.tobytes(),
+            self._bank_ids.tobytes(),
+            bytes(self._words.data),
+            self._words.offsets.tobytes(),
+            bytes(self._addresses),
+            self._address_offsets.tobytes(),
+            SEPARATOR.join(iso2 for iso2, _ in self._countries).encode("utf-8"),
+            SEPARATOR.join(name for _, name in self._countries).encode("utf-8"),
+            self._country_ids.tobytes(),
+            bytes(self._headquarters),
+        ]
+
+    @classmethod
+    def load(cls, sections: Sequence[Any], count: int) -> "SwiftRecordStore":
+        (meta, codes, banks, bank_offsets, bank_ids, words, word_offsets, addresses, address_offsets, country_codes, country_names,
+         country_ids, headquarters) = sections
+
+        store = cls()
+        store._count = count
+        store._width, bank_count, word_count = META.unpack(meta)
+        store._codes = bytearray(codes)
+        store._bank_ids.frombytes(bank_ids)
+        store._banks = _StringTable.load(banks, bank_offsets, bank_count)
+        store._words = _StringTable.load(words, word_offsets, word_count)
+        store._addresses = bytearray(addresses)
+        store._address_offsets = _offsets_from_bytes(address_offsets, count + 1)
+        if count:
+            store._countries = list(zip(str(country_codes, "utf-8").split(SEPARATOR),
+                                        str(country_names, "utf-8").split(SEPARATOR)))
+        store._country_lookup = {country: index for index, country in enumerate(store._countries)}
+        store._country_ids.frombytes(country_ids)
+        store._headquarters = bytearray(headquarters)
+
+        if (len(store._codes) != count * store._width or len(store._bank_ids) != count
+                or len(store._country_ids) != count or len(store._address_offsets) != count + 1
+                or len(store._headquarters) != (count + 7) // 8
+                or max(store._bank_ids, default=-1) >= len(store._banks)
+                or max(store._country_ids, default=-1) >= len(store._countries)):
+            raise ValueError("inconsistent record store columns")
+        return store
+
+    def serialize(self) -> bytes:
+        """The row count followed by the `dump` columns as length-prefixed sections."""
+        return ROW_COUNT.pack(self._count) + b"".join(SECTION.pack(len(section)) + section for section in self.dump())
+
+    @classmethod
+    def deserialize(cls, payload: Any) -> "SwiftRecordStore":
+        """Inverse of `serialize`; `payload` may be a memoryview of a memory-mapped file."""
+        payload = memoryview(payload)
+        (count,) = ROW_COUNT.unpack_from(payload, 0)
+        sections = []
+        try:
+            offset = ROW_COUNT.size
+            while offset < len(payload):
+                (length,) = SECTION.unpack_from(payload, offset)
+                offset += SECTION.size
+                sections.append(payload[offset:offset + length])
+                offset += length
+
+            return cls.load(sections, count)
+        finally:
+            for section in sections:
+                section.release()
+            payload.release()
+
+    @classmethod
+    def from_records(cls, records: Any) -> "SwiftRecordStore":
+        store = cls()
+        for record in records:
+            store.append(*(record[field] for field in FIELDS))
+        return store
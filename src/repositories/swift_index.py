@@ -0,0 +1,255 @@
+import os
+import mmap
+import zlib
+import struct
+import logging
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.repositories.directory import SwiftRecord
+from src.utils.parse_cache import file_sha256
+from src.utils.parser import SwiftCodeParser
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = os.getenv("SWIFT_INDEX_FILE", "")
+
+MAGIC = b"SWFTIX01"
+# magic, rows, key width, iso2 width, countries, source size, source mtime_ns, source sha256,
+# section offsets (keys, record offsets, country table, country rows, record data), body crc32
+HEADER = struct.Struct("<8sIHHIQq32sQQQQQI")
+RECORD = struct.Struct("<?BHHH")
+OFFSET = struct.Struct("<Q")
+ROW = struct.Struct("<I")
+COUNTRY = struct.Struct("<II")
+
+
+class SwiftIndexError(Exception):
+    pass
+
+
+class _Keys:
+    """Sequence view over the fixed-width key section, for `bisect`."""
+
+    __slots__ = ("buffer", "offset", "width", "rows")
+
+    def __init__(self, buffer: mmap.mmap, offset: int, width: int, rows: int):
+        self.buffer = buffer
+        self.offset = offset
+        self.width = width
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __getitem__(self, row: int) -> bytes:
+        start = self.offset + row * self.width
+        return self.buffer[start:start + self.width]
+
+
+class SwiftIndex:
+    """
+    Immutable, memory-mapped SWIFT directory.
+
+    Layout after the header:
+
+    * keys: SWIFT codes as NUL-padded fixed-width ASCII, sorted, so an exact lookup is a
+      binary search and all codes of one BIC8 form a contiguous range;
+    * record offsets: rows + 1 offsets into the record data, in key order;
+    * country table: fixed-width ISO2 code, first position and count into the country rows;
+    * country rows: key row numbers grouped by country, in key order within a country;
+    * record data: a small fixed header followed by the UTF-8 strings of each record.
+
+    Every worker process maps the same file read-only, so the OS page cache keeps a
+    single physical copy no matter how many workers serve from it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as file:
+            self._buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self._open()
+        except (SwiftIndexError, ValueError, struct.error):
+            self._buffer.close()
+            raise
+
+    def _open(self) -> None:
+        if len(self._buffer) < HEADER.size:
+            raise SwiftIndexError(f"{self.path} is truncated")
+
+        (magic, self.rows, self.key_width, iso_width, countries, self.source_size, self.source_mtime_ns,
+         self.source_sha256, keys_offset, offsets_offset, countries_offset, country_rows_offset,
+         self._data_offset, checksum) = HEADER.unpack_from(self._buffer, 0)
+
+        if magic != MAGIC:
+            raise SwiftIndexError(f"{self.path} is not a SWIFT index file")
+
+        body = memoryview(self._buffer)[HEADER.size:]
+        try:
+            if zlib.crc32(body) != checksum:
+                raise SwiftIndexError(f"{self.path} is corrupted (checksum mismatch)")
+        finally:
+            body.release()
+
+        self._keys = _Keys(self._buffer, keys_offset, self.key_width, self.rows)
+        self._offsets_offset = offsets_offset
+        self._country_rows_offset = country_rows_offset
+
+        self._countries: Dict[str, Tuple[int, int]] = {}
+        entry_size = iso_width + COUNTRY.size
+        for index in range(countries):
+            position = countries_offset + index * entry_size
+            iso2 = self._buffer[position:position + iso_width].rstrip(b"\0").decode("utf-8")
+            self._countries[iso2] = COUNTRY.unpack_from(self._buffer, position + iso_width)
+
+    def close(self) -> None:
+        self._buffer.close()
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def matches_source(self, source_file: str) -> bool:
+        stat = os.stat(source_file)
+        if stat.st_size != self.source_size:
+            return False
+        return stat.st_mtime_ns == self.source_mtime_ns or file_sha256(source_file) == self.source_sha256
+
+    def _key(self, swift_code: str, pad: bytes = b"\0") -> Optional[bytes]:
+        key = swift_code.encode("utf-8")
+        if len(key) > self.key_width:
+            return None
+        return key.ljust(self.key_width, pad)
+
+    def _prefix_range(self, prefix: str) -> Tuple[int, int]:
+        low = self._key(prefix)
+        if low is None:
+            return 0, 0
+        return bisect_left(self._keys, low), bisect_left(self._keys, self._key(prefix, b"\xff"))
+
+    def _row(self, swift_code: str) -> Optional[int]:
+        key = self._key(swift_code)
+        if key is None:
+            return None
+        row = bisect_left(self._keys, key)
+        if row < self.rows and self._keys[row] == key:
+            return row
+        return None
+
+    def _record(self, row: int) -> SwiftRecord:
+        start = self._data_offset + OFFSET.unpack_from(self._buffer, self._offsets_offset + row * OFFSET.size)[0]
+        is_headquarter, iso_length, bank_length, address_length, country_length = RECORD.unpack_from(
+            self._buffer, start
+        )
+
+        position = start + RECORD.size
+        fields = []
+        for length in (iso_length, bank_length, address_length, country_length):
+            fields.append(self._buffer[position:position + length].decode("utf-8"))
+            position += length
+        country_iso2, bank_name, address, country_name = fields
+
+        return SwiftRecord(
+            swift_code=self._keys[row].rstrip(b"\0").decode("utf-8"),
+            bank_name=bank_name,
+            address=address,
+            country_iso2=country_iso2,
+            country_name=country_name,
+            is_headquarter=is_headquarter,
+        )
+
+    def get(self, swift_code: str) -> Optional[SwiftRecord]:
+        row = self._row(swift_code)
+        return self._record(row) if row is not None else None
+
+    def branches(self, headquarters_code: str) -> List[SwiftRecord]:
+        low, high = self._prefix_range(headquarters_code[:8])
+        return [
+            record for record in (self._record(row) for row in range(low, high))
+            if record.swift_code != headquarters_code and not record.is_headquarter
+        ]
+
+    def country(self, country_iso2: str) -> List[SwiftRecord]:
+        entry = self._countries.get(country_iso2.upper())
+        if entry is None:
+            return []
+        start, count = entry
+        rows = struct.unpack_from(f"<{count}I", self._buffer, self._country_rows_offset + start * ROW.size)
+        return [self._record(row) for row in rows]
+
+    def search_prefix(self, prefix: str, limit: int) -> List[SwiftRecord]:
+        low, high = self._prefix_range(prefix)
+        return [self._record(row) for row in range(low, min(high, low + limit))]
+
+    @staticmethod
+    def build(records: Iterable[Dict[str, Any]], path: str, source_file: str) -> None:
+        """Write an index for `records` parsed from `source_file`, atomically replacing `path`."""
+        by_code: Dict[str, Dict[str, Any]] = {}
+        for record in records:
+            by_code.setdefault(record["swift_code"], record)
+        codes = sorted(by_code, key=lambda code: code.encode("utf-8"))
+        keys = [code.encode("utf-8") for code in codes]
+        key_width = max((len(key) for key in keys), default=1)
+
+        data = bytearray()
+        offsets = bytearray()
+        by_country: Dict[bytes, List[int]] = {}
+        for row, code in enumerate(codes):
+            record = by_code[code]
+            iso2 = record["country_iso2"].encode("utf-8")
+            strings = [iso2, record["bank_name"].encode("utf-8"), record["address"].encode("utf-8"),
+                       record["country_name"].encode("utf-8")]
+
+            offsets += OFFSET.pack(len(data))
+            data += RECORD.pack(bool(record["is_headquarter"]), *(len(value) for value in strings))
+            for value in strings:
+                data += value
+            by_country.setdefault(iso2, []).append(row)
+        offsets += OFFSET.pack(len(data))
+
+        iso_width = max((len(iso2) for iso2 in by_country), default=1)
+        country_table = bytearray()
+        country_rows = bytearray()
+        for iso2 in sorted(by_country):
+            rows = by_country[iso2]
+            country_table += iso2.ljust(iso_width, b"\0") + COUNTRY.pack(len(country_rows) // ROW.size, len(rows))
+            country_rows += struct.pack(f"<{len(rows)}I", *rows)
+
+        sections = [b"".join(key.ljust(key_width, b"\0") for key in keys), offsets, country_table, country_rows, data]
+        section_offsets = []
+        position = HEADER.size
+        for section in sections:
+            section_offsets.append(position)
+            position += len(section)
+
+        body = b"".join(sections)
+        stat = os.stat(source_file)
+        header = HEADER.pack(
+            MAGIC, len(codes), key_width, iso_width, len(by_country), stat.st_size, stat.st_mtime_ns,
+            file_sha256(source_file), *section_offsets, zlib.crc32(body)
+        )
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(header)
+            file.write(body)
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def open_for(cls, source_file: str, path: str) -> "SwiftIndex":
+        """Map the index at `path`, (re)building it from `source_file` if it is missing, stale or corrupt."""
+        if os.path.exists(path):
+            try:
+                index = cls(path)
+                if index.matches_source(source_file):
+                    return index
+                index.close()
+                logger.info(f"SWIFT index {path} is stale, rebuilding")
+            except (SwiftIndexError, OSError, ValueError, struct.error) as e:
+                logger.warning(f"Rebuilding SWIFT index {path}: {e}")
+
+        cls.build(SwiftCodeParser.parse_csv(source_file), path, source_file)
+        return cls(path)
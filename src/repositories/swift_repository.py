@@ -1,68 +1,408 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
-from typing import List, Optional, Dict, Any, cast
+from sqlalchemy.orm import Query, Session, joinedload
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import and_, or_, case, func, insert, literal, select, Row
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from typing import Any, Callable, Dict, List, Optional, cast
 
-from src.database.models import SwiftCode
+from src.database.models import SwiftCode, Country, Bank
+from src.database.shards import ShardRouter
+from src.repositories.write_batcher import WriteBatcher
+from src.repositories.bank_search import MIN_SIMILARITY
+from src.monitoring.tracing import traced
+
+
+CODE_COLUMNS = ("swift_code", "bank_name", "address", "country_iso2", "is_headquarter")
 
 
 class SwiftCodeRepository:
 
+    write_batcher: Optional[WriteBatcher] = None
+
     @staticmethod
+    @traced("repository.get_swift_code")
     def get_swift_code(db: Session, swift_code: str) -> Optional[SwiftCode]:
-        return db.query(SwiftCode).filter(SwiftCode.swift_code == swift_code).first()
+        return db.query(SwiftCode).options(joinedload(SwiftCode.country)).filter(
+            SwiftCode.swift_code == swift_code
+        ).first()
 
     @staticmethod
+    @traced("repository.get_branches_for_headquarters")
     def get_branches_for_headquarters(db: Session, headquarters_code: str) -> List[SwiftCode]:
-        hq_prefix = headquarters_code[:8]
-
-        result = db.query(SwiftCode).filter(
+        query = db.query(SwiftCode).filter(
             and_(
-                func.substr(SwiftCode.swift_code, 1, 8) == hq_prefix,
                 SwiftCode.swift_code != headquarters_code,
                 SwiftCode.is_headquarter == False
             )
-        ).all()
+        )
 
+        result = SwiftCodeRepository._with_prefix(db, query, headquarters_code[:8]).all()
         return cast(List[SwiftCode], result)
 
     @staticmethod
-    def get_country_swift_codes(db: Session, country_iso2: str) -> List[SwiftCode]:
+    @traced("repository.get_swift_codes")
+    def get_swift_codes(db: Session, swift_codes: List[str]) -> List[SwiftCode]:
+        """Those of `swift_codes` that exist, in one query and in no particular order."""
+        result = db.query(SwiftCode).options(joinedload(SwiftCode.country)).filter(
+            SwiftCode.swift_code.in_(swift_codes)
+        ).all()
+        return cast(List[SwiftCode], result)
+
+    @staticmethod
+    @traced("repository.get_branches_for_institutions")
+    def get_branches_for_institutions(db: Session, bic8s: List[str]) -> List[SwiftCode]:
+        """Branch codes of several institutions in one query, one index range per BIC8."""
+        query = db.query(SwiftCode).filter(
+            SwiftCode.is_headquarter == False,
+            or_(*(SwiftCodeRepository._prefix_condition(db, bic8) for bic8 in bic8s))
+        )
+        return cast(List[SwiftCode], query.all())
+
+    @staticmethod
+    @traced("repository.get_country_swift_codes")
+    def get_country_swift_codes(db: Session, country_iso2: str) -> List[Row]:
         country_iso2 = country_iso2.upper()
 
-        result = db.query(SwiftCode).filter(SwiftCode.country_iso2 == country_iso2).all()
-        return cast(List[SwiftCode], result)
+        result = db.query(
+            SwiftCode.swift_code,
+            SwiftCode.bank_name,
+            SwiftCode.address,
+            SwiftCode.country_iso2,
+            SwiftCode.is_headquarter
+        ).filter(SwiftCode.country_iso2 == country_iso2).order_by(SwiftCode.swift_code).all()
+        return cast(List[Row], result)
+
+    @staticmethod
+    @traced("repository.search_prefix")
+    def search_prefix(db: Session, prefix: str, limit: int) -> List[Row]:
+        """First `limit` codes starting with `prefix` (alphanumeric, upper case), in code order."""
+
+        def read(session: Session) -> List[Row]:
+            query = session.query(
+                SwiftCode.swift_code,
+                SwiftCode.bank_name,
+                SwiftCode.country_iso2,
+                SwiftCode.is_headquarter
+            )
+            query = SwiftCodeRepository._with_prefix(session, query, prefix)
+            return query.order_by(SwiftCode.swift_code).limit(limit).all()
+
+        # From six characters on, the prefix includes the country and the query stays on one shard.
+        rows = read(db) if len(prefix) >= 6 else SwiftCodeRepository._read_shards(db, read)
+        return sorted(rows, key=lambda row: row.swift_code)[:limit]
+
+    @staticmethod
+    @traced("repository.get_institution_codes")
+    def get_institution_codes(db: Session, bic8: str) -> List[Row]:
+        """Every code of one institution (BIC8), in code order, from one index range scan."""
+        query = db.query(*(getattr(SwiftCode, column) for column in CODE_COLUMNS))
+        result = SwiftCodeRepository._with_prefix(db, query, bic8).order_by(SwiftCode.swift_code).all()
+        return cast(List[Row], result)
+
+    @staticmethod
+    def _with_prefix(db: Session, query: Query, prefix: str) -> Query:
+        """Restrict `query` to codes starting with the alphanumeric `prefix` so that an index can serve it."""
+        return query.filter(SwiftCodeRepository._prefix_condition(db, prefix))
+
+    @staticmethod
+    def _prefix_condition(db: Session, prefix: str) -> Any:
+        condition = SwiftCode.swift_code.startswith(prefix, autoescape=True)
+
+        if db.get_bind(SwiftCode.__mapper__).dialect.name != "postgresql":
+            # SQLite's LIKE is case-insensitive and cannot use the primary key index, so bound
+            # the scan explicitly; Postgres uses the pattern index for LIKE directly.
+            condition = and_(condition, SwiftCode.swift_code >= prefix, SwiftCode.swift_code < prefix + "\x7f")
+        return condition
+
+    @staticmethod
+    @traced("repository.search_banks")
+    def search_banks(db: Session, query: str, country_iso2: Optional[str], limit: int) -> List[Row]:
+        """Rank codes by trigram word similarity of bank name or address to `query` (Postgres `pg_trgm`)."""
+        term = literal(query)
+        score = func.greatest(
+            func.word_similarity(term, SwiftCode.bank_name),
+            func.word_similarity(term, func.coalesce(SwiftCode.address, ""))
+        ).label("score")
+
+        def read(session: Session) -> List[Row]:
+            session.execute(select(func.set_config("pg_trgm.word_similarity_threshold", str(MIN_SIMILARITY), True)))
+            statement = session.query(
+                SwiftCode.swift_code,
+                SwiftCode.bank_name,
+                SwiftCode.address,
+                SwiftCode.country_iso2,
+                SwiftCode.is_headquarter,
+                score
+            ).filter(or_(term.op("<%")(SwiftCode.bank_name), term.op("<%")(SwiftCode.address)))
+
+            if country_iso2:
+                statement = statement.filter(SwiftCode.country_iso2 == country_iso2.upper())
+
+            return statement.order_by(
+                score.desc(), func.length(SwiftCode.bank_name), SwiftCode.swift_code
+            ).limit(limit).all()
+
+        rows = read(db) if country_iso2 else SwiftCodeRepository._read_shards(db, read)
+        return sorted(rows, key=lambda row: (-row.score, len(row.bank_name), row.swift_code))[:limit]
+
+    @staticmethod
+    @traced("repository.get_all_swift_codes")
+    def get_all_swift_codes(db: Session) -> List[Row]:
+        return SwiftCodeRepository._read_shards(
+            db, lambda session: session.query(*(getattr(SwiftCode, column) for column in CODE_COLUMNS)).all()
+        )
+
+    @staticmethod
+    @traced("repository.get_country")
+    def get_country(db: Session, country_iso2: str) -> Optional[Country]:
+        return db.get(Country, country_iso2.upper())
+
+    @staticmethod
+    @traced("repository.get_country_statistics")
+    def get_country_statistics(db: Session) -> List[Country]:
+        countries = SwiftCodeRepository._read_shards(
+            db, lambda session: session.query(Country).filter(Country.code_count > 0).all()
+        )
+        return sorted(countries, key=lambda country: country.iso2)
+
+    @staticmethod
+    def _read_shards(db: Session, read: Callable[[Session], List[Any]]) -> List[Any]:
+        """Run `read` against `db`, or against every shard in parallel when `db` is sharded, and concatenate."""
+        router = ShardRouter.of(db)
+        if router is None:
+            return read(db)
+        return [row for rows in router.fan_out(lambda session, _: read(session)).values() for row in rows]
+
+    @staticmethod
+    @traced("repository.refresh_statistics")
+    def refresh_statistics(db: Session) -> None:
+        """Recompute `banks` and the country aggregates from `swift_codes` in one pass each; does not commit."""
+        bic8 = func.substr(SwiftCode.swift_code, 1, 8)
+        headquarters = func.sum(case((SwiftCode.is_headquarter == True, 1), else_=0))
+
+        db.query(Bank).delete(synchronize_session=False)
+        db.execute(insert(Bank).from_select(
+            ["bic8", "country_iso2", "code_count", "headquarter_count"],
+            select(bic8, func.min(SwiftCode.country_iso2), func.count(), headquarters).group_by(bic8)
+        ))
+
+        db.query(Country).update({
+            Country.code_count: select(func.count()).where(
+                SwiftCode.country_iso2 == Country.iso2
+            ).scalar_subquery(),
+            Country.headquarter_count: select(func.count()).where(
+                SwiftCode.country_iso2 == Country.iso2, SwiftCode.is_headquarter == True
+            ).scalar_subquery(),
+            Country.bank_count: select(func.count()).where(Bank.country_iso2 == Country.iso2).scalar_subquery()
+        }, synchronize_session=False)
 
     @staticmethod
+    def _adjust_statistics(db: Session, swift_code: str, country_iso2: str, is_headquarter: bool,
+                           delta: int) -> None:
+        """Apply one added (`delta=1`) or removed (`delta=-1`) code to the aggregates, in the caller's transaction."""
+        bic8 = swift_code[:8]
+        headquarters = delta if is_headquarter else 0
+
+        bank_country, banks = None, 0
+        if delta > 0:
+            if SwiftCodeRepository._add_to_bank(db, bic8, country_iso2, delta, headquarters):
+                bank_country, banks = country_iso2, 1
+        else:
+            db.query(Bank).filter(Bank.bic8 == bic8).update({
+                Bank.code_count: Bank.code_count + delta,
+                Bank.headquarter_count: Bank.headquarter_count + headquarters
+            }, synchronize_session=False)
+            empty = db.query(Bank.country_iso2).filter(Bank.bic8 == bic8, Bank.code_count <= 0).first()
+            if empty is not None:
+                db.query(Bank).filter(Bank.bic8 == bic8).delete(synchronize_session=False)
+                bank_country, banks = empty.country_iso2, -1
+
+        values = {
+            Country.code_count: Country.code_count + delta,
+            Country.headquarter_count: Country.headquarter_count + headquarters
+        }
+        if bank_country == country_iso2:
+            values[Country.bank_count] = Country.bank_count + banks
+        elif bank_country is not None:
+            db.query(Country).filter(Country.iso2 == bank_country).update(
+                {Country.bank_count: Country.bank_count + banks}, synchronize_session=False
+            )
+        db.query(Country).filter(Country.iso2 == country_iso2).update(values, synchronize_session=False)
+
+    @staticmethod
+    def _add_to_bank(db: Session, bic8: str, country_iso2: str, codes: int, headquarters: int) -> bool:
+        """Add codes to an institution's counts, creating its row if needed; True if the row was created."""
+        dialect = db.get_bind(Bank.__mapper__).dialect.name
+
+        if dialect in ("postgresql", "sqlite"):
+            # One statement, so concurrent first codes of a new BIC8 cannot both try to insert it.
+            insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+            statement = insert(Bank).values(
+                bic8=bic8, country_iso2=country_iso2, code_count=codes, headquarter_count=headquarters
+            )
+            router = ShardRouter.of(db)
+            code_count = db.execute(statement.on_conflict_do_update(
+                index_elements=["bic8"],
+                set_={
+                    "code_count": Bank.code_count + statement.excluded.code_count,
+                    "headquarter_count": Bank.headquarter_count + statement.excluded.headquarter_count
+                }
+            ).returning(Bank.code_count), bind_arguments=(
+                {"shard_id": router.shard_for_country(country_iso2)} if router is not None else None
+            )).scalar_one()
+            # Banks whose count drops to zero are deleted, so a count of just `codes` means a new row.
+            return code_count == codes
+
+        updated = db.query(Bank).filter(Bank.bic8 == bic8).update({
+            Bank.code_count: Bank.code_count + codes,
+            Bank.headquarter_count: Bank.headquarter_count + headquarters
+        }, synchronize_session=False)
+        if updated:
+            return False
+        db.add(Bank(bic8=bic8, country_iso2=country_iso2, code_count=codes, headquarter_count=headquarters))
+        db.flush()
+        return True
+
+    @staticmethod
+    def ensure_countries(db: Session, countries: Dict[str, str]) -> None:
+        """Insert missing countries (ISO2 -> name); existing rows are left unchanged."""
+        if not countries:
+            return
+
+        values = [{"iso2": iso2, "name": name} for iso2, name in countries.items()]
+        dialect = db.get_bind(SwiftCode.__mapper__).dialect.name
+
+        if dialect in ("postgresql", "sqlite"):
+            insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+            db.execute(insert(Country).values(values).on_conflict_do_nothing(index_elements=["iso2"]))
+            return
+
+        existing = {iso2 for (iso2,) in db.query(Country.iso2).filter(Country.iso2.in_(list(countries)))}
+        db.add_all(Country(**value) for value in values if value["iso2"] not in existing)
+        db.flush()
+
+    @staticmethod
+    @traced("repository.create_swift_code")
     def create_swift_code(db: Session, swift_data: Dict[str, Any]) -> SwiftCode:
 
-        new_code = SwiftCode(**swift_data)
-        db.add(new_code)
+        if SwiftCodeRepository.write_batcher is not None:
+            return SwiftCodeRepository.write_batcher.submit(
+                lambda session: SwiftCodeRepository._add_swift_code(session, swift_data)
+            )
+
+        new_code = SwiftCodeRepository._add_swift_code(db, swift_data)
         db.commit()
         db.refresh(new_code)
         return new_code
 
     @staticmethod
+    @traced("repository.delete_swift_code")
     def delete_swift_code(db: Session, swift_code: str) -> bool:
 
+        if SwiftCodeRepository.write_batcher is not None:
+            return SwiftCodeRepository.write_batcher.submit(
+                lambda session: SwiftCodeRepository._remove_swift_code(session, swift_code)
+            )
+
+        deleted = SwiftCodeRepository._remove_swift_code(db, swift_code)
+        if deleted:
+            db.commit()
+        return deleted
+
+    @staticmethod
+    def _add_swift_code(db: Session, swift_data: Dict[str, Any]) -> SwiftCode:
+
+        # A code added earlier in the same write batch is already in the session: report the
+        # conflict the database would, rather than letting the flush clash with that instance.
+        router = ShardRouter.of(db)
+        shard = router.shard_for_country(swift_data["country_iso2"]) if router is not None else None
+        if identity_key(SwiftCode, swift_data["swift_code"], identity_token=shard) in db.identity_map:
+            raise IntegrityError(
+                "INSERT INTO swift_codes", {"swift_code": swift_data["swift_code"]},
+                ValueError(f"SWIFT code {swift_data['swift_code']} already exists")
+            )
+
+        SwiftCodeRepository.ensure_countries(db, {swift_data["country_iso2"]: swift_data["country_name"]})
+        new_code = SwiftCode(**{column: swift_data[column] for column in CODE_COLUMNS})
+        db.add(new_code)
+        db.flush()
+        SwiftCodeRepository._adjust_statistics(
+            db, new_code.swift_code, new_code.country_iso2, new_code.is_headquarter, 1
+        )
+        return new_code
+
+    @staticmethod
+    def _remove_swift_code(db: Session, swift_code: str) -> bool:
+
         code = db.query(SwiftCode).filter(SwiftCode.swift_code == swift_code).first()
 
         if not code:
             return False
 
         db.delete(code)
-        db.commit()
+        db.flush()
+        SwiftCodeRepository._adjust_statistics(db, code.swift_code, code.country_iso2, code.is_headquarter, -1)
         return True
 
     @staticmethod
+    @traced("repository.upsert_swift_codes")
+    def upsert_swift_codes(db: Session, swift_codes_data: List[Dict[str, Any]]) -> None:
+        """
+        Insert codes, replacing existing rows with the same code; does not commit or update statistics.
+
+        Codes must be unique within one call. Use `refresh_statistics` once the load is complete.
+        """
+        countries: Dict[str, str] = {}
+        for swift_data in swift_codes_data:
+            countries.setdefault(swift_data["country_iso2"], swift_data["country_name"])
+        SwiftCodeRepository.ensure_countries(db, countries)
+
+        rows = [{column: swift_data[column] for column in CODE_COLUMNS} for swift_data in swift_codes_data]
+        if not rows:
+            return
+
+        dialect = db.get_bind(SwiftCode.__mapper__).dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+            # A Core insert on the table skips the ORM's per-row bulk bookkeeping.
+            statement = insert(SwiftCode.__table__)
+            db.execute(statement.on_conflict_do_update(
+                index_elements=["swift_code"],
+                set_={column: statement.excluded[column] for column in CODE_COLUMNS if column != "swift_code"}
+            ), rows)
+            return
+
+        for row in rows:
+            db.merge(SwiftCode(**row))
+        db.flush()
+
+    @staticmethod
+    @traced("repository.bulk_create_swift_codes")
     def bulk_create_swift_codes(db: Session, swift_codes_data: List[Dict[str, Any]]) -> None:
 
+        countries: Dict[str, str] = {}
         for swift_data in swift_codes_data:
-            existing = db.query(SwiftCode).filter(
-                SwiftCode.swift_code == swift_data["swift_code"]
-            ).first()
+            countries.setdefault(swift_data["country_iso2"], swift_data["country_name"])
+        SwiftCodeRepository.ensure_countries(db, countries)
+
+        dialect = db.get_bind(SwiftCode.__mapper__).dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            # One batched INSERT ... ON CONFLICT DO NOTHING: existing codes and repeats in the input are skipped.
+            insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+            rows = [{column: swift_data[column] for column in CODE_COLUMNS} for swift_data in swift_codes_data]
+            if rows:
+                db.execute(insert(SwiftCode).on_conflict_do_nothing(index_elements=["swift_code"]), rows)
+        else:
+            for swift_data in swift_codes_data:
+                existing = db.query(SwiftCode).filter(
+                    SwiftCode.swift_code == swift_data["swift_code"]
+                ).first()
 
-            if not existing:
-                new_code = SwiftCode(**swift_data)
-                db.add(new_code)
+                if not existing:
+                    new_code = SwiftCode(**{column: swift_data[column] for column in CODE_COLUMNS})
+                    db.add(new_code)
 
+        db.flush()
+        SwiftCodeRepository.refresh_statistics(db)
         db.commit()
\ No newline at end of file
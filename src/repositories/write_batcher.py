@@ -0,0 +1,120 @@
+import os
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+WRITE_BATCH_ENABLED = os.getenv("DB_WRITE_BATCH_ENABLED", "false").lower() == "true"
+WRITE_BATCH_WINDOW_MS = float(os.getenv("DB_WRITE_BATCH_WINDOW_MS", "2"))
+WRITE_BATCH_MAX_SIZE = int(os.getenv("DB_WRITE_BATCH_MAX_SIZE", "64"))
+
+WriteOperation = Callable[[Session], Any]
+
+
+class WriteBatcher:
+    """
+    Group-commit coalescer for single-record writes.
+
+    Operations submitted within the batching window (or until the batch is full)
+    are applied by one worker thread in a single transaction. Every operation runs
+    inside its own SAVEPOINT, so a conflict only fails the caller that caused it,
+    while the whole batch pays for a single commit.
+    """
+
+    def __init__(
+            self,
+            session_factory: Callable[..., Session],
+            window_ms: float = WRITE_BATCH_WINDOW_MS,
+            max_size: int = WRITE_BATCH_MAX_SIZE
+    ):
+        self._session_factory = session_factory
+        self._window = window_ms / 1000
+        self._max_size = max(1, max_size)
+        self._queue: "queue.Queue[Optional[Tuple[WriteOperation, Future]]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+
+    def submit(self, operation: WriteOperation) -> Any:
+        future: Future = Future()
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Write batcher is closed")
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="swift-write-batcher", daemon=True)
+                self._worker.start()
+            self._queue.put((operation, future))
+
+        return future.result()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            worker = self._worker
+            self._queue.put(None)
+
+        if worker is not None:
+            worker.join()
+
+    def _run(self) -> None:
+        running = True
+
+        while running:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self._window
+
+            while len(batch) < self._max_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+                if item is None:
+                    running = False
+                    break
+                batch.append(item)
+
+            self._apply(batch)
+
+    def _apply(self, batch: List[Tuple[WriteOperation, Future]]) -> None:
+        outcomes: List[Tuple[Future, Any, Optional[BaseException]]] = []
+        session = self._session_factory(expire_on_commit=False)
+
+        try:
+            for operation, future in batch:
+                try:
+                    with session.begin_nested():
+                        result = operation(session)
+                    outcomes.append((future, result, None))
+                except Exception as e:
+                    outcomes.append((future, None, e))
+
+            session.commit()
+        except Exception as e:
+            logger.error(f"Write batch of {len(batch)} operations failed to commit: {e}")
+            session.rollback()
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        finally:
+            session.close()
+
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, field_validator
-from typing import List
+from typing import List, Optional, Union
 
 
 class SwiftCodeBase(BaseModel):
@@ -15,6 +15,7 @@ class SwiftCodeBase(BaseModel):
 
 
 class SwiftCodeCreate(SwiftCodeBase):
+    swiftCode: str = Field(..., pattern="^[A-Za-z0-9]{11}$")
     countryName: str
 
     @field_validator("countryName", mode="before")
@@ -40,5 +41,61 @@ class CountrySwiftCodes(BaseModel):
     swiftCodes: List[SwiftCodeBase]
 
 
+class SwiftCodeSuggestion(BaseModel):
+    bankName: str
+    countryISO2: str
+    isHeadquarter: bool
+    swiftCode: str
+
+
+class SwiftCodeSearchResults(BaseModel):
+    prefix: str
+    swiftCodes: List[SwiftCodeSuggestion]
+
+
+class BankSearchMatch(SwiftCodeBase):
+    score: float
+
+
+class BankSearchResults(BaseModel):
+    query: str
+    swiftCodes: List[BankSearchMatch]
+
+
+class Institution(BaseModel):
+    bic8: str
+    bankName: str
+    countryISO2: str
+    total: int
+    offset: int
+    limit: int
+    swiftCodes: List[SwiftCodeBase]
+
+
+class CountryStatistics(BaseModel):
+    countryISO2: str
+    countryName: str
+    swiftCodeCount: int
+    headquarterCount: int
+    branchCount: int
+    bankCount: int
+
+
+class CountryList(BaseModel):
+    countries: List[CountryStatistics]
+
+
 class MessageResponse(BaseModel):
     message: str
+
+
+class StreamLookupRequest(BaseModel):
+    id: Union[int, str]
+    swiftCode: str = Field(..., min_length=1, max_length=11, pattern="^[A-Za-z0-9]+$")
+
+
+class StreamLookupReply(BaseModel):
+    id: Optional[Union[int, str]]
+    status: int
+    result: Optional[SwiftCodeWithBranches] = None
+    detail: Optional[str] = None
@@ -0,0 +1,132 @@
+import os
+import time
+import logging
+import multiprocessing
+from collections import deque
+from itertools import islice
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterator, List, NamedTuple, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from src.database.shards import ShardRouter
+from src.repositories.record_store import FIELDS
+from src.repositories.swift_repository import SwiftCodeRepository
+from src.utils.parser import SwiftCodeParser
+from src.monitoring.metrics import metrics
+from src.monitoring.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+INGEST_WORKERS = int(os.getenv("SWIFT_INGEST_WORKERS", "0")) or os.cpu_count() or 1
+# Parsed files waiting for the loader; bounds memory when parsing outpaces the database.
+INGEST_MAX_PENDING = int(os.getenv("SWIFT_INGEST_MAX_PENDING", "0")) or 2 * INGEST_WORKERS
+INGEST_BATCH_SIZE = int(os.getenv("SWIFT_INGEST_BATCH_SIZE", "5000"))
+
+
+class IngestSummary(NamedTuple):
+    files: int
+    codes: int
+    distinct_codes: int
+    seconds: float
+
+
+def _parse_file(path: str) -> List[Tuple[Any, ...]]:
+    """
+    Process pool task: parse and normalize one CSV into rows in `FIELDS` order.
+
+    Within one file the first occurrence of a code wins, as in a single-file seed.
+    Decoding and deduplication happen here so the loader only has to insert.
+    """
+    rows: Dict[str, Tuple[Any, ...]] = {}
+    for record in SwiftCodeParser.parse_csv(path):
+        row = record.as_tuple()
+        rows.setdefault(row[0], row)
+    return list(rows.values())
+
+
+def _parsed_in_order(paths: Sequence[str], workers: int, max_pending: int) -> Iterator[List[Tuple[Any, ...]]]:
+    """Yield each file's rows in `paths` order while up to `max_pending` files are parsed ahead in worker processes."""
+    if workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            yield _parse_file(path)
+        return
+
+    # spawn, not fork: ingest runs next to the server's threads, which a forked child would inherit mid-operation.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths)), mp_context=context) as pool:
+        remaining = iter(paths)
+        pending: Deque[Future] = deque(pool.submit(_parse_file, path) for path in islice(remaining, max_pending))
+        while pending:
+            rows = pending.popleft().result()
+            path = next(remaining, None)
+            if path is not None:
+                pending.append(pool.submit(_parse_file, path))
+            yield rows
+
+
+class IngestService:
+
+    @staticmethod
+    @traced("service.ingest")
+    def ingest(db: Session, paths: Sequence[str], workers: int = INGEST_WORKERS,
+               max_pending: int = INGEST_MAX_PENDING) -> IngestSummary:
+        """
+        Load many CSV files: parse them in parallel worker processes and stream them into one loader.
+
+        Files are applied in `paths` order, and a code found in several files keeps the
+        record from the last of them. Statistics are recomputed once, after the last file.
+        """
+        start = time.perf_counter()
+        router = ShardRouter.of(db)
+        load: Callable[[List[Dict[str, Any]]], None]
+
+        if router is None:
+            def load(rows: List[Dict[str, Any]]) -> None:
+                for offset in range(0, len(rows), INGEST_BATCH_SIZE):
+                    SwiftCodeRepository.upsert_swift_codes(db, rows[offset:offset + INGEST_BATCH_SIZE])
+        else:
+            def load(rows: List[Dict[str, Any]]) -> None:
+                partitions = router.partition(rows, lambda row: row["country_iso2"])
+
+                def load_shard(session: Session, shard: str) -> None:
+                    for offset in range(0, len(partitions[shard]), INGEST_BATCH_SIZE):
+                        SwiftCodeRepository.upsert_swift_codes(session, partitions[shard][offset:offset + INGEST_BATCH_SIZE])
+                    session.commit()
+
+                router.fan_out(load_shard, list(partitions))
+
+        rows = 0
+        codes = set()
+        for path, parsed in zip(paths, _parsed_in_order(paths, workers, max_pending)):
+            batch = [dict(zip(FIELDS, row)) for row in parsed]
+            if router is not None:
+                # A code is stored on its country's shard but found by its own characters 5-6.
+                batch = [row for row in batch if ShardRouter.routable(row["swift_code"], row["country_iso2"])]
+                if len(batch) < len(parsed):
+                    logger.warning(
+                        f"Skipped {len(parsed) - len(batch)} codes from {path} whose characters 5-6 differ from their country"
+                    )
+            load(batch)
+            rows += len(parsed)
+            codes.update(row[0] for row in parsed)
+            logger.info(f"Ingested {len(parsed)} SWIFT codes from {path}")
+
+        if router is None:
+            db.flush()
+            SwiftCodeRepository.refresh_statistics(db)
+            db.commit()
+        else:
+            def refresh(session: Session, _: str) -> None:
+                SwiftCodeRepository.refresh_statistics(session)
+                session.commit()
+
+            router.fan_out(refresh)
+
+        summary = IngestSummary(len(paths), rows, len(codes), time.perf_counter() - start)
+        metrics.record_duration("ingest", summary.seconds)
+        logger.info(
+            f"Ingested {summary.files} files ({summary.codes} codes, {summary.distinct_codes} distinct) "
+            f"in {summary.seconds:.2f} s"
+        )
+        return summary
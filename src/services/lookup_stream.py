@@ -0,0 +1,210 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from fastapi import HTTPException, WebSocket, status
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from src.database.db import client_key, get_db, read_session
+from src.database.deadlines import RequestDeadline, DeadlineExceeded, current_deadline, LOOKUP_BUDGET_MS
+from src.schemas.swift_code import StreamLookupRequest, StreamLookupReply
+from src.services.swift_service import SwiftCodeService
+from src.monitoring.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+STREAM_MAX_IN_FLIGHT = int(os.getenv("SWIFT_STREAM_MAX_IN_FLIGHT", "256"))
+STREAM_BATCH_WINDOW_MS = float(os.getenv("SWIFT_STREAM_BATCH_WINDOW_MS", "1"))
+STREAM_BATCH_MAX_SIZE = int(os.getenv("SWIFT_STREAM_BATCH_MAX_SIZE", "128"))
+STREAM_DB_CONCURRENCY = int(os.getenv("SWIFT_STREAM_DB_CONCURRENCY", "4"))
+
+RequestId = Optional[Union[int, str]]
+
+
+class LookupStream:
+    """
+    One connection of the pipelined lookup protocol.
+
+    Each text frame is a request `{"id": ..., "swiftCode": ...}`; each reply carries the
+    request's `id` and is sent as soon as its lookup completes, so replies may come back
+    out of order. Lookups the in-process directory cannot answer are coalesced: codes
+    requested within `window_ms` of each other (up to `max_batch`) are fetched in one
+    `IN (...)` query, with at most `db_concurrency` batches running at once. While
+    batches are busy, further misses queue up and go out as bigger batches.
+
+    At most `max_in_flight` requests are outstanding, counting replies not yet sent.
+    Past that the server stops reading frames until replies drain, so a client that
+    outpaces the database is slowed down by TCP backpressure instead of growing queues.
+    """
+
+    def __init__(
+            self,
+            websocket: WebSocket,
+            sessions: Callable[[], Iterator[Session]] = get_db,
+            max_in_flight: int = STREAM_MAX_IN_FLIGHT,
+            window_ms: float = STREAM_BATCH_WINDOW_MS,
+            max_batch: int = STREAM_BATCH_MAX_SIZE,
+            db_concurrency: int = STREAM_DB_CONCURRENCY
+    ):
+        self.websocket = websocket
+        self._sessions = sessions
+        self._client = client_key(websocket)
+        self._window = window_ms / 1000
+        self._max_batch = max(1, max_batch)
+        self._slots = asyncio.Semaphore(max(1, max_in_flight))
+        self._db_slots = asyncio.Semaphore(max(1, db_concurrency))
+        self._replies: "asyncio.Queue[str]" = asyncio.Queue()
+        self._misses: Dict[str, asyncio.Future] = {}
+        self._has_misses = asyncio.Event()
+        self._tasks: Set[asyncio.Task] = set()
+        self._deadlines: Set[RequestDeadline] = set()
+
+    async def serve(self) -> None:
+        await self.websocket.accept()
+        metrics.stream_connections += 1
+
+        workers = [asyncio.create_task(self._read()), asyncio.create_task(self._write()),
+                   asyncio.create_task(self._batch())]
+        try:
+            done, _ = await asyncio.wait(workers, return_when=asyncio.FIRST_COMPLETED)
+            for worker in done:
+                worker.result()
+        finally:
+            for task in workers + list(self._tasks):
+                task.cancel()
+            # Stop the statements of batches nobody is waiting for any more.
+            for deadline in list(self._deadlines):
+                deadline.cancel()
+            metrics.stream_connections -= 1
+
+    async def _read(self) -> None:
+        while True:
+            if self._slots.locked():
+                metrics.record_stream_throttled()
+            await self._slots.acquire()
+
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+
+            frame = message.get("text") or message.get("bytes") or ""
+            try:
+                request = StreamLookupRequest.model_validate_json(frame)
+            except ValidationError as e:
+                error = e.errors()[0]
+                location = ".".join(str(part) for part in error["loc"])
+                detail = f"{location}: {error['msg']}" if location else error["msg"]
+                self._reply(self._request_id(frame), status.HTTP_400_BAD_REQUEST, time.perf_counter(), detail=detail)
+                continue
+
+            self._spawn(self._lookup(request, time.perf_counter()))
+
+    async def _write(self) -> None:
+        while True:
+            reply = await self._replies.get()
+            await self.websocket.send_text(reply)
+            self._slots.release()
+
+    async def _lookup(self, request: StreamLookupRequest, start: float) -> None:
+        try:
+            if SwiftCodeService.directory is not None:
+                result = SwiftCodeService.get_swift_code(None, request.swiftCode)
+            else:
+                result = await asyncio.shield(self._miss(request.swiftCode))
+        except Exception as e:
+            code, detail = self._error(e)
+            self._reply(request.id, code, start, detail=detail)
+            return
+
+        if result is None:
+            self._reply(request.id, status.HTTP_404_NOT_FOUND, start, detail=f"SWIFT code {request.swiftCode} not found")
+        else:
+            self._reply(request.id, status.HTTP_200_OK, start, result=result)
+
+    def _miss(self, swift_code: str) -> asyncio.Future:
+        """The pending database lookup of `swift_code`, shared by every request for it."""
+        future = self._misses.get(swift_code)
+        if future is None:
+            future = self._misses[swift_code] = asyncio.get_running_loop().create_future()
+            self._has_misses.set()
+        return future
+
+    async def _batch(self) -> None:
+        while True:
+            await self._has_misses.wait()
+            if len(self._misses) < self._max_batch:
+                await asyncio.sleep(self._window)
+            await self._db_slots.acquire()
+
+            futures = {code: self._misses.pop(code) for code in list(islice(self._misses, self._max_batch))}
+            if not self._misses:
+                self._has_misses.clear()
+            self._spawn(self._run_batch(futures))
+
+    async def _run_batch(self, futures: Dict[str, asyncio.Future]) -> None:
+        deadline = RequestDeadline(LOOKUP_BUDGET_MS)
+        self._deadlines.add(deadline)
+        try:
+            results = await asyncio.to_thread(self._resolve, list(futures), deadline)
+        except Exception as e:
+            for future in futures.values():
+                future.set_exception(e)
+        else:
+            for code, future in futures.items():
+                future.set_result(results.get(code))
+        finally:
+            self._deadlines.discard(deadline)
+            self._db_slots.release()
+        metrics.record_stream_batch(len(futures))
+
+    def _resolve(self, codes: List[str], deadline: RequestDeadline) -> Dict[str, Optional[Dict[str, Any]]]:
+        token = current_deadline.set(deadline)
+        try:
+            with read_session(self._client, self._sessions) as db:
+                return SwiftCodeService.get_swift_codes(db, codes)
+        finally:
+            current_deadline.reset(token)
+
+    def _spawn(self, coroutine) -> None:
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _reply(self, request_id: RequestId, code: int, start: float, result: Optional[Dict[str, Any]] = None,
+               detail: Optional[str] = None) -> None:
+        try:
+            reply = StreamLookupReply(id=request_id, status=code, result=result, detail=detail)
+        except ValidationError as e:
+            logger.error(f"Streamed lookup produced an invalid record: {e}")
+            code = status.HTTP_500_INTERNAL_SERVER_ERROR
+            reply = StreamLookupReply(id=request_id, status=code, detail="Lookup failed")
+        self._replies.put_nowait(reply.model_dump_json())
+        metrics.record_stream_lookup(code, time.perf_counter() - start)
+
+    @staticmethod
+    def _request_id(frame: Union[str, bytes]) -> RequestId:
+        """Best-effort id of a request that failed validation, so the client can still match the error."""
+        try:
+            request_id = json.loads(frame).get("id")
+        except (ValueError, AttributeError):
+            return None
+        return request_id if isinstance(request_id, (int, str)) and not isinstance(request_id, bool) else None
+
+    @staticmethod
+    def _error(error: Exception) -> Tuple[int, str]:
+        if isinstance(error, DeadlineExceeded):
+            code = status.HTTP_504_GATEWAY_TIMEOUT if error.started else status.HTTP_503_SERVICE_UNAVAILABLE
+            return code, str(error)
+        if isinstance(error, PoolTimeoutError):
+            return status.HTTP_503_SERVICE_UNAVAILABLE, "Timed out waiting for a database connection, please retry later"
+        if isinstance(error, HTTPException):
+            return error.status_code, str(error.detail)
+
+        logger.error(f"Streamed lookup failed: {error}")
+        return status.HTTP_500_INTERNAL_SERVER_ERROR, "Lookup failed"
@@ -1,28 +1,121 @@
+import os
+import time
+import logging
 from sqlalchemy.orm import Session
-from typing import Optional, Dict, Any
+from sqlalchemy.exc import IntegrityError
+from collections import defaultdict
+from typing import Optional, Dict, Any, Iterable, List, Sequence, Tuple
 from fastapi import HTTPException, status
 
+from src.database.shards import ShardRouter
 from src.repositories.swift_repository import SwiftCodeRepository
+from src.services.ingest import IngestService
+from src.repositories.directory import OverlayDirectory, SwiftRecord
+from src.repositories.bank_search import BankSearchIndex
 from src.utils.parser import SwiftCodeParser
+from src.utils.ttl_cache import TTLCache
+from src.monitoring.metrics import metrics
+from src.monitoring.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+INSTITUTION_CACHE_TTL = float(os.getenv("INSTITUTION_CACHE_TTL", "30"))
+INSTITUTION_CACHE_SIZE = int(os.getenv("INSTITUTION_CACHE_SIZE", "1024"))
+# Upper bound on the codes a directory returns for one institution.
+MAX_INSTITUTION_CODES = 100_000
 
 
 class SwiftCodeService:
 
+    directory: Optional[OverlayDirectory] = None
+    bank_index: Optional[BankSearchIndex] = None
+    institution_cache: TTLCache[Tuple[Dict[str, Any], ...]] = TTLCache(INSTITUTION_CACHE_SIZE, INSTITUTION_CACHE_TTL)
+
     @staticmethod
+    @traced("service.seed_database")
     def seed_database(db: Session, file_path: str) -> None:
+        """Load one CSV, or every file matched by a directory, glob or comma-separated list (see `IngestService`)."""
 
+        if not os.path.isfile(file_path):
+            paths = SwiftCodeParser.resolve_sources(file_path)
+            if not paths:
+                raise FileNotFoundError(f"No CSV files found for {file_path}")
+            IngestService.ingest(db, paths)
+            return
+
+        start = time.perf_counter()
         swift_codes = SwiftCodeParser.parse_csv(file_path)
+        metrics.record_duration("parse", time.perf_counter() - start)
 
-        SwiftCodeRepository.bulk_create_swift_codes(db, swift_codes)
+        start = time.perf_counter()
+        router = ShardRouter.of(db)
+        if router is None:
+            SwiftCodeRepository.bulk_create_swift_codes(db, swift_codes)
+        else:
+            # Each shard loads its own countries, all shards at once.
+            routable = SwiftCodeService._routable(swift_codes, file_path)
+            partitions = router.partition(routable, lambda record: record["country_iso2"])
+            router.fan_out(
+                lambda session, shard: SwiftCodeRepository.bulk_create_swift_codes(session, partitions[shard]),
+                list(partitions)
+            )
+        metrics.record_duration("load", time.perf_counter() - start)
 
     @staticmethod
+    @traced("service.get_swift_code")
     def get_swift_code(db: Session, swift_code: str) -> Optional[Dict[str, Any]]:
 
-        code = SwiftCodeRepository.get_swift_code(db, swift_code)
+        directory = SwiftCodeService.directory
+        if directory is not None:
+            code = directory.get(swift_code)
+        else:
+            code = SwiftCodeRepository.get_swift_code(db, swift_code)
 
         if not code:
             return None
 
+        branches = None
+        if code.is_headquarter:
+            if directory is not None:
+                branches = directory.branches(swift_code)
+            else:
+                branches = SwiftCodeRepository.get_branches_for_headquarters(db, swift_code)
+
+        return SwiftCodeService._code_result(code, branches)
+
+    @staticmethod
+    @traced("service.get_swift_codes")
+    def get_swift_codes(db: Session, swift_codes: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        `get_swift_code` for many codes at once, keyed by code.
+        Without a directory this is two queries however many codes are asked for.
+        """
+
+        if SwiftCodeService.directory is not None:
+            return {swift_code: SwiftCodeService.get_swift_code(db, swift_code) for swift_code in swift_codes}
+
+        found = {code.swift_code: code for code in SwiftCodeRepository.get_swift_codes(db, swift_codes)}
+        headquarters = sorted({code.swift_code[:8] for code in found.values() if code.is_headquarter})
+
+        branches: Dict[str, List[Any]] = defaultdict(list)
+        if headquarters:
+            for branch in SwiftCodeRepository.get_branches_for_institutions(db, headquarters):
+                branches[branch.swift_code[:8]].append(branch)
+
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        for swift_code in swift_codes:
+            code = found.get(swift_code)
+            if code is None:
+                results[swift_code] = None
+            else:
+                results[swift_code] = SwiftCodeService._code_result(
+                    code, branches[swift_code[:8]] if code.is_headquarter else None
+                )
+        return results
+
+    @staticmethod
+    def _code_result(code: Any, branches: Optional[Iterable[Any]]) -> Dict[str, Any]:
+
         result = {
             "address": code.address,
             "bankName": code.bank_name,
@@ -32,9 +125,7 @@ class SwiftCodeService:
             "swiftCode": code.swift_code
         }
 
-        if code.is_headquarter:
-            branches = SwiftCodeRepository.get_branches_for_headquarters(db, swift_code)
-
+        if branches is not None:
             result["branches"] = [
                 {
                     "address": branch.address,
@@ -49,15 +140,20 @@ class SwiftCodeService:
         return result
 
     @staticmethod
+    @traced("service.get_country_swift_codes")
     def get_country_swift_codes(db: Session, country_iso2: str) -> Optional[Dict[str, Any]]:
 
-        codes = SwiftCodeRepository.get_country_swift_codes(db, country_iso2)
+        if SwiftCodeService.directory is not None:
+            codes = SwiftCodeService.directory.country(country_iso2)
+            country_name = codes[0].country_name if codes else None
+        else:
+            codes = SwiftCodeRepository.get_country_swift_codes(db, country_iso2)
+            country = SwiftCodeRepository.get_country(db, country_iso2) if codes else None
+            country_name = country.name if country is not None else None
 
-        if not codes or len(codes) == 0:
+        if not codes:
             return None
 
-        country_name = codes[0].country_name
-
         return {
             "countryISO2": country_iso2.upper(),
             "countryName": country_name,
@@ -74,6 +170,133 @@ class SwiftCodeService:
         }
 
     @staticmethod
+    @traced("service.search_swift_codes")
+    def search_swift_codes(db: Session, prefix: str, limit: int) -> Dict[str, Any]:
+
+        prefix = prefix.upper()
+
+        if SwiftCodeService.directory is not None:
+            codes = SwiftCodeService.directory.search_prefix(prefix, limit)
+        else:
+            codes = SwiftCodeRepository.search_prefix(db, prefix, limit)
+
+        return {
+            "prefix": prefix,
+            "swiftCodes": [
+                {
+                    "bankName": code.bank_name,
+                    "countryISO2": code.country_iso2,
+                    "isHeadquarter": code.is_headquarter,
+                    "swiftCode": code.swift_code
+                }
+                for code in codes
+            ]
+        }
+
+    @staticmethod
+    @traced("service.get_institution")
+    def get_institution(db: Session, swift_code: str, country_iso2: Optional[str], offset: int,
+                        limit: int) -> Optional[Dict[str, Any]]:
+
+        bic8 = swift_code[:8].upper()
+        codes = SwiftCodeService._institution_codes(db, bic8)
+
+        if not codes:
+            return None
+
+        headquarters = next((code for code in codes if code["isHeadquarter"]), codes[0])
+        if country_iso2:
+            codes = tuple(code for code in codes if code["countryISO2"] == country_iso2.upper())
+
+        return {
+            "bic8": bic8,
+            "bankName": headquarters["bankName"],
+            "countryISO2": headquarters["countryISO2"],
+            "total": len(codes),
+            "offset": offset,
+            "limit": limit,
+            "swiftCodes": list(codes[offset:offset + limit])
+        }
+
+    @staticmethod
+    def _institution_codes(db: Session, bic8: str) -> Tuple[Dict[str, Any], ...]:
+
+        if SwiftCodeService.directory is not None:
+            codes = SwiftCodeService.directory.search_prefix(bic8, MAX_INSTITUTION_CODES)
+        else:
+            cached = SwiftCodeService.institution_cache.get(bic8)
+            metrics.record_cache("institution", cached is not None)
+            if cached is not None:
+                return cached
+            codes = SwiftCodeRepository.get_institution_codes(db, bic8)
+
+        result = tuple(
+            {
+                "address": code.address,
+                "bankName": code.bank_name,
+                "countryISO2": code.country_iso2,
+                "isHeadquarter": code.is_headquarter,
+                "swiftCode": code.swift_code
+            }
+            for code in codes
+        )
+        if SwiftCodeService.directory is None:
+            SwiftCodeService.institution_cache.put(bic8, result)
+        return result
+
+    @staticmethod
+    @traced("service.get_countries")
+    def get_countries(db: Session) -> Dict[str, Any]:
+
+        countries = SwiftCodeRepository.get_country_statistics(db)
+        return {"countries": [SwiftCodeService._country_statistics(country) for country in countries]}
+
+    @staticmethod
+    @traced("service.get_country_statistics")
+    def get_country_statistics(db: Session, country_iso2: str) -> Optional[Dict[str, Any]]:
+
+        country = SwiftCodeRepository.get_country(db, country_iso2)
+        if country is None:
+            return None
+        return SwiftCodeService._country_statistics(country)
+
+    @staticmethod
+    def _country_statistics(country: Any) -> Dict[str, Any]:
+        return {
+            "countryISO2": country.iso2,
+            "countryName": country.name,
+            "swiftCodeCount": country.code_count,
+            "headquarterCount": country.headquarter_count,
+            "branchCount": country.branch_count,
+            "bankCount": country.bank_count
+        }
+
+    @staticmethod
+    @traced("service.search_banks")
+    def search_banks(db: Session, query: str, country_iso2: Optional[str], limit: int) -> Dict[str, Any]:
+
+        if SwiftCodeService.bank_index is not None:
+            matches = SwiftCodeService.bank_index.search(query, limit, country_iso2)
+        else:
+            matches = SwiftCodeRepository.search_banks(db, query, country_iso2, limit)
+
+        return {
+            "query": query,
+            "swiftCodes": [
+                {
+                    "address": match.address,
+                    "bankName": match.bank_name,
+                    "countryISO2": match.country_iso2,
+                    "isHeadquarter": match.is_headquarter,
+                    "swiftCode": match.swift_code,
+                    "score": round(match.score, 4)
+                }
+                for match in matches
+            ]
+        }
+
+    @staticmethod
+    @traced("service.create_swift_code")
     def create_swift_code(db: Session, swift_data: Dict[str, Any]) -> Dict[str, str]:
 
         db_swift_data = {
@@ -85,19 +308,41 @@ class SwiftCodeService:
             "is_headquarter": swift_data["isHeadquarter"]
         }
 
+        if ShardRouter.of(db) is not None and not ShardRouter.routable(
+                db_swift_data["swift_code"], db_swift_data["country_iso2"]):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"SWIFT code {db_swift_data['swift_code']} does not belong to country "
+                       f"{db_swift_data['country_iso2']} (characters 5-6 must be the country code)"
+            )
+
         existing = SwiftCodeRepository.get_swift_code(db, db_swift_data["swift_code"])
 
         if existing:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"SWIFT code {db_swift_data['swift_code']} already exists"
-            )
+            raise SwiftCodeService._conflict(db_swift_data["swift_code"])
+
+        try:
+            SwiftCodeRepository.create_swift_code(db, db_swift_data)
+        except IntegrityError:
+            db.rollback()
+            raise SwiftCodeService._conflict(db_swift_data["swift_code"])
 
-        SwiftCodeRepository.create_swift_code(db, db_swift_data)
+        record = SwiftRecord(**db_swift_data)
+        if SwiftCodeService.directory is not None or SwiftCodeService.bank_index is not None:
+            # An existing country keeps its stored name, which may differ from the request's.
+            country = SwiftCodeRepository.get_country(db, record.country_iso2)
+            if country is not None:
+                record = record._replace(country_name=country.name)
+        if SwiftCodeService.directory is not None:
+            SwiftCodeService.directory.put(record)
+        if SwiftCodeService.bank_index is not None:
+            SwiftCodeService.bank_index.add(record)
+        SwiftCodeService.institution_cache.invalidate(record.swift_code[:8].upper())
 
         return {"message": f"SWIFT code {db_swift_data['swift_code']} added successfully"}
 
     @staticmethod
+    @traced("service.delete_swift_code")
     def delete_swift_code(db: Session, swift_code: str) -> Dict[str, str]:
 
         deleted = SwiftCodeRepository.delete_swift_code(db, swift_code)
@@ -108,4 +353,26 @@ class SwiftCodeService:
                 detail=f"SWIFT code {swift_code} not found"
             )
 
-        return {"message": f"SWIFT code {swift_code} deleted successfully"}
\ No newline at end of file
+        if SwiftCodeService.directory is not None:
+            SwiftCodeService.directory.remove(swift_code)
+        if SwiftCodeService.bank_index is not None:
+            SwiftCodeService.bank_index.remove(swift_code)
+        SwiftCodeService.institution_cache.invalidate(swift_code[:8].upper())
+
+        return {"message": f"SWIFT code {swift_code} deleted successfully"}
+
+    @staticmethod
+    def _routable(records: Sequence[Dict[str, Any]], source: str) -> List[Dict[str, Any]]:
+        """Drop records a sharded database could not find again (see `ShardRouter.routable`)."""
+        routable = [record for record in records if ShardRouter.routable(record["swift_code"], record["country_iso2"])]
+        skipped = len(records) - len(routable)
+        if skipped:
+            logger.warning(f"Skipped {skipped} codes from {source} whose characters 5-6 differ from their country")
+        return routable
+
+    @staticmethod
+    def _conflict(swift_code: str) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"SWIFT code {swift_code} already exists"
+        )
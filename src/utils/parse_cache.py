@@ -0,0 +1,141 @@
+import os
+import mmap
+import zlib
+import struct
+import hashlib
+import logging
+from typing import Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+PARSE_CACHE_ENABLED = os.getenv("SWIFT_PARSE_CACHE", "true").lower() == "true"
+CACHE_HOME = os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "swift-codes-api"
+)
+PARSE_CACHE_DIR = os.getenv("SWIFT_PARSE_CACHE_DIR") or os.path.join(CACHE_HOME, "parse")
+PARSE_CACHE_MAX_FILES = int(os.getenv("SWIFT_PARSE_CACHE_MAX_FILES", "8"))
+
+MAGIC = b"SWFTPC03"
+# magic, source size, source mtime_ns, source sha256, payload crc32, payload length
+HEADER = struct.Struct("<8sQq32sIQ")
+HASH_CHUNK_SIZE = 1 << 20
+
+T = TypeVar("T")
+
+
+class ParseCacheError(Exception):
+    pass
+
+
+def file_sha256(file_path: str) -> bytes:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def private_directory(path: str) -> str:
+    """
+    Create `path` accessible only to the current user. An existing directory another user
+    owns or can write to is refused, since files read from it are trusted.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    stat = os.stat(path)
+    if (hasattr(os, "getuid") and stat.st_uid != os.getuid()) or stat.st_mode & 0o022:
+        raise PermissionError(f"{path} is writable by other users")
+    return path
+
+
+class ParseCache:
+    """
+    Binary cache of what was parsed from a source file.
+
+    After a fixed header the file holds the serialized result (for `SwiftCodeParser.parse_csv`,
+    `SwiftRecordStore.serialize`), which is decoded straight from a memory map. Entries are
+    keyed by the source file's size, mtime and SHA-256, and the payload is protected by
+    a CRC32 so truncated or corrupted files are detected and rebuilt. The directory is
+    private to the user, and only the `max_files` most recently used entries are kept.
+    """
+
+    def __init__(self, cache_dir: str = PARSE_CACHE_DIR, max_files: int = PARSE_CACHE_MAX_FILES):
+        self.cache_dir = cache_dir
+        self.max_files = max(1, max_files)
+
+    def path_for(self, file_path: str) -> str:
+        source = os.path.abspath(file_path)
+        name = hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{os.path.basename(source)}.{name}.swiftcache")
+
+    def load(self, file_path: str, decode: Callable[[memoryview], T]) -> Optional[T]:
+        cache_path = self.path_for(file_path)
+        if not os.path.exists(cache_path):
+            return None
+
+        try:
+            private_directory(self.cache_dir)
+            with open(cache_path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                result = self._decode(file_path, buffer, decode)
+            if result is not None:
+                # The mtime orders entries for eviction.
+                os.utime(cache_path)
+            return result
+        except (ParseCacheError, OSError, ValueError, UnicodeDecodeError, struct.error) as e:
+            logger.warning(f"Ignoring parse cache {cache_path}: {e}")
+            return None
+
+    def _decode(self, file_path: str, buffer: mmap.mmap, decode: Callable[[memoryview], T]) -> Optional[T]:
+        magic, size, mtime_ns, sha256, checksum, length = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ParseCacheError("unknown format")
+
+        stat = os.stat(file_path)
+        if stat.st_size != size:
+            return None
+        if stat.st_mtime_ns != mtime_ns and file_sha256(file_path) != sha256:
+            return None
+
+        payload = memoryview(buffer)[HEADER.size:]
+        try:
+            if len(payload) != length or zlib.crc32(payload) != checksum:
+                raise ParseCacheError("checksum mismatch")
+            return decode(payload)
+        finally:
+            payload.release()
+
+    def store(self, file_path: str, payload: bytes) -> None:
+        cache_path = self.path_for(file_path)
+        try:
+            stat = os.stat(file_path)
+            header = HEADER.pack(
+                MAGIC, stat.st_size, stat.st_mtime_ns, file_sha256(file_path),
+                zlib.crc32(payload), len(payload)
+            )
+
+            private_directory(self.cache_dir)
+            temporary_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(temporary_path, "wb") as file:
+                file.write(header)
+                file.write(payload)
+            os.replace(temporary_path, cache_path)
+            self._evict()
+        except (ValueError, OSError) as e:
+            logger.warning(f"Could not write parse cache {cache_path}: {e}")
+
+    def _evict(self) -> None:
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".swiftcache"):
+                try:
+                    entries.append((entry.stat().st_mtime_ns, entry.path))
+                except FileNotFoundError:
+                    continue
+
+        for _, path in sorted(entries, reverse=True)[self.max_files:]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+
+
+parse_cache = ParseCache()
@@ -1,6 +1,10 @@
-import pandas as pd
+import os
+import glob
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+from src.utils.parse_cache import parse_cache, PARSE_CACHE_ENABLED
+from src.repositories.record_store import SwiftRecordStore
 
 logger = logging.getLogger(__name__)
 
@@ -8,7 +12,54 @@ logger = logging.getLogger(__name__)
 class SwiftCodeParser:
 
     @staticmethod
-    def parse_csv(file_path: str) -> List[Dict[str, Any]]:
+    def resolve_sources(source: str) -> List[str]:
+        """
+        Expand a data source into CSV paths in load order.
+
+        `source` is a comma-separated list of files, directories (every `*.csv` inside) and
+        glob patterns. Each entry's matches are sorted by path and entries keep their order,
+        so files listed later take precedence when they contain the same code.
+        """
+        paths: List[str] = []
+        for entry in source.split(","):
+            entry = entry.strip()
+            if not entry:
+                continue
+            if os.path.isdir(entry):
+                paths.extend(sorted(glob.glob(os.path.join(entry, "*.csv"))))
+            elif any(character in entry for character in "*?["):
+                paths.extend(sorted(path for path in glob.glob(entry, recursive=True) if os.path.isfile(path)))
+            elif os.path.isfile(entry):
+                paths.append(entry)
+        return list(dict.fromkeys(paths))
+
+    @staticmethod
+    def parse_csv(file_path: str, use_cache: Optional[bool] = None) -> SwiftRecordStore:
+
+        if use_cache is None:
+            use_cache = PARSE_CACHE_ENABLED
+
+        if use_cache:
+            swift_codes = parse_cache.load(file_path, SwiftRecordStore.deserialize)
+            if swift_codes is not None:
+                logger.info(f"Loaded {len(swift_codes)} SWIFT codes for {file_path} from the parse cache")
+                return swift_codes
+
+        swift_codes = SwiftCodeParser._read_csv(file_path)
+
+        if use_cache:
+            try:
+                parse_cache.store(file_path, swift_codes.serialize())
+            except ValueError as e:
+                logger.warning(f"Not caching the records parsed from {file_path}: {e}")
+
+        return swift_codes
+
+    @staticmethod
+    def _read_csv(file_path: str) -> SwiftRecordStore:
+
+        # pandas takes hundreds of milliseconds to import and is only needed when seeding.
+        import pandas as pd
 
         try:
             logger.info(f"Parsing CSV file: {file_path}")
@@ -22,26 +73,19 @@ class SwiftCodeParser:
             if missing_columns:
                 raise ValueError(f"Missing required columns in CSV: {missing_columns}")
 
-            swift_codes = []
-            for _, row in df.iterrows():
-                country_iso2 = row['country_iso2_code'].strip().upper()
-                country_name = row['country_name'].strip().upper()
-                swift_code = row['swift_code'].strip()
-                bank_name = row['name'].strip()
-                address = row['address'].strip()
-
-                is_headquarter = swift_code.endswith('XXX')
-
-                swift_code_data = {
-                    "swift_code": swift_code,
-                    "bank_name": bank_name,
-                    "address": address,
-                    "country_iso2": country_iso2,
-                    "country_name": country_name,
-                    "is_headquarter": is_headquarter,
-                }
-
-                swift_codes.append(swift_code_data)
+            swift_codes = SwiftRecordStore()
+            rows = zip(df['country_iso2_code'], df['country_name'], df['swift_code'], df['name'], df['address'])
+            for country_iso2, country_name, swift_code, bank_name, address in rows:
+                swift_code = swift_code.strip()
+
+                swift_codes.append(
+                    swift_code=swift_code,
+                    bank_name=bank_name.strip(),
+                    address=address.strip(),
+                    country_iso2=country_iso2.strip().upper(),
+                    country_name=country_name.strip().upper(),
+                    is_headquarter=swift_code.endswith('XXX'),
+                )
 
             logger.info(f"Successfully parsed {len(swift_codes)} SWIFT codes")
             return swift_codes
@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def no_parse_cache(monkeypatch):
+    """Keep test runs, including spawned ingest workers, from writing parse cache files."""
+    monkeypatch.setenv("SWIFT_PARSE_CACHE", "false")
+    monkeypatch.setattr("src.utils.parser.PARSE_CACHE_ENABLED", False)
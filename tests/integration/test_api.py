@@ -1,12 +1,22 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from src.main import app
+from src.database import db as database
 from src.database.db import Base, get_db
-from src.database.models import SwiftCode
+from src.database.deadlines import RequestDeadline
+from src.database.models import SwiftCode, Country
+from src.monitoring.tracing import tracer, InMemoryExporter
+from src.monitoring.metrics import metrics
+from src.api import security
+from src.services.swift_service import SwiftCodeService
+from src.repositories.directory import OverlayDirectory
+from src.repositories.swift_index import SwiftIndex
+from src.repositories.bank_search import BankSearchIndex
+from src.repositories.swift_repository import SwiftCodeRepository
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
 
@@ -41,7 +51,6 @@ def setup_db():
         bank_name="Bank USA HQ",
         address="1 Main St, New York",
         country_iso2="US",
-        country_name="UNITED STATES",
         is_headquarter=True
     )
 
@@ -50,7 +59,6 @@ def setup_db():
         bank_name="Bank USA Branch",
         address="2 Branch St, Chicago",
         country_iso2="US",
-        country_name="UNITED STATES",
         is_headquarter=False
     )
 
@@ -59,13 +67,16 @@ def setup_db():
         bank_name="Foreign Bank HQ",
         address="3 Maple St, Toronto",
         country_iso2="CA",
-        country_name="CANADA",
         is_headquarter=True
     )
 
+    db.add_all([Country(iso2="US", name="UNITED STATES"), Country(iso2="CA", name="CANADA")])
     db.add_all([hq_code, branch_code, foreign_hq])
+    db.flush()
+    SwiftCodeRepository.refresh_statistics(db)
     db.commit()
     db.close()
+    SwiftCodeService.institution_cache.clear()
 
     yield
 
@@ -90,6 +101,215 @@ def test_get_hq_swift_code():
     assert data["branches"][0]["swiftCode"] == "BANKUS33BRN"
 
 
+def test_query_count_headers():
+    response = client.get("/v1/swift-codes/BANKUS33XXX")
+    assert response.headers["X-DB-Query-Count"] == "2"
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+
+    response = client.get("/v1/swift-codes/BANKUS33BRN")
+    assert response.headers["X-DB-Query-Count"] == "1"
+
+
+def test_metrics_use_route_templates():
+    client.get("/v1/swift-codes/BANKUS33XXX")
+    client.get("/v1/swift-codes/NONEXISTENT")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    body = response.text
+
+    assert 'route="/v1/swift-codes/{swift_code}",status="200"' in body
+    assert 'route="/v1/swift-codes/{swift_code}",status="404"' in body
+    assert "swift_http_request_duration_seconds_bucket" in body
+    assert "BANKUS33XXX" not in body
+
+
+def test_request_tracing_spans(monkeypatch):
+    exporter = InMemoryExporter()
+    monkeypatch.setattr(tracer, "exporter", exporter)
+    monkeypatch.setattr(tracer, "sample_rate", 1.0)
+
+    response = client.get("/v1/swift-codes/BANKUS33XXX")
+    assert response.status_code == 200
+
+    names = [span.name for span in exporter.spans]
+    assert names[0] == "http.request"
+    assert response.headers["X-Trace-Id"] == exporter.spans[0].trace_id
+    for name in ["threadpool.queue", "service.get_swift_code", "repository.get_swift_code",
+                 "repository.get_branches_for_headquarters", "db.query", "response.serialize"]:
+        assert name in names
+
+
+def test_request_profiling_requires_admin_token(monkeypatch):
+    monkeypatch.setattr(security, "ADMIN_TOKEN", "secret")
+
+    response = client.get("/v1/swift-codes/BANKUS33XXX", headers={"X-Profile": "1"})
+    assert "X-Profile-Id" not in response.headers
+
+    response = client.get("/v1/admin/profiles/unknown")
+    assert response.status_code == 403
+
+    headers = {"X-Profile": "1", "X-Admin-Token": "secret"}
+    response = client.get("/v1/swift-codes/BANKUS33XXX", headers=headers)
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+
+    response = client.get(f"/v1/admin/profiles/{profile_id}", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    profile = response.json()
+    assert profile["request"] == "GET /v1/swift-codes/BANKUS33XXX"
+    assert "get_swift_code" in profile["callTree"]
+
+
+def test_index_directory_serves_the_same_responses(tmp_path, monkeypatch):
+    db = TestingSessionLocal()
+    records = [
+        {column: getattr(code, column) for column in
+         ("swift_code", "bank_name", "address", "country_iso2", "country_name", "is_headquarter")}
+        for code in db.query(SwiftCode).all()
+    ]
+    db.close()
+
+    paths = ["/v1/swift-codes/BANKUS33XXX", "/v1/swift-codes/BANKUS33BRN", "/v1/swift-codes/country/us",
+             "/v1/swift-codes/search?prefix=BANK"]
+    from_database = [client.get(path).json() for path in paths]
+
+    source = tmp_path / "codes.csv"
+    source.write_text("source\n")
+    SwiftIndex.build(records, str(tmp_path / "swift.idx"), str(source))
+    index = SwiftIndex(str(tmp_path / "swift.idx"))
+    monkeypatch.setattr(SwiftCodeService, "directory", OverlayDirectory(index))
+
+    from_index = [client.get(path).json() for path in paths]
+    for response in (from_database[2], from_index[2]):
+        response["swiftCodes"].sort(key=lambda code: code["swiftCode"])
+    assert from_index == from_database
+
+    response = client.post("/v1/swift-codes", json={
+        "swiftCode": "BANKUS33NYC", "bankName": "Bank USA Harlem", "address": "5 Lenox Ave, New York",
+        "countryISO2": "US", "countryName": "United States of America", "isHeadquarter": False
+    })
+    assert response.status_code == 201
+    assert client.get("/v1/swift-codes/BANKUS33NYC").json()["countryName"] == "UNITED STATES"
+    client.delete("/v1/swift-codes/BANKUS33NYC")
+
+    response = client.delete("/v1/swift-codes/BANKUS33BRN")
+    assert response.status_code == 200
+    assert client.get("/v1/swift-codes/BANKUS33BRN").status_code == 404
+    assert client.get("/v1/swift-codes/BANKUS33XXX").json()["branches"] == []
+    assert [code["swiftCode"] for code in client.get(paths[3]).json()["swiftCodes"]] == ["BANKUS33XXX"]
+
+    monkeypatch.undo()
+    index.close()
+
+
+def test_search_swift_codes_by_prefix():
+    response = client.get("/v1/swift-codes/search", params={"prefix": "bankus"})
+    assert response.status_code == 200
+    data = response.json()
+
+    assert data["prefix"] == "BANKUS"
+    assert [code["swiftCode"] for code in data["swiftCodes"]] == ["BANKUS33BRN", "BANKUS33XXX"]
+    assert data["swiftCodes"][1]["bankName"] == "Bank USA HQ"
+
+    response = client.get("/v1/swift-codes/search", params={"prefix": "B", "limit": 1})
+    assert [code["swiftCode"] for code in response.json()["swiftCodes"]] == ["BANKUS33BRN"]
+
+    response = client.get("/v1/swift-codes/search", params={"prefix": "ZZZ"})
+    assert response.json()["swiftCodes"] == []
+
+
+def test_search_swift_codes_rejects_invalid_parameters():
+    assert client.get("/v1/swift-codes/search").status_code == 422
+    assert client.get("/v1/swift-codes/search", params={"prefix": "BANK%"}).status_code == 422
+    assert client.get("/v1/swift-codes/search", params={"prefix": "BANK", "limit": 0}).status_code == 422
+
+
+def test_search_banks_by_fuzzy_name(monkeypatch):
+    db = TestingSessionLocal()
+    monkeypatch.setattr(
+        SwiftCodeService, "bank_index", BankSearchIndex.from_records(SwiftCodeRepository.get_all_swift_codes(db))
+    )
+    db.close()
+
+    response = client.get("/v1/swift-codes/search/banks", params={"q": "bank usa hg"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["query"] == "bank usa hg"
+    assert [code["swiftCode"] for code in data["swiftCodes"]][:2] == ["BANKUS33XXX", "BANKUS33BRN"]
+    assert data["swiftCodes"][0]["score"] > data["swiftCodes"][1]["score"]
+
+    response = client.get("/v1/swift-codes/search/banks", params={"q": "toronto", "country": "ca"})
+    assert [code["swiftCode"] for code in response.json()["swiftCodes"]] == ["FOREIGNCA1XXX"]
+
+    client.post("/v1/swift-codes", json={
+        "swiftCode": "BANKUS33NYC", "bankName": "Bank USA Harlem", "address": "5 Lenox Ave, New York",
+        "countryISO2": "US", "countryName": "United States", "isHeadquarter": False
+    })
+    client.delete("/v1/swift-codes/FOREIGNCA1XXX")
+    response = client.get("/v1/swift-codes/search/banks", params={"q": "harlem"})
+    assert [code["swiftCode"] for code in response.json()["swiftCodes"]] == ["BANKUS33NYC"]
+    response = client.get("/v1/swift-codes/search/banks", params={"q": "toronto"})
+    assert response.json()["swiftCodes"] == []
+
+    assert client.get("/v1/swift-codes/search/banks", params={"q": "b"}).status_code == 422
+
+
+def test_country_statistics_follow_writes():
+    response = client.get("/v1/countries")
+    assert response.status_code == 200
+    assert response.json()["countries"] == [
+        {"countryISO2": "CA", "countryName": "CANADA", "swiftCodeCount": 1, "headquarterCount": 1,
+         "branchCount": 0, "bankCount": 1},
+        {"countryISO2": "US", "countryName": "UNITED STATES", "swiftCodeCount": 2, "headquarterCount": 1,
+         "branchCount": 1, "bankCount": 1},
+    ]
+
+    client.post("/v1/swift-codes", json={
+        "swiftCode": "OTHRUS33XXX", "bankName": "Other Bank", "address": "9 Elm St, Boston",
+        "countryISO2": "US", "countryName": "United States", "isHeadquarter": True
+    })
+    client.delete("/v1/swift-codes/BANKUS33BRN")
+
+    response = client.get("/v1/countries/us/stats")
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["swiftCodeCount"], data["headquarterCount"], data["branchCount"], data["bankCount"]) == (2, 2, 0, 2)
+
+    assert client.get("/v1/countries/XX/stats").status_code == 404
+
+
+def test_get_institution_from_any_of_its_codes():
+    response = client.get("/v1/banks/BANKUS33BRN")
+    assert response.status_code == 200
+    data = response.json()
+
+    assert (data["bic8"], data["bankName"], data["countryISO2"], data["total"]) == ("BANKUS33", "Bank USA HQ", "US", 2)
+    assert [code["swiftCode"] for code in data["swiftCodes"]] == ["BANKUS33BRN", "BANKUS33XXX"]
+
+    response = client.get("/v1/banks/bankus33", params={"offset": 1, "limit": 1})
+    assert [code["swiftCode"] for code in response.json()["swiftCodes"]] == ["BANKUS33XXX"]
+
+    response = client.get("/v1/banks/BANKUS33", params={"country": "ca"})
+    assert (response.json()["total"], response.json()["swiftCodes"]) == (0, [])
+
+    assert client.get("/v1/banks/NONEXIST").status_code == 404
+    assert client.get("/v1/banks/SHORT").status_code == 422
+
+
+def test_institution_cache_is_invalidated_by_writes():
+    hits = metrics.caches.get("institution", [0, 0])[0]
+    assert client.get("/v1/banks/BANKUS33").json()["total"] == 2
+    assert client.get("/v1/banks/BANKUS33").json()["total"] == 2
+    assert metrics.caches["institution"][0] == hits + 1
+
+    client.post("/v1/swift-codes", json={
+        "swiftCode": "BANKUS33NYC", "bankName": "Bank USA Harlem", "address": "5 Lenox Ave, New York",
+        "countryISO2": "US", "countryName": "United States", "isHeadquarter": False
+    })
+    assert client.get("/v1/banks/BANKUS33").json()["total"] == 3
+
+
 def test_get_branch_swift_code():
     response = client.get("/v1/swift-codes/BANKUS33BRN")
     assert response.status_code == 200
@@ -107,6 +327,27 @@ def test_get_nonexistent_swift_code():
     assert response.status_code == 404
 
 
+def test_stream_lookups_match_the_rest_responses():
+    codes = ["BANKUS33XXX", "BANKUS33BRN", "NONEXISTENT"]
+
+    with client.websocket_connect("/v1/swift-codes/stream") as websocket:
+        for request_id, code in enumerate(codes):
+            websocket.send_json({"id": request_id, "swiftCode": code})
+        websocket.send_json({"id": "bad", "swiftCode": "NOT-A-CODE"})
+        replies = {reply["id"]: reply for reply in (websocket.receive_json() for _ in range(len(codes) + 1))}
+
+    for request_id, code in enumerate(codes):
+        response = client.get(f"/v1/swift-codes/{code}")
+        assert replies[request_id]["status"] == response.status_code
+        if response.status_code == 200:
+            assert replies[request_id]["result"] == response.json()
+    assert replies["bad"]["status"] == 400
+
+    body = client.get("/metrics").text
+    assert 'swift_stream_lookups_total{status="404"}' in body
+    assert "swift_stream_db_batches_total" in body
+
+
 def test_get_country_swift_codes():
     response = client.get("/v1/swift-codes/country/US")
     assert response.status_code == 200
@@ -166,6 +407,20 @@ def test_create_duplicate_swift_code():
     assert response.status_code == 409
 
 
+def test_create_rejects_malformed_swift_codes():
+    new_code = {
+        "bankName": "Wildcard Bank",
+        "address": "6 Pattern St",
+        "countryISO2": "US",
+        "countryName": "United States",
+        "isHeadquarter": True
+    }
+
+    for swift_code in ("BANK%%%%XXX", "BANK____XXX", "BANKUS33"):
+        response = client.post("/v1/swift-codes", json={**new_code, "swiftCode": swift_code})
+        assert response.status_code == 422
+
+
 def test_delete_swift_code():
     response = client.delete("/v1/swift-codes/BANKUS33BRN")
     assert response.status_code == 200
@@ -178,3 +433,32 @@ def test_delete_swift_code():
 def test_delete_nonexistent_swift_code():
     response = client.delete("/v1/swift-codes/NONEXISTENT")
     assert response.status_code == 404
+
+
+def test_database_budget_overruns_map_to_503_and_504(monkeypatch):
+    monkeypatch.setattr(RequestDeadline, "remaining_ms", lambda self: -1.0)
+    response = client.get("/v1/swift-codes/BANKUS33XXX")
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+    monkeypatch.undo()
+
+    monkeypatch.setattr(RequestDeadline, "set_budget", lambda self, budget_ms: setattr(self, "budget_ms", 50))
+    monkeypatch.setattr(SwiftCodeService, "get_swift_code", lambda db, swift_code: db.execute(text(
+        "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 1000000000) SELECT count(*) FROM c"
+    )).scalar())
+    response = client.get("/v1/swift-codes/BANKUS33XXX")
+    assert response.status_code == 504
+    assert "50 ms" in response.json()["detail"]
+
+
+def test_read_only_mode_refuses_writes(monkeypatch):
+    monkeypatch.setattr(database, "read_only", True)
+
+    response = client.delete("/v1/swift-codes/BANKUS33BRN")
+    assert response.status_code == 403
+    assert client.post("/v1/swift-codes", json={
+        "swiftCode": "NEWBANKUS22", "bankName": "New Bank USA", "address": "4 New St, Miami",
+        "countryISO2": "US", "countryName": "UNITED STATES", "isHeadquarter": False
+    }).status_code == 403
+
+    assert client.get("/v1/swift-codes/BANKUS33BRN").status_code == 200
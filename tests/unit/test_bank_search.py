@@ -0,0 +1,70 @@
+from src.repositories import bank_search
+from src.repositories.bank_search import BankSearchIndex, trigrams
+from src.repositories.directory import SwiftRecord
+
+RECORDS = [
+    SwiftRecord("COBADEFFXXX", "COMMERZBANK AG", "KAISERPLATZ  FRANKFURT AM MAIN", "DE", "GERMANY", True),
+    SwiftRecord("COBADEFF100", "COMMERZBANK AG", "POTSDAMER PLATZ 1  BERLIN", "DE", "GERMANY", False),
+    SwiftRecord("COBAPLPXXXX", "COMMERZBANK AG", "UL. SENATORSKA 18  WARSZAWA", "PL", "POLAND", True),
+    SwiftRecord("DEUTDEFFXXX", "DEUTSCHE BANK AG", "TAUNUSANLAGE 12  FRANKFURT AM MAIN", "DE", "GERMANY", True),
+    SwiftRecord("BPKOPLPWXXX", "PKO BANK POLSKI SA", "UL. PULAWSKA 15  WARSZAWA", "PL", "POLAND", True),
+]
+
+
+def test_trigrams_match_pg_trgm():
+    assert trigrams("Cat") == {"  c", " ca", "cat", "at "}
+    assert trigrams("a-b") == {"  a", " a ", "  b", " b "}
+    assert trigrams("  ") == set()
+
+
+def test_misspelled_and_partial_names_are_ranked():
+    index = BankSearchIndex.from_records(RECORDS)
+
+    matches = index.search("comerzbank", 10)
+    assert [match.swift_code for match in matches] == ["COBADEFF100", "COBADEFFXXX", "COBAPLPXXXX"]
+    assert 0.5 <= matches[0].score < 1
+
+    assert index.search("deutsche", 1)[0].swift_code == "DEUTDEFFXXX"
+    assert [match.swift_code for match in index.search("senatorska warszawa", 10)][0] == "COBAPLPXXXX"
+    assert [match.swift_code for match in index.search("commerzbank", 10, "pl")] == ["COBAPLPXXXX"]
+    assert index.search("xyzzy", 10) == []
+
+
+def test_writes_are_applied_incrementally():
+    index = BankSearchIndex.from_records(RECORDS)
+
+    index.add(SwiftRecord("COBAPLPX001", "COMMERZBANK AG", "UL. NOWA 1  KRAKOW", "PL", "POLAND", False))
+    index.remove("COBAPLPXXXX")
+    assert [match.swift_code for match in index.search("commerzbank", 10, "PL")] == ["COBAPLPX001"]
+
+    index.add(SwiftRecord("BPKOPLPWXXX", "PKO BP", "UL. PULAWSKA 15  WARSZAWA", "PL", "POLAND", True))
+    assert index.search("pko bank polski", 10) == []
+    assert len(index) == 5
+
+
+def test_candidates_are_the_strings_with_most_rare_trigram_hits(monkeypatch):
+    monkeypatch.setattr(bank_search, "MAX_CANDIDATES", 2)
+    records = [
+        SwiftRecord(f"FILL{index:02d}DEXXX", f"{word} {suffix}", "", "DE", "GERMANY", True)
+        for index, (word, suffix) in enumerate(
+            (word, suffix) for word in ("ZETAS", "BANKS", "BETA", "DRINK") for suffix in ("ONE", "TWO", "SIX")
+        )
+    ]
+    records.append(SwiftRecord("ZETABANKXXX", "ZETA BANK", "", "DE", "GERMANY", True))
+    index = BankSearchIndex.from_records(records)
+
+    assert [match.swift_code for match in index.search("zeta bank", 10)] == ["ZETABANKXXX"]
+
+
+def test_tombstones_are_compacted(monkeypatch):
+    monkeypatch.setattr(bank_search, "COMPACT_MIN_DELETED", 2)
+    index = BankSearchIndex.from_records(RECORDS)
+
+    for swift_code in ("COBADEFFXXX", "COBADEFF100", "DEUTDEFFXXX"):
+        index.remove(swift_code)
+    assert len(index) == 2
+    assert not index._deleted and len(index._codes) == 2
+
+    index.add(SwiftRecord("BPKOPLPWXXX", "PKO BANK POLSKI SA", "UL. PULAWSKA 17  WARSZAWA", "PL", "POLAND", True))
+    assert [match.address for match in index.search("pko bank", 10)] == ["UL. PULAWSKA 17  WARSZAWA"]
+    assert [match.swift_code for match in index.search("commerzbank", 10)] == ["COBAPLPXXXX"]
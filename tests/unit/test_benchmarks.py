@@ -0,0 +1,149 @@
+import asyncio
+from collections import Counter
+
+import httpx
+
+from benchmarks import run
+from benchmarks.run import compare
+from benchmarks.load import Report, TrafficMix, fire, parse_mix, read_access_log, replay_schedule
+from benchmarks.generator import DEFAULT_SOURCE, SwiftDatasetGenerator, write_synthetic_csv
+from src.utils.parser import SwiftCodeParser
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    baseline = {
+        "sqlite/1000/parse_rows_per_s": {"value": 1000.0, "unit": "rows/s", "higher_is_better": True},
+        "sqlite/1000/hq_lookup_p99_ms": {"value": 10.0, "unit": "ms", "higher_is_better": False},
+        "sqlite/1000/seed_seconds": {"value": 2.0, "unit": "s", "higher_is_better": False},
+    }
+    results = {
+        "sqlite/1000/parse_rows_per_s": {"value": 700.0, "unit": "rows/s", "higher_is_better": True},
+        "sqlite/1000/hq_lookup_p99_ms": {"value": 11.0, "unit": "ms", "higher_is_better": False},
+        "sqlite/1000/seed_seconds": {"value": 3.0, "unit": "s", "higher_is_better": False},
+    }
+
+    regressions = compare(results, baseline, tolerance=0.2)
+
+    assert len(regressions) == 2
+    assert regressions[0].startswith("sqlite/1000/parse_rows_per_s")
+    assert regressions[1].startswith("sqlite/1000/seed_seconds")
+
+
+def test_synthetic_dataset_is_parseable(tmp_path):
+    path = tmp_path / "synthetic.csv"
+    write_synthetic_csv(str(path), 500)
+
+    records = SwiftCodeParser.parse_csv(str(path))
+
+    assert len(records) == 500
+    assert len({record["swift_code"] for record in records}) == 500
+    assert all(len(record["swift_code"]) == 11 for record in records)
+
+
+def test_generator_is_deterministic_and_follows_source(tmp_path):
+    generator = SwiftDatasetGenerator()
+
+    first = list(generator.rows(2000, seed=5))
+    second = list(generator.rows(2000, seed=5))
+    other = list(generator.rows(2000, seed=6))
+
+    assert first == second
+    assert first != other
+    assert {row[0] for row in first} <= set(generator.countries)
+    assert all(row[1][4:6] == row[0] for row in first)
+    assert any(row[1].endswith("XXX") for row in first)
+
+
+def test_generator_heavy_tail_produces_large_institutions():
+    generator = SwiftDatasetGenerator(tail_probability=1.0)
+
+    rows = list(generator.rows(3000, seed=1))
+    institutions = {row[1][:8] for row in rows}
+
+    assert len(rows) == len({row[1] for row in rows})
+    assert len(rows) / len(institutions) > 50
+
+
+def test_traffic_mix_skews_lookups_towards_popular_codes():
+    mix = TrafficMix(DEFAULT_SOURCE, parse_mix("hq_lookup=1"), zipf_exponent=1.2, seed=1)
+    paths = Counter(mix.next_request(0.0)[2] for _ in range(5000))
+
+    top_ten = sum(count for _, count in paths.most_common(10))
+    assert top_ten > 5000 * 0.3
+    assert all(path.endswith("XXX") for path in paths)
+
+
+def test_traffic_mix_polls_countries_periodically_and_bursts_unknown_codes():
+    mix = TrafficMix(DEFAULT_SOURCE, parse_mix("unknown_lookup=1,country_poll=1"),
+                     unknown_burst=5, country_poll_interval=10, seed=3)
+
+    kinds = [mix.next_request(elapsed)[0] for elapsed in (0.0, 1.0, 2.0, 11.0)]
+
+    assert kinds[0] == "country_poll"
+    assert kinds[1:3] == ["unknown_lookup", "unknown_lookup"]
+    assert kinds[3] == "country_poll"
+
+
+def test_read_access_log_parses_common_log_format(tmp_path):
+    log = tmp_path / "access.log"
+    log.write_text(
+        '10.0.0.1 - - [10/Oct/2024:13:55:36 +0000] "GET /v1/swift-codes/AAISALTRXXX HTTP/1.1" 200 512\n'
+        'garbage line\n'
+        'DELETE /v1/swift-codes/AAISALTRXXX\n'
+    )
+
+    entries = list(read_access_log(str(log)))
+
+    assert entries[0][1:] == ("GET", "/v1/swift-codes/AAISALTRXXX")
+    assert entries[0][0] is not None
+    assert entries[1] == (None, "DELETE", "/v1/swift-codes/AAISALTRXXX")
+
+
+def test_replay_skips_requests_it_cannot_reproduce(tmp_path):
+    log = tmp_path / "access.log"
+    log.write_text(
+        'GET /v1/swift-codes/AAISALTRXXX\n'
+        'POST /v1/swift-codes\n'
+        'DELETE /v1/swift-codes/AAISALTRXXX\n'
+        'GET /v1/swift-codes/country/PL\n'
+    )
+    report = Report(1.0)
+
+    schedule = list(replay_schedule(str(log), rate=10, speed=1, report=report))
+
+    assert [request[2] for _, request in schedule] == ["/v1/swift-codes/AAISALTRXXX", "/v1/swift-codes/country/PL"]
+    assert [offset for offset, _ in schedule] == [0.0, 0.1]
+    assert report.skipped == 2
+
+
+def test_replayed_client_errors_are_not_counted_as_failures():
+    statuses = {"/v1/swift-codes/GONE": 404, "/v1/swift-codes/BROKEN": 500}
+    transport = httpx.MockTransport(lambda request: httpx.Response(statuses[request.url.path]))
+    report = Report(1.0)
+
+    async def replay():
+        semaphore = asyncio.Semaphore(2)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for path in statuses:
+                await semaphore.acquire()
+                await fire(client, report, ("replay_get", "GET", path, None), 0.0, 0.0, semaphore)
+
+    asyncio.run(replay())
+
+    assert report.kinds["replay_get"]["errors"] == [False, True]
+
+
+def test_missing_baseline_fails_the_run(tmp_path, monkeypatch):
+    monkeypatch.setattr(run, "run_scenarios", lambda db_url, sizes, requests, work_dir: {
+        "sqlite/10/seed_seconds": {"value": 1.0, "unit": "s", "higher_is_better": False}
+    })
+    baseline = str(tmp_path / "baseline.json")
+    arguments = ["run", "--sizes", "10", "--output", str(tmp_path / "results.json"), "--baseline", baseline]
+
+    monkeypatch.setattr("sys.argv", arguments)
+    assert run.main() == 1
+
+    monkeypatch.setattr("sys.argv", arguments + ["--save-baseline"])
+    assert run.main() == 0
+    monkeypatch.setattr("sys.argv", arguments)
+    assert run.main() == 0
@@ -0,0 +1,114 @@
+import time
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+import src.database.db  # noqa: F401  installs the deadline listeners
+from src.api.middleware import DeadlineMiddleware
+from src.database.deadlines import RequestDeadline, DeadlineExceeded, ClientDisconnected, current_deadline
+
+SLOW_QUERY = text(
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 1000000000) SELECT count(*) FROM c"
+)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    yield engine
+    engine.dispose()
+
+
+def run_with_deadline(engine, deadline, statement=SLOW_QUERY):
+    token = current_deadline.set(deadline)
+    try:
+        with Session(engine) as session:
+            return session.execute(statement).scalar()
+    finally:
+        current_deadline.reset(token)
+
+
+def test_statement_is_stopped_when_the_budget_runs_out(engine):
+    start = time.perf_counter()
+    with pytest.raises(DeadlineExceeded) as error:
+        run_with_deadline(engine, RequestDeadline(100))
+
+    assert error.value.started is True
+    assert time.perf_counter() - start < 1
+
+    # The connection is usable again, without the deadline, once it is back in the pool.
+    with Session(engine) as session:
+        assert session.execute(text("SELECT 1")).scalar() == 1
+
+
+def test_exhausted_budget_fails_before_the_transaction_starts(engine):
+    with pytest.raises(DeadlineExceeded) as error:
+        run_with_deadline(engine, RequestDeadline(0), text("SELECT 1"))
+
+    assert error.value.started is False
+
+
+def test_cancel_interrupts_a_running_statement(engine):
+    deadline = RequestDeadline(10_000)
+    threading.Timer(0.1, deadline.cancel).start()
+
+    start = time.perf_counter()
+    with pytest.raises(ClientDisconnected):
+        run_with_deadline(engine, deadline)
+    assert time.perf_counter() - start < 1
+
+
+def test_middleware_cancels_statements_when_the_client_disconnects(engine):
+    outcome = {}
+
+    async def app(scope, receive, send):
+        await receive()
+        try:
+            await asyncio.to_thread(run_with_deadline, engine, current_deadline.get())
+        except ClientDisconnected as e:
+            outcome["error"] = e
+
+    async def receive():
+        if not outcome.get("body_sent"):
+            outcome["body_sent"] = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.sleep(0.1)
+        return {"type": "http.disconnect"}
+
+    async def send(_):
+        pass
+
+    start = time.perf_counter()
+    asyncio.run(DeadlineMiddleware(app)({"type": "http", "method": "GET", "path": "/"}, receive, send))
+
+    assert isinstance(outcome.get("error"), ClientDisconnected)
+    assert time.perf_counter() - start < 2
+
+
+def test_connection_returned_to_the_pool_is_not_cancelled():
+    events = []
+
+    class Connection:
+        def cancel(self):
+            events.append("cancel started")
+            time.sleep(0.1)
+            events.append("cancel finished")
+
+    deadline = RequestDeadline(10_000)
+    connection = Connection()
+    deadline.track(connection)
+
+    canceller = threading.Thread(target=deadline.cancel)
+    canceller.start()
+    while not events:
+        time.sleep(0.001)
+    deadline.untrack(connection)
+    events.append("checked in")
+    canceller.join()
+
+    assert events == ["cancel started", "cancel finished", "checked in"]
+    deadline.cancel()
+    assert events.count("cancel started") == 1
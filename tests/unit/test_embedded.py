@@ -0,0 +1,77 @@
+import os
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.generator import write_synthetic_csv
+from src.database import embedded
+from src.database.db import build_engine
+from src.repositories.swift_repository import SwiftCodeRepository
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = str(tmp_path / "swift_codes.csv")
+    write_synthetic_csv(path, 300)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def embedded_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedded, "EMBEDDED_DIR", str(tmp_path / "embedded"))
+    return tmp_path / "embedded"
+
+
+def open_read_only(url):
+    engine = build_engine(url)
+    embedded.tune_for_reads(engine)
+    return engine
+
+
+def test_sqlite_file_is_built_once_and_rebuilt_when_the_csv_changes(data_file, embedded_dir, monkeypatch):
+    monkeypatch.setattr(embedded, "EMBEDDED_DB_FILE", "")
+    path = embedded.database_path(data_file)
+
+    url = embedded.prepare(data_file, "sqlite")
+    assert os.path.dirname(path) == str(embedded_dir) and "immutable=1" in url
+    assert os.stat(embedded_dir).st_mode & 0o777 == 0o700
+    built = os.stat(path).st_mtime_ns
+
+    assert embedded.prepare(data_file, "sqlite") == url
+    assert os.stat(path).st_mtime_ns == built
+
+    write_synthetic_csv(data_file, 200)
+    embedded.prepare(data_file, "sqlite")
+    engine = open_read_only(url)
+    try:
+        with engine.connect() as connection:
+            assert connection.execute(text("SELECT count(*) FROM swift_codes")).scalar() == 200
+    finally:
+        engine.dispose()
+
+
+@pytest.mark.parametrize("mode", embedded.EMBEDDED_MODES)
+def test_embedded_database_serves_reads_and_refuses_writes(data_file, mode, monkeypatch):
+    monkeypatch.setattr(embedded, "EMBEDDED_DB_FILE", "")
+    engine = open_read_only(embedded.prepare(data_file, mode))
+    db = sessionmaker(bind=engine)()
+    try:
+        countries = SwiftCodeRepository.get_country_statistics(db)
+        assert sum(country.code_count for country in countries) == 300
+
+        code = SwiftCodeRepository.get_all_swift_codes(db)[0].swift_code
+        assert SwiftCodeRepository.get_swift_code(db, code) is not None
+
+        with pytest.raises(OperationalError):
+            db.execute(text("DELETE FROM swift_codes"))
+    finally:
+        db.close()
+        engine.dispose()
+        embedded.close()
+
+
+def test_unknown_mode_is_rejected(data_file):
+    with pytest.raises(ValueError):
+        embedded.prepare(data_file, "redis")
@@ -0,0 +1,83 @@
+import csv
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.generator import CSV_HEADER, write_synthetic_csv
+from src.database.db import Base
+from src.repositories.swift_repository import SwiftCodeRepository
+from src.services.ingest import IngestService
+from src.utils.parser import SwiftCodeParser
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        for code, name in rows:
+            writer.writerow([code[4:6], code, "BIC11", name, "ADDRESS", "TOWN", "COUNTRY", "Europe/Warsaw"])
+    return str(path)
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ingest.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def test_sources_resolve_in_order(tmp_path):
+    directory = tmp_path / "dir"
+    directory.mkdir()
+    b = write_csv(directory / "b.csv", [])
+    a = write_csv(directory / "a.csv", [])
+    (directory / "notes.txt").write_text("")
+    single = write_csv(tmp_path / "single.csv", [])
+
+    assert SwiftCodeParser.resolve_sources(str(directory)) == [a, b]
+    assert SwiftCodeParser.resolve_sources(f"{directory}/*.csv") == [a, b]
+    assert SwiftCodeParser.resolve_sources(f"{single}, {directory}, {a}") == [single, a, b]
+    assert SwiftCodeParser.resolve_sources(str(tmp_path / "missing.csv")) == []
+
+
+def test_later_files_override_earlier_ones(tmp_path, db):
+    first = write_csv(tmp_path / "1.csv", [
+        ("BANKPLPWXXX", "FIRST FILE"), ("BANKPLPWXXX", "DUPLICATE IN FIRST FILE"), ("BANKDEFFXXX", "ONLY IN FIRST"),
+    ])
+    second = write_csv(tmp_path / "2.csv", [("BANKPLPWXXX", "SECOND FILE")])
+
+    summary = IngestService.ingest(db, [first, second], workers=1)
+
+    assert (summary.files, summary.codes, summary.distinct_codes) == (2, 3, 2)
+    assert SwiftCodeRepository.get_swift_code(db, "BANKPLPWXXX").bank_name == "SECOND FILE"
+    assert SwiftCodeRepository.get_swift_code(db, "BANKDEFFXXX").bank_name == "ONLY IN FIRST"
+    statistics = {country.iso2: country.code_count for country in SwiftCodeRepository.get_country_statistics(db)}
+    assert statistics == {"PL": 1, "DE": 1}
+
+
+def test_worker_processes_load_the_same_rows_as_a_serial_ingest(tmp_path, db):
+    paths = []
+    for index in range(3):
+        paths.append(str(tmp_path / f"part_{index}.csv"))
+        write_synthetic_csv(paths[-1], 200, seed=index)
+
+    serial_engine = create_engine(f"sqlite:///{tmp_path / 'serial.db'}")
+    Base.metadata.create_all(bind=serial_engine)
+    serial_db = sessionmaker(bind=serial_engine)()
+    try:
+        expected = IngestService.ingest(serial_db, paths, workers=1)
+        parallel = IngestService.ingest(db, paths, workers=2, max_pending=1)
+
+        assert parallel.codes == expected.codes == 600
+        assert parallel.distinct_codes == expected.distinct_codes
+        rows = lambda session: sorted(
+            (code.swift_code, code.bank_name) for code in SwiftCodeRepository.get_all_swift_codes(session)
+        )
+        assert rows(db) == rows(serial_db)
+    finally:
+        serial_db.close()
+        serial_engine.dispose()
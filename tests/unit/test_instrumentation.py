@@ -0,0 +1,77 @@
+import logging
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from src.database import instrumentation
+from src.database.instrumentation import QueryStats, current_query_stats, install_query_instrumentation
+
+
+@pytest.fixture
+def engine():
+    install_query_instrumentation()
+    engine = create_engine("sqlite://")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def stats():
+    stats = QueryStats("GET /test")
+    token = current_query_stats.set(stats)
+    yield stats
+    current_query_stats.reset(token)
+
+
+def test_queries_are_counted_per_context(engine, stats):
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        connection.execute(text("SELECT 2"))
+
+    assert stats.count == 2
+    assert stats.duration > 0
+
+
+def test_failed_statements_leave_no_timing_state(engine, stats):
+    with engine.connect() as connection:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                connection.execute(text("SELECT * FROM missing"))
+        connection.execute(text("SELECT 1"))
+
+        assert stats.count == 1
+        assert "query_start_time" not in connection.info
+
+
+def test_queries_outside_a_request_are_ignored(engine):
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    assert current_query_stats.get() is None
+
+
+def test_repeated_statement_warns_once(engine, stats, monkeypatch, caplog):
+    monkeypatch.setattr(instrumentation, "REPEATED_QUERY_THRESHOLD", 3)
+
+    with caplog.at_level(logging.WARNING, logger=instrumentation.__name__):
+        with engine.connect() as connection:
+            for value in range(6):
+                connection.execute(text("SELECT :value"), {"value": value})
+
+    warnings = [record for record in caplog.records if "N+1" in record.getMessage()]
+    assert len(warnings) == 1
+    assert "GET /test" in warnings[0].getMessage()
+
+
+def test_slow_query_log_redacts_parameters(engine, monkeypatch, caplog):
+    monkeypatch.setattr(instrumentation, "SLOW_QUERY_MS", 0)
+
+    with caplog.at_level(logging.WARNING, logger=instrumentation.__name__):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT :secret"), {"secret": "ABCDUS33XXX"})
+
+    message = caplog.records[-1].getMessage()
+    assert "Slow query" in message
+    assert "1 parameters redacted" in message
+    assert "ABCDUS33XXX" not in message
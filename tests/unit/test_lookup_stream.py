@@ -0,0 +1,148 @@
+import json
+import time
+import asyncio
+import threading
+
+import pytest
+from starlette.websockets import WebSocket
+
+from src.services import lookup_stream
+from src.services.lookup_stream import LookupStream
+from src.services.swift_service import SwiftCodeService
+
+
+def record(code):
+    return {"address": "", "bankName": "BANK", "countryISO2": code[4:6], "countryName": "POLAND",
+            "isHeadquarter": False, "swiftCode": code}
+
+
+def no_session():
+    yield None
+
+
+class Client:
+    """The client side of an in-process WebSocket connection."""
+
+    def __init__(self):
+        self.inbox: asyncio.Queue = asyncio.Queue()
+        self.frames_read = 0
+        self.replies = []
+        self.connected = False
+
+    async def receive(self):
+        if not self.connected:
+            self.connected = True
+            return {"type": "websocket.connect"}
+        message = await self.inbox.get()
+        self.frames_read += 1
+        return message
+
+    async def send(self, message):
+        if message["type"] == "websocket.send":
+            self.replies.append(json.loads(message["text"]))
+
+    def request(self, request_id, swift_code):
+        self.inbox.put_nowait({"type": "websocket.receive", "text": json.dumps({"id": request_id, "swiftCode": swift_code})})
+
+    async def wait_for(self, replies, timeout=2):
+        deadline = time.monotonic() + timeout
+        while len(self.replies) < replies:
+            assert time.monotonic() < deadline, f"got {len(self.replies)} of {replies} replies"
+            await asyncio.sleep(0.005)
+
+
+def run(test, **options):
+    async def main():
+        client = Client()
+        websocket = WebSocket({"type": "websocket", "path": "/", "headers": []}, client.receive, client.send)
+        server = asyncio.create_task(LookupStream(websocket, no_session, **options).serve())
+        try:
+            await test(client)
+        finally:
+            client.inbox.put_nowait({"type": "websocket.disconnect", "code": 1000})
+            await asyncio.wait_for(server, 2)
+
+    asyncio.run(main())
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    calls = []
+
+    def get_swift_codes(_, codes):
+        calls.append(sorted(codes))
+        return {code: None if code.startswith("MISSING") else record(code) for code in codes}
+
+    monkeypatch.setattr(SwiftCodeService, "directory", None)
+    monkeypatch.setattr(SwiftCodeService, "get_swift_codes", staticmethod(get_swift_codes))
+    return calls
+
+
+def test_concurrent_misses_share_one_query(batches):
+    async def test(client):
+        for request_id, code in enumerate(["AAAAPLPWXXX", "BBBBDEFFXXX", "AAAAPLPWXXX", "MISSINGXXXX"]):
+            client.request(request_id, code)
+        await client.wait_for(4)
+
+    run(test, window_ms=50)
+
+    assert batches == [["AAAAPLPWXXX", "BBBBDEFFXXX", "MISSINGXXXX"]]
+
+
+def test_replies_are_sent_as_lookups_complete(monkeypatch):
+    def get_swift_codes(_, codes):
+        if codes == ["SLOWPLPWXXX"]:
+            time.sleep(0.2)
+        return {code: record(code) for code in codes}
+
+    monkeypatch.setattr(SwiftCodeService, "directory", None)
+    monkeypatch.setattr(SwiftCodeService, "get_swift_codes", staticmethod(get_swift_codes))
+    replies = []
+
+    async def test(client):
+        client.request("slow", "SLOWPLPWXXX")
+        await asyncio.sleep(0.05)
+        client.request("fast", "FASTPLPWXXX")
+        await client.wait_for(2)
+        replies.extend(client.replies)
+
+    run(test, window_ms=0, max_batch=1, db_concurrency=2)
+
+    assert [reply["id"] for reply in replies] == ["fast", "slow"]
+
+
+def test_reading_pauses_at_the_in_flight_limit(batches, monkeypatch):
+    released = threading.Event()
+
+    def get_swift_codes(_, codes):
+        released.wait(2)
+        return {code: None for code in codes}
+
+    monkeypatch.setattr(SwiftCodeService, "get_swift_codes", staticmethod(get_swift_codes))
+    throttled = lookup_stream.metrics.stream_throttled
+
+    async def test(client):
+        for request_id in range(5):
+            client.request(request_id, f"CODE{request_id}PLPWXXX"[:11])
+        await asyncio.sleep(0.1)
+        assert client.frames_read == 2
+        assert lookup_stream.metrics.stream_throttled > throttled
+
+        released.set()
+        await client.wait_for(5)
+        assert {reply["status"] for reply in client.replies} == {404}
+
+    run(test, max_in_flight=2, window_ms=0)
+
+
+def test_invalid_requests_are_answered_without_a_lookup(batches):
+    async def test(client):
+        client.inbox.put_nowait({"type": "websocket.receive", "text": "not json"})
+        client.request(7, "NOT A CODE")
+        client.inbox.put_nowait({"type": "websocket.receive", "text": json.dumps({"swiftCode": "AAAAPLPWXXX"})})
+        await client.wait_for(3)
+        assert [(reply["id"], reply["status"]) for reply in client.replies] == [(None, 400), (7, 400), (None, 400)]
+
+    run(test)
+
+    assert batches == []
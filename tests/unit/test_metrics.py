@@ -0,0 +1,57 @@
+from src.monitoring.metrics import MetricsRegistry
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    registry.observe_request("GET", "/v1/swift-codes/{swift_code}", 200, 0.003)
+    registry.observe_request("GET", "/v1/swift-codes/{swift_code}", 200, 0.2)
+    registry.observe_request("GET", "/v1/swift-codes/{swift_code}", 404, 20.0)
+
+    body = registry.render()
+    labels = 'method="GET",route="/v1/swift-codes/{swift_code}"'
+
+    assert f'swift_http_request_duration_seconds_bucket{{{labels},le="0.005"}} 1' in body
+    assert f'swift_http_request_duration_seconds_bucket{{{labels},le="0.25"}} 2' in body
+    assert f'swift_http_request_duration_seconds_bucket{{{labels},le="10.0"}} 2' in body
+    assert f'swift_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 3' in body
+    assert f'swift_http_request_duration_seconds_count{{{labels}}} 3' in body
+    assert f'swift_http_requests_total{{{labels},status="404"}} 1' in body
+
+
+def test_cache_hit_ratio():
+    registry = MetricsRegistry()
+    registry.record_cache("banks", hit=True)
+    registry.record_cache("banks", hit=True)
+    registry.record_cache("banks", hit=False)
+
+    body = registry.render()
+
+    assert 'swift_cache_hits_total{cache="banks"} 2' in body
+    assert 'swift_cache_misses_total{cache="banks"} 1' in body
+    assert 'swift_cache_hit_ratio{cache="banks"} 0.6666666666666666' in body
+
+
+def test_ingest_durations_and_pool_gauges():
+    registry = MetricsRegistry()
+    registry.record_duration("seed", 1.5)
+    registry.record_duration("seed", 0.5)
+
+    body = registry.render({"primary": {"size": 5, "in_use": 2, "checkouts": 7}, "shed_requests": 1})
+
+    assert 'swift_ingest_last_duration_seconds{stage="seed"} 0.5' in body
+    assert 'swift_ingest_duration_seconds_sum{stage="seed"} 2.0' in body
+    assert 'swift_ingest_duration_seconds_count{stage="seed"} 2' in body
+    assert 'swift_db_pool_in_use{engine="primary"} 2' in body
+    assert 'swift_db_pool_checkouts_total{engine="primary"} 7' in body
+    assert "swift_db_admission_shed_total 1" in body
+
+
+def test_every_shard_pool_is_rendered():
+    body = MetricsRegistry().render({
+        "primary": {"in_use": 1},
+        "shards": {"us": {"in_use": 1}, "eu": {"in_use": 3}},
+    })
+
+    assert 'swift_db_pool_in_use{engine="us"} 1' in body
+    assert 'swift_db_pool_in_use{engine="eu"} 3' in body
+    assert 'engine="primary"' not in body
@@ -0,0 +1,40 @@
+from sqlalchemy import create_engine, inspect, text
+
+from src.database.db import Base
+from src.database.migrations import migrate
+from src.database.models import Country, Bank
+
+
+def test_migrate_moves_country_names_into_the_countries_table(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE swift_codes (swift_code VARCHAR(11) PRIMARY KEY, bank_name VARCHAR(255) NOT NULL, "
+            "address TEXT, country_iso2 VARCHAR(2) NOT NULL, country_name VARCHAR(255) NOT NULL, "
+            "is_headquarter BOOLEAN)"
+        ))
+        connection.execute(text("CREATE INDEX ix_swift_codes_country_iso2 ON swift_codes (country_iso2)"))
+        connection.execute(text(
+            "INSERT INTO swift_codes VALUES "
+            "('BANKUS33XXX', 'Bank', '1 Main St', 'US', 'UNITED STATES', 1), "
+            "('BANKUS33BRN', 'Bank', '2 Main St', 'US', 'UNITED STATES', 0), "
+            "('BANKCA33XXX', 'Bank', '3 Main St', 'CA', 'CANADA', 1)"
+        ))
+
+    Base.metadata.create_all(bind=engine)
+    migrate(engine)
+    migrate(engine)
+
+    inspector = inspect(engine)
+    assert "country_name" not in {column["name"] for column in inspector.get_columns("swift_codes")}
+    assert {index["name"] for index in inspector.get_indexes("swift_codes")} >= {"ix_swift_codes_country_covering"}
+    assert "ix_swift_codes_country_iso2" not in {index["name"] for index in inspector.get_indexes("swift_codes")}
+
+    with engine.connect() as connection:
+        countries = connection.execute(Country.__table__.select().order_by(Country.iso2)).all()
+        assert [tuple(country) for country in countries] == [("CA", "CANADA", 1, 1, 1), ("US", "UNITED STATES", 2, 1, 1)]
+        banks = connection.execute(Bank.__table__.select().order_by(Bank.bic8)).all()
+        assert [tuple(bank) for bank in banks] == [("BANKCA33", "CA", 1, 1), ("BANKUS33", "US", 2, 1)]
+        assert connection.execute(text("SELECT COUNT(*) FROM swift_codes")).scalar() == 3
+
+    engine.dispose()
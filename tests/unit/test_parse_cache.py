@@ -0,0 +1,102 @@
+import os
+
+from src.utils.parser import SwiftCodeParser
+from src.utils.parse_cache import ParseCache, HEADER
+from src.repositories.record_store import SwiftRecordStore
+
+CSV_DATA = """COUNTRY ISO2 CODE,SWIFT CODE,CODE TYPE,NAME,ADDRESS,TOWN NAME,COUNTRY NAME,TIME ZONE
+PL,BANKPLPWXXX,BIC11,BANK POLSKA,"UL. ZÓŁTA 1, WARSZAWA",WARSZAWA,POLAND,Europe/Warsaw
+PL,BANKPLPWKRA,BIC11,BANK POLSKA,"RYNEK 2, KRAKÓW",KRAKOW,POLAND,Europe/Warsaw
+"""
+
+
+def write_csv(tmp_path):
+    csv_file = tmp_path / "codes.csv"
+    csv_file.write_text(CSV_DATA, encoding="utf-8")
+    return str(csv_file)
+
+
+def test_cache_round_trips_parsed_records(tmp_path):
+    csv_file = write_csv(tmp_path)
+    cache = ParseCache(str(tmp_path / "cache"))
+    records = SwiftCodeParser.parse_csv(csv_file, use_cache=False)
+
+    cache.store(csv_file, records.serialize())
+
+    assert cache.load(csv_file, SwiftRecordStore.deserialize) == records
+
+
+def test_cache_is_invalidated_when_the_source_changes(tmp_path):
+    csv_file = write_csv(tmp_path)
+    cache = ParseCache(str(tmp_path / "cache"))
+    cache.store(csv_file, SwiftCodeParser.parse_csv(csv_file, use_cache=False).serialize())
+
+    with open(csv_file, "a", encoding="utf-8") as file:
+        file.write("PL,OTHRPLPWXXX,BIC11,OTHER,ADDR,TOWN,POLAND,Europe/Warsaw\n")
+
+    assert cache.load(csv_file, SwiftRecordStore.deserialize) is None
+
+
+def test_touched_but_unchanged_source_still_hits(tmp_path):
+    csv_file = write_csv(tmp_path)
+    cache = ParseCache(str(tmp_path / "cache"))
+    records = SwiftCodeParser.parse_csv(csv_file, use_cache=False)
+    cache.store(csv_file, records.serialize())
+
+    stat = os.stat(csv_file)
+    os.utime(csv_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    assert cache.load(csv_file, SwiftRecordStore.deserialize) == records
+
+
+def test_corrupted_cache_falls_back_to_parsing(tmp_path, monkeypatch):
+    csv_file = write_csv(tmp_path)
+    cache = ParseCache(str(tmp_path / "cache"))
+    monkeypatch.setattr("src.utils.parser.parse_cache", cache)
+    monkeypatch.setattr("src.utils.parser.PARSE_CACHE_ENABLED", True)
+    expected = SwiftCodeParser.parse_csv(csv_file)
+
+    cache_path = cache.path_for(csv_file)
+    with open(cache_path, "r+b") as file:
+        file.seek(HEADER.size + 12)
+        file.write(b"\xff\xff")
+
+    assert cache.load(csv_file, SwiftRecordStore.deserialize) is None
+    assert SwiftCodeParser.parse_csv(csv_file) == expected
+    assert cache.load(csv_file, SwiftRecordStore.deserialize) == expected
+
+
+def test_cache_files_are_not_written_next_to_the_source(tmp_path):
+    csv_file = write_csv(tmp_path)
+
+    assert not ParseCache().path_for(csv_file).startswith(str(tmp_path))
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ParseCache(str(tmp_path / "cache"), max_files=2)
+    sources = []
+    for name in ("a", "b", "c"):
+        source = tmp_path / name
+        source.mkdir()
+        sources.append(write_csv(source))
+    records = SwiftCodeParser.parse_csv(sources[0], use_cache=False)
+
+    cache.store(sources[0], records.serialize())
+    cache.store(sources[1], records.serialize())
+    os.utime(cache.path_for(sources[1]), ns=(0, 0))
+    assert cache.load(sources[0], SwiftRecordStore.deserialize) == records
+    cache.store(sources[2], records.serialize())
+
+    assert sorted(os.listdir(tmp_path / "cache")) == sorted(
+        os.path.basename(cache.path_for(source)) for source in (sources[0], sources[2])
+    )
+
+
+def test_cache_in_a_shared_directory_is_ignored(tmp_path):
+    csv_file = write_csv(tmp_path)
+    cache = ParseCache(str(tmp_path / "cache"))
+    cache.store(csv_file, SwiftCodeParser.parse_csv(csv_file, use_cache=False).serialize())
+
+    os.chmod(tmp_path / "cache", 0o777)
+
+    assert cache.load(csv_file, SwiftRecordStore.deserialize) is None
@@ -0,0 +1,91 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, exc
+
+from src.database.pool import InstrumentedQueuePool, AdmissionController, pool_stats
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_checkout_wait_is_recorded(engine):
+    with engine.connect():
+        pass
+
+    stats = pool_stats(engine.pool)
+
+    assert stats["checkouts"] == 1
+    assert stats["checkout_wait_seconds_total"] >= 0
+    assert stats["size"] == 1
+    assert stats["in_use"] == 0
+
+
+def test_checkout_timeout_is_recorded(engine):
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+        stats = pool_stats(engine.pool)
+        assert stats["in_use"] == 1
+        assert stats["checkout_timeouts"] == 1
+        assert stats["checkout_wait_seconds_recent"] > 0
+
+
+def test_metrics_survive_dispose(engine):
+    with engine.connect():
+        pass
+
+    engine.dispose()
+
+    assert pool_stats(engine.pool)["checkouts"] == 1
+
+
+def test_admission_sheds_only_when_saturated(engine):
+    controller = AdmissionController(wait_budget_ms=1, retry_after_seconds=3)
+    engine.pool.metrics.recent_wait_seconds = 0.5
+
+    controller.check(engine.pool)
+
+    with engine.connect():
+        with pytest.raises(HTTPException) as exc_info:
+            controller.check(engine.pool)
+
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers["Retry-After"] == "3"
+    assert controller.shed_count == 1
+
+
+def test_admission_admits_when_waits_are_within_budget(engine):
+    controller = AdmissionController(wait_budget_ms=1000)
+
+    with engine.connect():
+        assert controller.should_shed(engine.pool) is False
+
+
+def test_checkouts_are_shed_by_the_pool_that_would_serve_them(engine, tmp_path):
+    controller = AdmissionController(wait_budget_ms=1)
+    other = create_engine(f"sqlite:///{tmp_path / 'other.db'}", poolclass=InstrumentedQueuePool,
+                          pool_size=1, max_overflow=0)
+    for pool in (engine.pool, other.pool):
+        pool.admission = controller
+        pool.metrics.recent_wait_seconds = 0.5
+
+    try:
+        with engine.connect():
+            with pytest.raises(HTTPException):
+                engine.connect()
+            with other.connect():
+                pass
+        assert controller.shed_count == 1
+    finally:
+        other.dispose()
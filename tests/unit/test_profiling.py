@@ -0,0 +1,57 @@
+import threading
+import time
+
+from src.monitoring.profiling import ProfileStore, SamplingProfiler
+
+
+def busy_application_code(stop):
+    from src.utils.parser import SwiftCodeParser
+
+    codes = [{"swift_code": f"BANKUS{i:02d}XXX", "is_headquarter": True} for i in range(50)]
+    while not stop.is_set():
+        SwiftCodeParser.associate_branches_with_headquarters(codes)
+
+
+def test_profile_store_is_bounded():
+    store = ProfileStore(max_size=2)
+    for profile_id in ["a", "b", "c"]:
+        store.put({"id": profile_id})
+
+    assert store.get("a") is None
+    assert store.get("b") == {"id": "b"}
+    assert store.get("c") == {"id": "c"}
+
+
+def test_sampling_profiler_collects_application_stacks():
+    store = ProfileStore()
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_application_code, args=(stop,))
+    worker.start()
+
+    try:
+        profiler = SamplingProfiler.start(0.2, interval_ms=1, store=store)
+        assert store.get(profiler.id)["status"] == "running"
+        profiler.join()
+    finally:
+        stop.set()
+        worker.join()
+
+    result = store.get(profiler.id)
+    assert result["status"] == "complete"
+    assert result["samples"] > 0
+    assert "parser.py:associate_branches_with_headquarters" in result["collapsedStacks"]
+
+
+def test_only_one_sampling_profile_runs_at_a_time():
+    store = ProfileStore()
+    profiler = SamplingProfiler.start(0.1, interval_ms=1, store=store)
+
+    try:
+        assert SamplingProfiler.start(0.1, store=store) is None
+    finally:
+        profiler.join()
+
+    time.sleep(0.01)
+    second = SamplingProfiler.start(0.01, store=store)
+    assert second is not None
+    second.join()
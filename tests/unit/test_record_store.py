@@ -0,0 +1,73 @@
+import tracemalloc
+
+from benchmarks.generator import SwiftDatasetGenerator
+from src.repositories.record_store import SwiftRecordStore
+
+ROWS = 50_000
+
+
+def normalized(row):
+    country_iso2, swift_code, _, bank_name, address, _, country_name, _ = row
+    swift_code = swift_code.strip()
+    return {
+        "swift_code": swift_code,
+        "bank_name": bank_name.strip(),
+        "address": address.strip(),
+        "country_iso2": country_iso2.strip().upper(),
+        "country_name": country_name.strip().upper(),
+        "is_headquarter": swift_code.endswith("XXX"),
+    }
+
+
+def allocated(build):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        value = build()
+        return value, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def test_store_round_trips_and_answers_lookups():
+    records = [
+        {"swift_code": "BANKUS33XXX", "bank_name": "Bank", "address": "1  Main St", "country_iso2": "US",
+         "country_name": "UNITED STATES", "is_headquarter": True},
+        {"swift_code": "BANKUS33BRN", "bank_name": "Bank", "address": "", "country_iso2": "US",
+         "country_name": "UNITED STATES", "is_headquarter": False},
+        {"swift_code": "FOREIGNCA1XXX", "bank_name": "Bank Łódź", "address": "ul. Żółta 3", "country_iso2": "CA",
+         "country_name": "CANADA", "is_headquarter": True},
+    ]
+    store = SwiftRecordStore.from_records(records)
+
+    assert store == records
+    assert dict(**store[2]) == records[2]
+    assert store.get("FOREIGNCA1XXX").address == "ul. Żółta 3"
+    assert store.get("BANKUS33") is None
+    assert [row.swift_code for row in store.branches("BANKUS33XXX")] == ["BANKUS33BRN"]
+    assert [row.swift_code for row in store.country("us")] == ["BANKUS33BRN", "BANKUS33XXX"]
+    assert [row.swift_code for row in store.search_prefix("BANKUS", 1)] == ["BANKUS33BRN"]
+
+    restored = SwiftRecordStore.load(store.dump(), len(store))
+    assert restored == records
+    assert restored.get("BANKUS33XXX").address == "1  Main St"
+    assert SwiftRecordStore.deserialize(store.serialize()) == records
+
+
+def test_store_uses_a_fraction_of_the_memory_of_row_dicts():
+    rows = list(SwiftDatasetGenerator().rows(ROWS, seed=7))
+
+    dicts, dict_bytes = allocated(lambda: [normalized(row) for row in rows])
+
+    def build_store():
+        store = SwiftRecordStore()
+        for row in rows:
+            store.append(**normalized(row))
+        store.get(dicts[0]["swift_code"])
+        store.country(dicts[0]["country_iso2"])
+        return store
+
+    store, store_bytes = allocated(build_store)
+
+    assert store == dicts
+    assert dict_bytes / store_bytes >= 5
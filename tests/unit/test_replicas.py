@@ -0,0 +1,146 @@
+import pytest
+from sqlalchemy import create_engine
+
+from src.database import db as database
+from src.database.db import Base
+from src.database.models import SwiftCode, Country
+from src.database.replicas import ReplicaRouter, LEAST_CONNECTIONS
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_replica(path, bank_name):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(Country.__table__.insert().values(iso2="US", name="UNITED STATES"))
+        connection.execute(SwiftCode.__table__.insert().values(
+            swift_code="REPLUS33XXX",
+            bank_name=bank_name,
+            address="1 Replica St",
+            country_iso2="US",
+            is_headquarter=True
+        ))
+    return engine
+
+
+def served_by(router):
+    replica = router.acquire()
+    db = replica.session_factory()
+    try:
+        return db.query(SwiftCode).first().bank_name
+    finally:
+        db.close()
+        router.release(replica)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def engines(tmp_path):
+    engines = {
+        "replica-a": make_replica(tmp_path / "a.db", "Replica A"),
+        "replica-b": make_replica(tmp_path / "b.db", "Replica B"),
+    }
+    yield engines
+    for engine in engines.values():
+        engine.dispose()
+
+
+def test_round_robin_alternates_between_replicas(engines, clock):
+    router = ReplicaRouter(engines, clock=clock)
+
+    served = [served_by(router) for _ in range(4)]
+
+    assert served == ["Replica A", "Replica B", "Replica A", "Replica B"]
+
+
+def test_least_connections_prefers_idle_replica(engines, clock):
+    router = ReplicaRouter(engines, strategy=LEAST_CONNECTIONS, clock=clock)
+
+    busy = router.acquire()
+    idle = router.acquire()
+
+    assert busy is not idle
+    router.release(busy)
+    router.release(idle)
+
+
+def test_failed_replica_is_ejected_until_healthy(tmp_path, engines, clock):
+    broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'c.db'}")
+    router = ReplicaRouter({"broken": broken, **engines}, health_interval=5, clock=clock)
+
+    served = {served_by(router) for _ in range(6)}
+    assert served == {"Replica A", "Replica B"}
+    assert router.replicas[0].ejected_until == pytest.approx(105.0)
+
+    (tmp_path / "missing").mkdir()
+    make_replica(tmp_path / "missing" / "c.db", "Replica C")
+    clock.now += 6
+
+    served = {served_by(router) for _ in range(6)}
+    assert "Replica C" in served
+
+
+def test_release_after_failure_ejects_replica(engines, clock):
+    router = ReplicaRouter(engines, clock=clock)
+
+    replica = router.acquire()
+    router.release(replica, failed=True)
+
+    assert all(router.acquire() is not replica for _ in range(4))
+
+
+def test_no_healthy_replica_falls_back_to_primary(tmp_path, clock):
+    broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'a.db'}")
+    router = ReplicaRouter({"broken": broken}, clock=clock)
+
+    assert router.acquire() is None
+
+
+def test_read_failed_by_a_replica_is_retried_on_the_primary(tmp_path, clock, monkeypatch):
+    empty = create_engine(f"sqlite:///{tmp_path / 'empty.db'}")
+    primary = make_replica(tmp_path / "primary.db", "Primary")
+    router = ReplicaRouter({"empty": empty}, clock=clock)
+    monkeypatch.setattr(database, "read_router", router)
+
+    def sessions():
+        db = database.sessionmaker(bind=primary)()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    with database.read_session("client-1", sessions) as db:
+        assert db.query(SwiftCode).first().bank_name == "Primary"
+        assert db.query(SwiftCode).count() == 1
+
+    assert router.acquire() is None
+    primary.dispose()
+
+
+def test_read_your_writes_window(engines, clock):
+    router = ReplicaRouter(engines, sticky_seconds=2, clock=clock)
+
+    assert router.is_sticky("client-1") is False
+    router.record_write("client-1")
+    assert router.is_sticky("client-1") is True
+    assert router.is_sticky("client-2") is False
+
+    clock.now += 3
+    assert router.is_sticky("client-1") is False
+
+
+def test_unknown_strategy_is_rejected(engines):
+    with pytest.raises(ValueError):
+        ReplicaRouter(engines, strategy="random")
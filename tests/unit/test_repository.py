@@ -4,7 +4,7 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from src.database.db import Base
-from src.database.models import SwiftCode
+from src.database.models import SwiftCode, Country
 from src.repositories.swift_repository import SwiftCodeRepository
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -26,7 +26,6 @@ def test_db():
         bank_name="Test Bank HQ",
         address="123 Main St, New York",
         country_iso2="US",
-        country_name="UNITED STATES",
         is_headquarter=True
     )
 
@@ -35,7 +34,6 @@ def test_db():
         bank_name="Test Bank Branch",
         address="456 Side St, Chicago",
         country_iso2="US",
-        country_name="UNITED STATES",
         is_headquarter=False
     )
 
@@ -44,7 +42,6 @@ def test_db():
         bank_name="Another Bank HQ",
         address="789 Wall St, New York",
         country_iso2="US",
-        country_name="UNITED STATES",
         is_headquarter=True
     )
 
@@ -53,7 +50,6 @@ def test_db():
         bank_name="Another Bank Branch",
         address="321 Branch St, Boston",
         country_iso2="US",
-        country_name="UNITED STATES",
         is_headquarter=False
     )
 
@@ -62,10 +58,10 @@ def test_db():
         bank_name="Foreign Bank",
         address="999 Foreign St, Toronto",
         country_iso2="CA",
-        country_name="CANADA",
         is_headquarter=True
     )
 
+    db.add_all([Country(iso2="US", name="UNITED STATES"), Country(iso2="CA", name="CANADA")])
     db.add_all([hq_code, branch_code, another_hq_code, another_branch_code, foreign_code])
     db.commit()
 
@@ -189,3 +185,39 @@ def test_bulk_create_swift_codes(test_db):
     existing = SwiftCodeRepository.get_swift_code(test_db, "ABCDUS33XXX")
     assert existing is not None
     assert existing.bank_name == "Test Bank HQ"
+
+    us = SwiftCodeRepository.get_country(test_db, "US")
+    test_db.refresh(us)
+    assert (us.code_count, us.headquarter_count, us.branch_count, us.bank_count) == (6, 3, 3, 4)
+
+
+def test_writes_maintain_statistics(test_db):
+    SwiftCodeRepository.refresh_statistics(test_db)
+    test_db.commit()
+
+    def statistics(iso2):
+        country = SwiftCodeRepository.get_country(test_db, iso2)
+        test_db.refresh(country)
+        return country.code_count, country.headquarter_count, country.bank_count
+
+    assert statistics("US") == (4, 2, 2)
+    assert statistics("CA") == (1, 1, 1)
+
+    SwiftCodeRepository.create_swift_code(test_db, {
+        "swift_code": "IJKLCA33TOR", "bank_name": "Foreign Bank", "address": "1 Bay St, Toronto",
+        "country_iso2": "CA", "country_name": "CANADA", "is_headquarter": False
+    })
+    SwiftCodeRepository.create_swift_code(test_db, {
+        "swift_code": "NEWWPL22XXX", "bank_name": "New Bank", "address": "Warszawa",
+        "country_iso2": "PL", "country_name": "POLAND", "is_headquarter": True
+    })
+    assert statistics("CA") == (2, 1, 1)
+    assert statistics("PL") == (1, 1, 1)
+
+    SwiftCodeRepository.delete_swift_code(test_db, "ABCDUS33XXX")
+    SwiftCodeRepository.delete_swift_code(test_db, "ABCDUS33BRN")
+    assert statistics("US") == (2, 1, 1)
+
+    recomputed = statistics("US"), statistics("CA"), statistics("PL")
+    SwiftCodeRepository.refresh_statistics(test_db)
+    assert (statistics("US"), statistics("CA"), statistics("PL")) == recomputed
@@ -7,7 +7,8 @@ from fastapi import HTTPException
 
 from src.services.swift_service import SwiftCodeService
 from src.repositories.swift_repository import SwiftCodeRepository
-from src.database.models import SwiftCode
+from src.repositories.record_store import SwiftRecordStore
+from src.database.models import SwiftCode, Country
 
 
 @pytest.fixture
@@ -90,12 +91,18 @@ def test_get_swift_code_not_found():
 def test_get_country_swift_codes(mock_swift_code, mock_branch_code):
     mock_db = MagicMock()
 
+    country = MagicMock(spec=Country)
+    country.name = "UNITED STATES"
+
     with patch.object(
             SwiftCodeRepository, 'get_country_swift_codes', return_value=[mock_swift_code, mock_branch_code]
-    ) as mock_get_codes:
+    ) as mock_get_codes, patch.object(
+            SwiftCodeRepository, 'get_country', return_value=country
+    ) as mock_get_country:
         result = SwiftCodeService.get_country_swift_codes(mock_db, "US")
 
         mock_get_codes.assert_called_once_with(mock_db, "US")
+        mock_get_country.assert_called_once_with(mock_db, "US")
 
         assert result is not None
         assert result["countryISO2"] == "US"
@@ -252,8 +259,7 @@ def test_seed_database():
             assert len(args) == 2
             assert args[0] == mock_db
 
-            assert isinstance(args[1], list)
-            assert all(isinstance(item, dict) for item in args[1])
+            assert isinstance(args[1], SwiftRecordStore)
             assert args[1] == expected_data
 
     finally:
@@ -0,0 +1,144 @@
+import csv
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event, text
+
+from src.database.db import Base
+from src.database.shards import ShardRouter, parse_shard_urls, parse_country_map
+from src.repositories.swift_repository import SwiftCodeRepository
+from src.services.ingest import IngestService
+from src.services.swift_service import SwiftCodeService
+from benchmarks.generator import CSV_HEADER
+
+RECORDS = [
+    {"swift_code": "BANKUS33XXX", "bank_name": "Bank USA HQ", "address": "1 Main St", "country_iso2": "US",
+     "country_name": "UNITED STATES", "is_headquarter": True},
+    {"swift_code": "BANKUS33BRN", "bank_name": "Bank USA Branch", "address": "2 Main St", "country_iso2": "US",
+     "country_name": "UNITED STATES", "is_headquarter": False},
+    {"swift_code": "BANKPLPWXXX", "bank_name": "Bank Polska", "address": "Warszawa", "country_iso2": "PL",
+     "country_name": "POLAND", "is_headquarter": True},
+    {"swift_code": "BANKDEFFXXX", "bank_name": "Bank Deutschland", "address": "Frankfurt", "country_iso2": "DE",
+     "country_name": "GERMANY", "is_headquarter": True},
+]
+
+
+@pytest.fixture
+def router(tmp_path):
+    engines = {name: create_engine(f"sqlite:///{tmp_path / name}.db") for name in ("eu", "us")}
+    for engine in engines.values():
+        Base.metadata.create_all(bind=engine)
+
+    router = ShardRouter(engines, {"PL": "eu", "DE": "eu", "US": "us"})
+    db = router.session_factory()
+    partitions = router.partition(RECORDS, lambda record: record["country_iso2"])
+    router.fan_out(
+        lambda session, shard: SwiftCodeRepository.bulk_create_swift_codes(session, partitions[shard]), list(partitions)
+    )
+    db.close()
+
+    yield router
+    router.dispose()
+
+
+def statements_per_shard(router):
+    counts = {name: 0 for name in router.names}
+    for name, engine in router.engines.items():
+        event.listen(engine, "before_cursor_execute", lambda *args, name=name: counts.__setitem__(name, counts[name] + 1))
+    return counts
+
+
+def codes_on(router, shard):
+    with router.engines[shard].connect() as connection:
+        return sorted(code for (code,) in connection.execute(text("SELECT swift_code FROM swift_codes")))
+
+
+def test_configuration_is_parsed():
+    assert parse_shard_urls("eu=sqlite:///eu.db, us=postgresql://h/db") == {
+        "eu": "sqlite:///eu.db", "us": "postgresql://h/db"
+    }
+    assert parse_country_map("pl:eu, US:us") == {"PL": "eu", "US": "us"}
+    with pytest.raises(ValueError):
+        ShardRouter({"eu": create_engine("sqlite://")}, {"PL": "asia"})
+
+
+def test_seeding_partitions_rows_by_country(router):
+    assert codes_on(router, "eu") == ["BANKDEFFXXX", "BANKPLPWXXX"]
+    assert codes_on(router, "us") == ["BANKUS33BRN", "BANKUS33XXX"]
+    assert router.shard_for_country("FR") == router.shard_for_country("fr")
+
+
+def test_keyed_reads_touch_exactly_one_shard(router):
+    counts = statements_per_shard(router)
+    db = router.session_factory()
+
+    assert SwiftCodeRepository.get_swift_code(db, "BANKUS33XXX").country_name == "UNITED STATES"
+    assert [code.swift_code for code in SwiftCodeRepository.get_branches_for_headquarters(db, "BANKUS33XXX")] == [
+        "BANKUS33BRN"
+    ]
+    assert [row.swift_code for row in SwiftCodeRepository.get_country_swift_codes(db, "us")] == [
+        "BANKUS33BRN", "BANKUS33XXX"
+    ]
+    assert SwiftCodeRepository.get_country(db, "US").code_count == 2
+    assert counts["eu"] == 0
+
+    assert SwiftCodeRepository.get_swift_code(db, "BANKPLPWXXX").bank_name == "Bank Polska"
+    assert counts["eu"] == 1
+    db.close()
+
+
+def test_batch_reads_fan_out_and_merge(router):
+    db = router.session_factory()
+
+    assert [row.swift_code for row in SwiftCodeRepository.search_prefix(db, "BANK", 3)] == [
+        "BANKDEFFXXX", "BANKPLPWXXX", "BANKUS33BRN"
+    ]
+    assert [country.iso2 for country in SwiftCodeRepository.get_country_statistics(db)] == ["DE", "PL", "US"]
+    assert len(SwiftCodeRepository.get_all_swift_codes(db)) == 4
+
+    codes = SwiftCodeRepository.get_swift_codes(db, ["BANKUS33XXX", "BANKPLPWXXX", "MISSINGXXXX"])
+    assert sorted(code.swift_code for code in codes) == ["BANKPLPWXXX", "BANKUS33XXX"]
+    branches = SwiftCodeRepository.get_branches_for_institutions(db, ["BANKUS33", "BANKPLPW"])
+    assert [code.swift_code for code in branches] == ["BANKUS33BRN"]
+    db.close()
+
+
+def test_writes_go_to_the_country_shard(router):
+    db = router.session_factory()
+    SwiftCodeRepository.create_swift_code(db, {
+        "swift_code": "BANKPLPWKRK", "bank_name": "Bank Polska Krakow", "address": "Krakow", "country_iso2": "PL",
+        "country_name": "POLAND", "is_headquarter": False
+    })
+    assert SwiftCodeRepository.delete_swift_code(db, "BANKUS33BRN") is True
+    db.close()
+
+    assert codes_on(router, "eu") == ["BANKDEFFXXX", "BANKPLPWKRK", "BANKPLPWXXX"]
+    assert codes_on(router, "us") == ["BANKUS33XXX"]
+
+    db = router.session_factory()
+    statistics = {country.iso2: country.code_count for country in SwiftCodeRepository.get_country_statistics(db)}
+    assert statistics == {"DE": 1, "PL": 2, "US": 1}
+    assert len(SwiftCodeRepository.get_all_swift_codes(db)) == 4
+    db.close()
+
+
+def test_codes_whose_country_differs_from_their_code_are_refused(router, tmp_path):
+    db = router.session_factory()
+    with pytest.raises(HTTPException) as error:
+        SwiftCodeService.create_swift_code(db, {
+            "swiftCode": "TESTFR33XXX", "bankName": "Test", "address": "Paris", "countryISO2": "CA",
+            "countryName": "CANADA", "isHeadquarter": True
+        })
+    assert error.value.status_code == 422
+
+    path = tmp_path / "moved.csv"
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        writer.writerow(["US", "BANKPLPWXXX", "BIC11", "Bank Polska", "Warszawa", "WARSZAWA", "UNITED STATES", "UTC"])
+        writer.writerow(["PL", "BANKPLPWKRK", "BIC11", "Bank Polska", "Krakow", "KRAKOW", "POLAND", "UTC"])
+    IngestService.ingest(db, [str(path)], workers=1)
+    db.close()
+
+    assert codes_on(router, "eu") == ["BANKDEFFXXX", "BANKPLPWKRK", "BANKPLPWXXX"]
+    assert codes_on(router, "us") == ["BANKUS33BRN", "BANKUS33XXX"]
@@ -0,0 +1,109 @@
+import pytest
+
+from src.repositories.directory import OverlayDirectory, SwiftRecord
+from src.repositories.swift_index import SwiftIndex, SwiftIndexError, HEADER
+
+RECORDS = [
+    {"swift_code": "BANKUS33XXX", "bank_name": "Bank USA HQ", "address": "1 Main St", "country_iso2": "US",
+     "country_name": "UNITED STATES", "is_headquarter": True},
+    {"swift_code": "BANKUS33BRN", "bank_name": "Bank USA Branch", "address": "2 Branch St", "country_iso2": "US",
+     "country_name": "UNITED STATES", "is_headquarter": False},
+    {"swift_code": "BANKUS34XXX", "bank_name": "Other HQ", "address": "3 Side St", "country_iso2": "US",
+     "country_name": "UNITED STATES", "is_headquarter": True},
+    {"swift_code": "FOREIGNCA1XXX", "bank_name": "Bank Łódź", "address": "ul. Żółta 3", "country_iso2": "CA",
+     "country_name": "CANADA", "is_headquarter": True},
+]
+
+
+@pytest.fixture
+def source(tmp_path):
+    source_file = tmp_path / "codes.csv"
+    source_file.write_text("placeholder source\n")
+    return str(source_file)
+
+
+@pytest.fixture
+def index(tmp_path, source):
+    path = str(tmp_path / "swift.idx")
+    SwiftIndex.build(RECORDS, path, source)
+    index = SwiftIndex(path)
+    yield index
+    index.close()
+
+
+def test_lookups_match_the_records(index):
+    assert len(index) == 4
+    assert index.get("BANKUS33XXX") == SwiftRecord(**RECORDS[0])
+    assert index.get("FOREIGNCA1XXX").bank_name == "Bank Łódź"
+    assert index.get("BANKUS33") is None
+    assert index.get("NOPEUS33XXXXXXXX") is None
+
+    assert [record.swift_code for record in index.branches("BANKUS33XXX")] == ["BANKUS33BRN"]
+    assert index.branches("BANKUS34XXX") == []
+    assert [record.swift_code for record in index.country("us")] == ["BANKUS33BRN", "BANKUS33XXX", "BANKUS34XXX"]
+    assert index.country("PL") == []
+
+
+def test_index_detects_a_changed_source(index, source):
+    assert index.matches_source(source)
+
+    with open(source, "a") as file:
+        file.write("more\n")
+
+    assert not index.matches_source(source)
+
+
+def test_corrupted_index_is_rejected(tmp_path, source):
+    path = str(tmp_path / "swift.idx")
+    SwiftIndex.build(RECORDS, path, source)
+    with open(path, "r+b") as file:
+        file.seek(HEADER.size + 3)
+        file.write(b"!")
+
+    with pytest.raises(SwiftIndexError):
+        SwiftIndex(path)
+
+
+def test_overlay_applies_local_writes(index):
+    directory = OverlayDirectory(index)
+    branch = SwiftRecord("BANKUS33NEW", "New Branch", "4 New St", "US", "UNITED STATES", False)
+
+    directory.put(branch)
+    directory.remove("BANKUS33BRN")
+
+    assert directory.get("BANKUS33NEW") == branch
+    assert directory.get("BANKUS33BRN") is None
+    assert directory.branches("BANKUS33XXX") == [branch]
+    assert [record.swift_code for record in directory.country("US")] == ["BANKUS33NEW", "BANKUS33XXX", "BANKUS34XXX"]
+
+
+def test_workers_sharing_a_journal_see_each_others_writes(index, tmp_path):
+    journal = str(tmp_path / "swift.idx.journal")
+    OverlayDirectory.reset_journal(journal)
+    first, second = OverlayDirectory(index, journal), OverlayDirectory(index, journal)
+    branch = SwiftRecord("BANKUS33NEW", "New Branch", "4 New St", "US", "UNITED STATES", False)
+
+    first.put(branch)
+    second.remove("BANKUS33BRN")
+
+    for directory in (first, second):
+        assert directory.get("BANKUS33NEW") == branch
+        assert directory.get("BANKUS33BRN") is None
+        assert directory.branches("BANKUS33XXX") == [branch]
+
+    OverlayDirectory.reset_journal(journal)
+    assert first.get("BANKUS33NEW") is None
+    assert second.get("BANKUS33BRN") is not None
+
+
+def test_prefix_search_is_ordered_and_limited(index):
+    assert [record.swift_code for record in index.search_prefix("BANKUS3", 10)] == [
+        "BANKUS33BRN", "BANKUS33XXX", "BANKUS34XXX"
+    ]
+    assert [record.swift_code for record in index.search_prefix("BANK", 2)] == ["BANKUS33BRN", "BANKUS33XXX"]
+    assert index.search_prefix("BANKUS35", 10) == []
+
+    directory = OverlayDirectory(index)
+    directory.remove("BANKUS33BRN")
+    directory.put(SwiftRecord("BANKUS33AAA", "New Branch", "4 New St", "US", "UNITED STATES", False))
+    assert [record.swift_code for record in directory.search_prefix("BANK", 2)] == ["BANKUS33AAA", "BANKUS33XXX"]
@@ -0,0 +1,124 @@
+import json
+import threading
+
+import pytest
+
+from src.monitoring.tracing import (
+    Tracer, SpanExporter, InMemoryExporter, JsonLinesFileExporter, current_trace, parse_traceparent, traced
+)
+
+TRACEPARENT = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+
+
+def run_traced_request(tracer, traceparent=None):
+    trace = tracer.start_trace(traceparent)
+    if trace is None:
+        return None
+
+    token = current_trace.set(trace)
+    try:
+        with tracer.span("http.request"):
+            with tracer.span("service.lookup"):
+                tracer.record_span("db.query", 0.001, statement="SELECT 1")
+            tracer.record_serialization()
+    finally:
+        current_trace.reset(token)
+        tracer.finish_trace(trace)
+    return trace
+
+
+def test_parse_traceparent():
+    assert parse_traceparent(TRACEPARENT) == ("4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7", True)
+    assert parse_traceparent("00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-00")[2] is False
+    assert parse_traceparent("garbage") is None
+    assert parse_traceparent("00-" + "0" * 32 + "-00f067aa0ba902b7-01") is None
+    assert parse_traceparent(None) is None
+
+
+def test_spans_nest_under_incoming_parent():
+    exporter = InMemoryExporter()
+    tracer = Tracer(sample_rate=0, exporter=exporter)
+
+    trace = run_traced_request(tracer, TRACEPARENT)
+
+    assert trace.trace_id == "4bf92f3577b34da6a3ce929d0e0e4736"
+    spans = {span.name: span for span in exporter.spans}
+    assert set(spans) == {"http.request", "service.lookup", "db.query", "response.serialize"}
+    assert spans["http.request"].parent_id == "00f067aa0ba902b7"
+    assert spans["service.lookup"].parent_id == spans["http.request"].span_id
+    assert spans["db.query"].parent_id == spans["service.lookup"].span_id
+    assert spans["response.serialize"].start_ns == spans["service.lookup"].end_ns
+
+
+@pytest.mark.parametrize("sample_rate, traceparent, sampled", [
+    (0.0, None, False),
+    (1.0, None, True),
+    (1.0, "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-00", False),
+    (0.0, TRACEPARENT, True),
+])
+def test_sampling_decision(sample_rate, traceparent, sampled):
+    tracer = Tracer(sample_rate=sample_rate, exporter=InMemoryExporter())
+
+    assert (tracer.start_trace(traceparent) is not None) == sampled
+
+
+def test_tracing_disabled_without_exporter():
+    tracer = Tracer(sample_rate=1.0, exporter=None)
+
+    assert tracer.start_trace(TRACEPARENT) is None
+
+
+def test_traced_is_transparent_without_trace():
+    @traced("service.noop")
+    def noop(value):
+        return value * 2
+
+    assert noop(21) == 42
+
+
+def test_json_lines_exporter(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer(sample_rate=1.0, exporter=JsonLinesFileExporter(str(path)))
+
+    run_traced_request(tracer)
+    run_traced_request(tracer)
+    tracer.close()
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(records) == 8
+    assert {record["name"] for record in records} >= {"http.request", "db.query"}
+    assert all(record["durationMs"] >= 0 for record in records)
+
+
+def test_json_lines_exporter_does_not_wait_for_the_disk(tmp_path, monkeypatch):
+    path = tmp_path / "traces.jsonl"
+    exporter = JsonLinesFileExporter(str(path), max_queued=1)
+    writing = threading.Event()
+    release = threading.Event()
+    write = exporter._write
+
+    def slow_write(batch):
+        writing.set()
+        release.wait(2)
+        write(batch)
+
+    monkeypatch.setattr(exporter, "_write", slow_write)
+    tracer = Tracer(sample_rate=1.0, exporter=exporter)
+
+    run_traced_request(tracer)
+    assert writing.wait(2)
+    run_traced_request(tracer)
+    run_traced_request(tracer)
+    assert exporter.dropped == 1
+
+    release.set()
+    tracer.close()
+    assert len(path.read_text().splitlines()) == 8
+
+
+def test_exporters_must_implement_export():
+    class Incomplete(SpanExporter):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,29 @@
+from src.utils import ttl_cache
+from src.utils.ttl_cache import TTLCache
+
+
+def test_entries_expire(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(ttl_cache.time, "monotonic", lambda: now[0])
+    cache = TTLCache(max_size=10, ttl=5)
+
+    cache.put("a", (1,))
+    assert cache.get("a") == (1,)
+
+    now[0] += 5
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+    cache.invalidate("a")
+    assert cache.get("a") is None
@@ -0,0 +1,122 @@
+import threading
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from src.database.db import Base
+from src.database.models import SwiftCode
+from src.repositories.swift_repository import SwiftCodeRepository
+from src.repositories.write_batcher import WriteBatcher
+
+
+def make_code(swift_code):
+    return {
+        "swift_code": swift_code,
+        "bank_name": "Batch Bank",
+        "address": "1 Batch St",
+        "country_iso2": "US",
+        "country_name": "UNITED STATES",
+        "is_headquarter": swift_code.endswith("XXX")
+    }
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'batch.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def batcher(session_factory):
+    batcher = WriteBatcher(session_factory, window_ms=50, max_size=100)
+    SwiftCodeRepository.write_batcher = batcher
+    yield batcher
+    SwiftCodeRepository.write_batcher = None
+    batcher.close()
+
+
+def test_concurrent_creates_share_commits(session_factory, batcher):
+    commits = []
+    event.listen(session_factory.kw["bind"], "commit", lambda conn: commits.append(1))
+
+    codes = [f"BTCHUS{i:02d}XXX" for i in range(20)]
+    barrier = threading.Barrier(len(codes))
+    errors = []
+
+    def create(code):
+        barrier.wait()
+        try:
+            created = SwiftCodeRepository.create_swift_code(None, make_code(code))
+            assert created.swift_code == code
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=create, args=(code,)) for code in codes]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert 0 < len(commits) < len(codes)
+
+    db = session_factory()
+    assert db.query(SwiftCode).count() == len(codes)
+    db.close()
+
+
+@pytest.mark.filterwarnings("error::sqlalchemy.exc.SAWarning")
+def test_conflict_fails_only_the_conflicting_write(session_factory, batcher):
+    barrier = threading.Barrier(3)
+    results = {}
+
+    def create(key, code):
+        barrier.wait()
+        try:
+            SwiftCodeRepository.create_swift_code(None, make_code(code))
+            results[key] = "created"
+        except IntegrityError:
+            results[key] = "conflict"
+
+    threads = [
+        threading.Thread(target=create, args=("a", "DUPLUS33XXX")),
+        threading.Thread(target=create, args=("b", "DUPLUS33XXX")),
+        threading.Thread(target=create, args=("c", "UNIQUS33XXX")),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted([results["a"], results["b"]]) == ["conflict", "created"]
+    assert results["c"] == "created"
+
+    db = session_factory()
+    assert db.query(SwiftCode).count() == 2
+    db.close()
+
+
+def test_batched_delete(session_factory, batcher):
+    SwiftCodeRepository.create_swift_code(None, make_code("DELEUS33XXX"))
+
+    assert SwiftCodeRepository.delete_swift_code(None, "DELEUS33XXX") is True
+    assert SwiftCodeRepository.delete_swift_code(None, "DELEUS33XXX") is False
+
+    db = session_factory()
+    assert SwiftCodeRepository.get_swift_code(db, "DELEUS33XXX") is None
+    db.close()
+
+
+def test_closed_batcher_rejects_writes(session_factory):
+    batcher = WriteBatcher(session_factory)
+    batcher.close()
+
+    with pytest.raises(RuntimeError):
+        batcher.submit(lambda session: None)